@@ -0,0 +1,123 @@
+"""
+Admission control for cold fills, by cost class, so bursts of expensive work cannot pile up unbounded
+"""
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Dict
+
+from fastapi import HTTPException
+
+from config import settings
+
+# Set by work that is already bounded or admitted elsewhere (background jobs, fills a fill waits on):
+# its runs still take a slot, but queue instead of being rejected
+admission_exempt: ContextVar[bool] = ContextVar("admission_exempt", default=False)
+
+# Weight of the latest run in the moving average of run durations
+DURATION_SMOOTHING = 0.2
+
+class Overloaded(HTTPException):
+    """503 with Retry-After, raised instead of queueing work beyond the cap"""
+
+    def __init__(self, cost_class: str, retry_after: int, queue_position: int):
+        super().__init__(
+            status_code=503,
+            detail={
+                "message": f"Too many {cost_class} requests in progress, please retry later",
+                "retry_after": retry_after,
+                "queue_position": queue_position
+            },
+            headers={"Retry-After": str(retry_after)}
+        )
+
+class CostClass:
+    """At most `concurrency` runs at once and `max_queue` waiting; anything beyond is rejected"""
+
+    def __init__(self, name: str, concurrency: int, max_queue: int, expected_seconds: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.running = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.avg_seconds = expected_seconds
+
+    def estimate_wait(self, queue_position: int) -> int:
+        """Seconds until a request at queue_position would start running"""
+        rounds = math.ceil(queue_position / self.concurrency)
+        return max(1, math.ceil(rounds * self.avg_seconds))
+
+    def reserve(self, exempt: bool = False):
+        """Take a place in the queue, or raise Overloaded if it is full and the work is not exempt.
+
+        Followed by slot(reserved=True) to run, or cancel() if the run is not needed after all.
+        """
+        if not exempt and self.running + self.waiting >= self.concurrency + self.max_queue:
+            self.rejected += 1
+            position = self.running + self.waiting - self.concurrency + 1
+            raise Overloaded(self.name, self.estimate_wait(position), position)
+        self.waiting += 1
+
+    def cancel(self):
+        """Give back a place taken by reserve()"""
+        self.waiting -= 1
+
+    @asynccontextmanager
+    async def slot(self, reserved: bool = False):
+        if not reserved:
+            self.reserve(admission_exempt.get())
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        self.admitted += 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self.semaphore.release()
+            elapsed = time.monotonic() - start
+            self.avg_seconds += DURATION_SMOOTHING * (elapsed - self.avg_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "waiting": self.waiting,
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_seconds": round(self.avg_seconds, 2)
+        }
+
+class AdmissionControl:
+    def __init__(self, classes: Dict[str, CostClass]):
+        self.classes = classes
+
+    def reserve(self, cost_class: str, exempt: bool = False):
+        """Queue one run of cost_class; raises Overloaded when the queue is full"""
+        self.classes[cost_class].reserve(exempt)
+
+    def cancel(self, cost_class: str):
+        self.classes[cost_class].cancel()
+
+    def slot(self, cost_class: str, reserved: bool = False):
+        """Context manager holding one run slot of cost_class; raises Overloaded when the queue is full"""
+        return self.classes[cost_class].slot(reserved)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: cost_class.stats() for name, cost_class in self.classes.items()}
+
+# Global admission control: scrapes (yfinance/alternative data) and LLM calls
+fill_admission = AdmissionControl({
+    "scrape": CostClass("scrape", settings.scrape_concurrency, settings.scrape_queue_depth, expected_seconds=10),
+    "llm": CostClass("llm", settings.llm_concurrency, settings.llm_queue_depth, expected_seconds=30),
+})
@@ -5,6 +5,9 @@ from datetime import datetime
 import anthropic
 from openai import OpenAI
 from dotenv import load_dotenv
+from change_feed import change_feed
+from atomic_io import atomic_write_json
+from disk_quota import disk_quota
 
 load_dotenv()
 
@@ -209,8 +212,9 @@ class EarningsAnalyzer:
         os.makedirs("../data/summaries", exist_ok=True)
         filepath = f"../data/summaries/{ticker}_latest.json"
         
-        with open(filepath, 'w') as f:
-            json.dump(summary_data, f, indent=2)
+        atomic_write_json(filepath, summary_data)
+        disk_quota.record_file("artifacts", f"{ticker}/summary", ticker, filepath)
+        change_feed.notify(ticker, "summary")
         
         print(f"Saved summary for {ticker} to {filepath}")
 
@@ -7,6 +7,7 @@ from typing import Dict, Optional
 from datetime import datetime
 import requests
 from cache_manager import cache_manager
+from financial_data import from_quote
 
 class AlternativeDataFetcher:
     def __init__(self):
@@ -15,14 +16,15 @@ class AlternativeDataFetcher:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
     
-    def get_stock_data(self, ticker: str) -> Optional[Dict]:
-        """Try multiple methods to get stock data"""
+    def get_stock_data(self, ticker: str, refresh: bool = False) -> Optional[Dict]:
+        """Try multiple methods to get stock data (refresh=True bypasses the cache)"""
         
-        # Method 1: Check cache first (extend cache time for production)
-        cached_data = cache_manager.get_cached_data(ticker, "stock_info", cache_hours=168)  # 7 days cache
-        if cached_data:
-            print(f"Using cached data for {ticker} (7-day cache)")
-            return cached_data
+        # Method 1: Check cache first
+        if not refresh:
+            cached_data = cache_manager.get_cached_data(ticker, "stock_info")
+            if cached_data:
+                print(f"Using cached data for {ticker}")
+                return cached_data
         
         # Method 2: Try yfinance with custom session
         try:
@@ -57,10 +59,10 @@ class AlternativeDataFetcher:
                     "fiftyTwoWeekHigh": info.get('fiftyTwoWeekHigh', 0),
                     "timestamp": datetime.now().isoformat()
                 }
+                data["financial_data"] = from_quote(data)
                 
                 # Cache for 7 days
-                cache_manager.save_to_cache(ticker, "stock_info", data)
-                return data
+                return cache_manager.save_to_cache(ticker, "stock_info", data)
                 
         except Exception as e:
             print(f"Alternative method failed for {ticker}: {e}")
@@ -0,0 +1,254 @@
+"""
+In-process cache of the parsed JSON artifacts served by the API
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from atomic_io import read_retrying
+from config import settings
+
+# Validator for an artifact whose file does not exist
+MISSING = ("-", 0.0)
+
+class ArtifactCache:
+    """Parsed artifacts and rendered response bodies, least recently used evicted first.
+
+    Their total size is kept under max_bytes, a parsed artifact counting as the
+    size of its JSON file and a body as its length.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entry_bytes = 0
+        self.payload_bytes = 0
+        # (ticker, artifact) -> ((mtime_ns, size), parsed data)
+        self.entries: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], Any]]" = OrderedDict()
+        # path -> ((mtime_ns, size), sha256 of the file contents); small, so never evicted
+        self.hash_index: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        # (ticker, response) -> (ETag, serialized response body); see get_payload
+        self.payloads: "OrderedDict[Tuple[str, str], Tuple[str, bytes]]" = OrderedDict()
+        self.payload_hits = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def _file_version(self, path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read(self, path: str) -> Tuple[Tuple[int, int], bytes]:
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            raw = f.read()
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            self.hash_index[path] = (version, hashlib.sha256(raw).hexdigest())
+        return version, raw
+
+    def _parse(self, path: str) -> Tuple[Tuple[int, int], Any]:
+        version, raw = self._read(path)
+        return version, json.loads(raw)
+
+    def get(self, ticker: str, artifact: str, path: str) -> Optional[Dict[str, Any]]:
+        """Return the cached copy if it still matches the file on disk, without reading the file"""
+        version = self._file_version(path)
+        if version is None:
+            return None
+
+        with self.lock:
+            entry = self.entries.get((ticker, artifact))
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end((ticker, artifact))
+                self.hits += 1
+                return entry[1]
+        return None
+
+    def load(self, ticker: str, artifact: str, path: str) -> Optional[Dict[str, Any]]:
+        """Return the parsed JSON at path, reusing the cached copy while the file is unchanged.
+
+        The returned object is shared between requests and must not be mutated.
+        """
+        key = (ticker, artifact)
+        version = self._file_version(path)
+        if version is None:
+            self.invalidate(ticker, artifact)
+            return None
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        try:
+            version, data = read_retrying(lambda: self._parse(path))
+        except FileNotFoundError:
+            return None
+
+        self._store(key, version, data)
+        return data
+
+    def put(self, ticker: str, artifact: str, path: str, data: Dict[str, Any], raw: Optional[bytes] = None):
+        """Record data that was just written to path so the next read skips the disk.
+
+        raw is the exact bytes written; without it the file is read back to hash it.
+        """
+        if raw is None:
+            try:
+                version, raw = self._read(path)
+            except OSError:
+                return
+        else:
+            version = self._file_version(path)
+            if version is None:
+                return
+            with self.lock:
+                self.hash_index[path] = (version, hashlib.sha256(raw).hexdigest())
+        self._store((ticker, artifact), version, data)
+
+    def index_files(self, paths: Iterable[str]) -> int:
+        """Hash files up front so conditional requests never need to open them.
+
+        Files already indexed at their current version are not read again.
+        """
+        count = 0
+        for path in paths:
+            if self.hashed(path) is not None:
+                count += 1
+                continue
+            try:
+                self._read(path)
+                count += 1
+            except OSError:
+                continue
+        return count
+
+    def hashed(self, path: str) -> Optional[Tuple[Tuple[int, int], str]]:
+        """((mtime_ns, size), sha256) of path if it is indexed at its current version"""
+        version = self._file_version(path)
+        with self.lock:
+            indexed = self.hash_index.get(path)
+        if version is None or indexed is None or indexed[0] != version:
+            return None
+        return indexed
+
+    def seed_hashes(self, hashes: Iterable[Tuple[str, Tuple[int, int], str]]) -> int:
+        """Take (path, version, sha256) hashed elsewhere, for files still at that version"""
+        count = 0
+        for path, version, digest in hashes:
+            if self._file_version(path) != version:
+                continue
+            with self.lock:
+                self.hash_index[path] = (version, digest)
+            count += 1
+        return count
+
+    def validator(self, path: str) -> Optional[Tuple[str, float]]:
+        """(content hash, mtime) for path from the hash index.
+
+        Returns MISSING when the file does not exist and None when it exists but
+        has not been indexed at its current version.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return MISSING
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            indexed = self.hash_index.get(path)
+        if indexed is None or indexed[0] != version:
+            return None
+        return (indexed[1], stat.st_mtime)
+
+    def get_payload(self, ticker: str, response: str, etag: str) -> Optional[bytes]:
+        """Serialized response body rendered when the artifacts had this ETag, if still cached.
+
+        Bodies are validated and encoded once per artifact version, so a hit is
+        returned as-is without parsing or re-encoding.
+        """
+        key = (ticker, response)
+        with self.lock:
+            entry = self.payloads.get(key)
+            if entry is None or entry[0] != etag:
+                return None
+            self.payloads.move_to_end(key)
+            self.payload_hits += 1
+            return entry[1]
+
+    def put_payload(self, ticker: str, response: str, etag: str, payload: bytes):
+        key = (ticker, response)
+        with self.lock:
+            self._pop_payload(key)
+            self.payloads[key] = (etag, payload)
+            self.payload_bytes += len(payload)
+            self._evict()
+
+    def _store(self, key: Tuple[str, str], version: Tuple[int, int], data: Any):
+        with self.lock:
+            self._pop_entry(key)
+            self.entries[key] = (version, data)
+            self.entry_bytes += version[1]
+            self._evict()
+
+    def _pop_entry(self, key: Tuple[str, str]):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.entry_bytes -= entry[0][1]
+
+    def _pop_payload(self, key: Tuple[str, str]):
+        entry = self.payloads.pop(key, None)
+        if entry is not None:
+            self.payload_bytes -= len(entry[1])
+
+    def _evict(self):
+        """Drop least recently used items, from whichever map holds more, until under max_bytes"""
+        while self.entry_bytes + self.payload_bytes > self.max_bytes:
+            if self.entries and (self.entry_bytes >= self.payload_bytes or not self.payloads):
+                self._pop_entry(next(iter(self.entries)))
+            elif self.payloads:
+                self._pop_payload(next(iter(self.payloads)))
+            else:
+                break
+
+    def invalidate(self, ticker: str, artifact: str):
+        with self.lock:
+            self._pop_entry((ticker, artifact))
+            self._pop_payload((ticker, artifact))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hash_index.clear()
+            self.payloads.clear()
+            self.entry_bytes = 0
+            self.payload_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.payload_hits = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.entry_bytes + self.payload_bytes,
+                "max_bytes": self.max_bytes,
+                "indexed_files": len(self.hash_index),
+                "payloads": len(self.payloads),
+                "payload_hits": self.payload_hits,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+# Global artifact cache instance
+artifact_cache = ArtifactCache(max_bytes=settings.artifact_cache_mb * 1024 * 1024)
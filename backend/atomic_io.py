@@ -0,0 +1,89 @@
+"""
+Atomic file writes, so a reader sees either the old file or the new one and never a partial write
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from config import settings
+
+# Attempts, and seconds between them, before a file that fails to parse is treated as unreadable
+READ_ATTEMPTS = 3
+READ_RETRY_DELAY = 0.05
+
+T = TypeVar("T")
+
+_stats = {"torn_reads": 0, "unreadable": 0}
+_stats_lock = threading.Lock()
+
+def atomic_write(path: str, data: bytes, mtime_ns: Optional[int] = None):
+    """Write data to path through a temp file in the same directory and a rename.
+
+    The temp file is dot-prefixed so directory listings and globs skip it.
+    settings.fsync_policy decides durability: "none" leaves flushing to the OS,
+    "file" fsyncs the data before the rename, "full" also fsyncs the directory
+    so the rename survives a crash. mtime_ns, if given, is stamped on the file
+    before it becomes visible.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if settings.fsync_policy != "none":
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        if mtime_ns is not None:
+            os.utime(tmp_path, ns=(mtime_ns, mtime_ns))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if settings.fsync_policy == "full":
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = 2) -> bytes:
+    """atomic_write of data as JSON; returns the bytes written"""
+    raw = json.dumps(data, indent=indent).encode()
+    atomic_write(path, raw)
+    return raw
+
+def read_retrying(read: Callable[[], T]) -> T:
+    """Call read(), retrying briefly while it raises ValueError (a file that does not parse).
+
+    Writers that bypass atomic_write (older scripts, other tools) can still be
+    caught mid-write; retrying lets them finish instead of treating the entry
+    as missing and refetching it upstream. The last ValueError is raised if
+    the file is still unreadable after READ_ATTEMPTS.
+    """
+    for attempt in range(READ_ATTEMPTS):
+        try:
+            result = read()
+        except ValueError:
+            if attempt == READ_ATTEMPTS - 1:
+                with _stats_lock:
+                    _stats["unreadable"] += 1
+                raise
+            time.sleep(READ_RETRY_DELAY)
+            continue
+        if attempt:
+            with _stats_lock:
+                _stats["torn_reads"] += 1
+        return result
+
+def stats() -> Dict[str, int]:
+    """Reads that parsed only on a retry, and reads that never did"""
+    with _stats_lock:
+        return dict(_stats)
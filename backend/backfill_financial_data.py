@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+One-shot migration: add the structured financial_data record to earnings
+entries written before scrapers stored it.
+
+File mtimes are preserved so cache freshness checks are unaffected.
+"""
+import glob
+import json
+import os
+
+from atomic_io import atomic_write
+from cache_format import decode, encode, unwrap
+from financial_data import extract_financial_metrics
+from precompressed import write_variants
+
+PATTERNS = [
+    "../data/cache/*_earnings_summary.json",
+    "../data/transcripts/*_latest.json",
+]
+
+def backfill_file(path: str) -> bool:
+    with open(path, 'rb') as f:
+        value = decode(f.read())
+    # Scraper cache entries carry a header; data is the entry itself, changed in place
+    _, data = unwrap(value, 0)
+
+    if 'financial_data' in data or 'content' not in data:
+        return False
+
+    data['financial_data'] = extract_financial_metrics(data['content'])
+
+    stat = os.stat(path)
+    if "/cache/" in path:
+        # Scraper cache entries keep the cache's encoding
+        atomic_write(path, encode(value), mtime_ns=stat.st_mtime_ns)
+    else:
+        atomic_write(path, json.dumps(data, indent=2).encode(), mtime_ns=stat.st_mtime_ns)
+        write_variants(path, data, "transcript")
+    return True
+
+def backfill_financial_data():
+    updated = 0
+    skipped = 0
+
+    for pattern in PATTERNS:
+        for path in sorted(glob.glob(pattern)):
+            try:
+                if backfill_file(path):
+                    updated += 1
+                else:
+                    skipped += 1
+            except Exception as e:
+                print(f"✗ {path}: {e}")
+
+    print(f"✓ Added financial_data to {updated} entries ({skipped} already had it)")
+
+if __name__ == "__main__":
+    backfill_financial_data()
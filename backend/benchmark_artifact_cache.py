@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark artifact reads with and without the in-process artifact cache.
+
+Replays random reads of the artifacts the API serves (summaries, transcripts,
+analyses and historical data under ARTIFACT_PATHS) and reports p50/p99
+latency per request, for a cache that holds them all and for one bounded to
+half their size. When the artifact directories are empty, copies of the
+../data/cache entries are staged in a temporary directory first.
+"""
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+import main
+from artifact_cache import ArtifactCache
+from benchmark_raw_responses import stage_artifacts
+
+def read_from_disk(files):
+    for _, path in files:
+        with open(path, 'r') as f:
+            json.load(f)
+
+def read_from_cache(cache, ticker, files):
+    for artifact, path in files:
+        cache.load(ticker, artifact, path)
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def measure(label, requests, read):
+    samples = []
+    for ticker in requests:
+        start = time.perf_counter()
+        read(ticker)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+
+    print(f"{label:<12} p50={percentile(samples, 50):8.1f}us  "
+          f"p99={percentile(samples, 99):8.1f}us  mean={statistics.mean(samples):8.1f}us")
+
+def run_benchmark(rounds: int = 20):
+    directory = None
+    artifacts = main.artifact_files()
+    if not artifacts:
+        directory = tempfile.mkdtemp(prefix="investor-edge-bench-")
+        stage_artifacts(directory)
+        artifacts = main.artifact_files()
+    try:
+        # ticker -> [(artifact, path)], everything one request for the ticker reads
+        by_ticker = {}
+        for ticker, artifact, path in artifacts:
+            by_ticker.setdefault(ticker, []).append((artifact, path))
+        tickers = sorted(by_ticker)
+        total_bytes = sum(os.path.getsize(path) for _, _, path in artifacts)
+        requests = [random.choice(tickers) for _ in range(len(tickers) * rounds)]
+        print(f"Benchmarking {len(requests)} requests over {len(artifacts)} artifacts "
+              f"({total_bytes / 1024 / 1024:.1f} MB) of {len(tickers)} tickers\n")
+
+        measure("disk", requests, lambda ticker: read_from_disk(by_ticker[ticker]))
+
+        for label, max_bytes in [("cached", total_bytes), ("half cached", total_bytes // 2)]:
+            cache = ArtifactCache(max_bytes=max_bytes)
+            for ticker in tickers:
+                read_from_cache(cache, ticker, by_ticker[ticker])
+            measure(label, requests, lambda ticker: read_from_cache(cache, ticker, by_ticker[ticker]))
+            print(f"  {cache.stats()}")
+    finally:
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    run_benchmark()
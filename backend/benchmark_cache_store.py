@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark the scraper cache stores: JSON files against the SQLite database.
+
+Copies every entry in ../data/cache into a scratch SQLite database, then
+times a full-universe scan (every entry, through get_many) and random single
+reads on each store, with p50/p99 latency for the reads.
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from cache_store import FileCacheStore, SQLiteCacheStore
+
+CACHE_DIR = "../data/cache"
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def measure_scan(label, store, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        keys = store.keys()
+        entries = store.get_many(keys)
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<8} scan of {len(entries)} entries: "
+          f"best={min(samples):8.1f}ms  mean={statistics.mean(samples):8.1f}ms")
+
+def measure_reads(label, store, requests):
+    samples = []
+    for ticker, data_type in requests:
+        start = time.perf_counter()
+        store.get(ticker, data_type)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    print(f"{label:<8} random reads: p50={percentile(samples, 50):8.1f}us  "
+          f"p99={percentile(samples, 99):8.1f}us  mean={statistics.mean(samples):8.1f}us")
+
+def run_benchmark(scan_rounds: int = 5, reads: int = 20000):
+    files = FileCacheStore(CACHE_DIR)
+    keys = sorted(files.keys())
+    requests = [random.choice(keys) for _ in range(reads)]
+
+    with tempfile.TemporaryDirectory() as scratch:
+        database = SQLiteCacheStore(os.path.join(scratch, "cache.db"))
+        start = time.perf_counter()
+        entries = files.get_many(keys)
+        database.put_many((ticker, data_type, data, mtime)
+                          for (ticker, data_type), (_, mtime, data) in entries.items())
+        print(f"Imported {len(entries)} entries into SQLite in {time.perf_counter() - start:.2f}s\n")
+
+        measure_scan("files", files, scan_rounds)
+        measure_scan("sqlite", database, scan_rounds)
+        print()
+        measure_reads("files", files, requests)
+        measure_reads("sqlite", database, requests)
+
+if __name__ == "__main__":
+    run_benchmark()
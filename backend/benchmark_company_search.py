@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark /api/companies search: indexed CompanyIndex vs the old linear scan.
+
+Uses ../data/nyse_stocks.json padded with synthetic listings up to 10k+ companies.
+"""
+import json
+import os
+import random
+import string
+import time
+
+from company_index import CompanyIndex, DEFAULT_COMPANIES, STOCK_FILE
+
+UNIVERSE_SIZE = 12_000
+QUERIES = ["a", "ap", "app", "apple", "micro", "tech", "bank", "nv", "zzzz", "corp", "holdings", "x", "kar", "telvex"]
+SYLLABLES = ["ka", "ro", "mi", "tel", "vex", "dor", "an", "qu", "li", "zen", "gra", "pho", "tri", "sol", "ne", "bri"]
+SUFFIXES = ["Inc.", "Corp.", "Holdings", "Group", "Technologies", "Bancorp", "Therapeutics", "Energy", "Systems"]
+SECTORS = ["Technology", "Financials", "Healthcare", "Energy", "Industrials", "Consumer Staples"]
+
+def load_universe():
+    companies = DEFAULT_COMPANIES
+    if os.path.exists(STOCK_FILE):
+        with open(STOCK_FILE, 'r') as f:
+            companies = json.load(f).get('stocks', [])
+
+    companies = list(companies)
+    rng = random.Random(42)
+    while len(companies) < UNIVERSE_SIZE:
+        ticker = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 5)))
+        stem = "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))).title()
+        name = f"{stem} {rng.choice(SUFFIXES)}"
+        companies.append({
+            "ticker": ticker,
+            "name": name,
+            "sector": rng.choice(SECTORS),
+            "market_cap": rng.randint(10**7, 10**12)
+        })
+    return companies
+
+def linear_search(all_stocks, search, limit=10):
+    """The /api/companies filter before the index existed"""
+    search_lower = search.lower()
+    filtered_stocks = [
+        stock for stock in all_stocks
+        if search_lower in stock['ticker'].lower() or
+           search_lower in stock['name'].lower() or
+           (stock.get('sector') and search_lower in stock['sector'].lower())
+    ]
+    return filtered_stocks[:limit], len(filtered_stocks)
+
+def time_per_query(run, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in QUERIES:
+            run(query)
+    return (time.perf_counter() - start) / (rounds * len(QUERIES)) * 1_000_000
+
+def run_benchmark(rounds: int = 50):
+    companies = load_universe()
+
+    start = time.perf_counter()
+    index = CompanyIndex(stock_file="/nonexistent")
+    index.build(companies)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"Universe: {len(companies)} companies, index built in {build_ms:.0f} ms\n")
+
+    for query in QUERIES:
+        _, linear_total = linear_search(companies, query)
+        _, indexed_total = index.search(query, limit=10)
+        assert linear_total == indexed_total, f"{query}: {linear_total} != {indexed_total}"
+
+    linear_us = time_per_query(lambda q: linear_search(companies, q), rounds)
+    indexed_us = time_per_query(lambda q: index.search(q, limit=10), rounds)
+    # Same queries again, each as a first-time (uncached) query
+    cold_index_us = time_per_query(lambda q: (index.snapshot.match_cache.clear(), index.search(q, limit=10)), rounds)
+    print(f"linear scan   {linear_us:10.1f} us/query")
+    print(f"indexed       {indexed_us:10.1f} us/query  ({linear_us / indexed_us:.0f}x faster)")
+    print(f"indexed cold  {cold_index_us:10.1f} us/query  ({linear_us / cold_index_us:.0f}x faster)")
+
+    print("\nPer query (indexed, first call / repeated):")
+    for query in QUERIES:
+        index.snapshot.match_cache.clear()
+        start = time.perf_counter()
+        index.search(query, limit=10)
+        cold_us = (time.perf_counter() - start) * 1_000_000
+        start = time.perf_counter()
+        for _ in range(rounds):
+            index.search(query, limit=10)
+        warm_us = (time.perf_counter() - start) / rounds * 1_000_000
+        print(f"  {query!r:<10} {cold_us:8.1f} us  {warm_us:8.1f} us")
+
+if __name__ == "__main__":
+    run_benchmark()
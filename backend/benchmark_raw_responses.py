@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark requests/sec of one API worker with raw-bytes responses on and off.
+
+Serves copies of the ../data/cache earnings summaries (as transcripts) and
+historical data from a temporary directory through the FastAPI app in-process,
+with everything already in the artifact cache, so the numbers isolate the
+validate/encode cost that RAW_RESPONSES skips.
+"""
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+from cache_format import decode, unwrap
+from config import settings
+
+CACHE_DIR = "../data/cache"
+# endpoint -> (artifact, source file suffix in ../data/cache)
+ENDPOINTS = {
+    "/api/transcripts/{ticker}": ("transcript", "_earnings_summary.json"),
+    "/api/historical/{ticker}": ("historical", "_historical.json"),
+}
+
+def stage_artifacts(directory: str):
+    """Copy cached data into directory and point the API's artifact paths at it"""
+    tickers = set()
+    for artifact, suffix in ENDPOINTS.values():
+        main.ARTIFACT_PATHS[artifact] = os.path.join(directory, f"{{ticker}}_{artifact}.json")
+        for name in os.listdir(CACHE_DIR):
+            if name.endswith(suffix):
+                ticker = name[:-len(suffix)]
+                with open(os.path.join(CACHE_DIR, name), 'rb') as f:
+                    _, data = unwrap(decode(f.read()), 0)
+                with open(main.artifact_path(ticker, artifact), 'w') as f:
+                    json.dump(data, f, indent=2)
+                tickers.add(ticker)
+    main.index_artifacts()
+    return sorted(tickers)
+
+def measure(client, label: str, requests):
+    start = time.perf_counter()
+    for url in requests:
+        response = client.get(url, headers={"Accept-Encoding": "identity"})
+        assert response.status_code == 200, f"{url}: {response.status_code}"
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {len(requests) / elapsed:8.0f} req/s  ({elapsed / len(requests) * 1_000_000:7.1f} us/request)")
+    return len(requests) / elapsed
+
+def run_benchmark(requests_per_mode: int = 3000):
+    directory = tempfile.mkdtemp(prefix="investor-edge-bench-")
+    try:
+        tickers = stage_artifacts(directory)
+        urls = [
+            endpoint.format(ticker=ticker)
+            for endpoint, (artifact, _) in ENDPOINTS.items()
+            for ticker in tickers
+            if os.path.exists(main.artifact_path(ticker, artifact))
+        ]
+        requests = [random.choice(urls) for _ in range(requests_per_mode)]
+        print(f"Benchmarking {len(requests)} requests per mode over {len(urls)} URLs\n")
+
+        results = {}
+        with TestClient(main.app) as client:
+            for label, raw in [("validated", False), ("raw", True)]:
+                settings.raw_responses = raw
+                # Warm the artifact cache (and the payloads, in raw mode) before timing
+                for url in urls:
+                    client.get(url, headers={"Accept-Encoding": "identity"})
+                results[label] = measure(client, label, requests)
+
+        print(f"\nraw / validated: {results['raw'] / results['validated']:.2f}x")
+        print(f"Cache stats: {main.artifact_cache.stats()}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    run_benchmark()
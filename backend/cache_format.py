@@ -0,0 +1,168 @@
+"""
+On-disk encoding of scraper cache entries: compact JSON or msgpack, optionally zstd-compressed.
+
+Binary encodings start with a marker naming the codec and compression, so
+entries in any format, including pretty-printed JSON from before this
+module existed, load whatever CACHE_FORMAT is set to now.
+
+CacheManager stores each entry wrapped with a header (see wrap) that records
+when it was fetched, when it expires, where it came from and the entry schema
+version, so freshness does not depend on file mtimes.
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from config import settings
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Marker, then one byte for the codec and one for the compression
+MAGIC = b"\x89IEC"
+CODECS = {"json": b"j", "msgpack": b"m"}
+COMPRESSIONS = {"none": b"-", "zstd": b"z"}
+
+# Decimal places kept per kind of number; None keeps full precision.
+# Money is in millions of dollars where ImprovedHistoricalScraper fetched it,
+# so it keeps 3 places (to the thousand dollars), not whole units
+PRECISION = {
+    "money": 3,
+    "per_share": 4,
+    "percent": 2,
+}
+
+# Field name -> kind of number it holds
+FIELD_KINDS = {
+    "revenue": "money",
+    "earnings": "money",
+    "eps_actual": "per_share",
+    "eps_estimate": "per_share",
+    "price_on_date": "per_share",
+    "surprise_percent": "percent",
+    "revenue_growth": "percent",
+    "earnings_growth": "percent",
+    "avg_revenue_growth": "percent",
+    "avg_earnings_surprise": "percent",
+}
+
+# Trend series -> kind of number in their "value" fields
+TREND_KINDS = {
+    "revenue_trend": "money",
+    "eps_trend": "per_share",
+}
+
+# Version of the entry header; bump when the stored layout of entries changes
+ENTRY_SCHEMA_VERSION = 1
+
+# Key of the header in a wrapped entry
+HEADER_KEY = "_entry"
+
+def wrap(data: Any, fetched_at: float, expires_at: float, source: Optional[str]) -> Dict[str, Any]:
+    """data with its header, as stored"""
+    return {
+        HEADER_KEY: {
+            "fetched_at": fetched_at,
+            "expires_at": expires_at,
+            "source": source,
+            "schema_version": ENTRY_SCHEMA_VERSION
+        },
+        "data": data
+    }
+
+def unwrap(value: Any, mtime: float) -> Tuple[Dict[str, Any], Any]:
+    """(header, data) of a stored entry.
+
+    Entries written before headers existed get one with schema_version 0,
+    no expires_at, and fetched_at from their "cached_at" field if they
+    have one, else from mtime.
+    """
+    if isinstance(value, dict) and HEADER_KEY in value:
+        return value[HEADER_KEY], value["data"]
+    fetched_at = mtime
+    if isinstance(value, dict) and isinstance(value.get("cached_at"), str):
+        try:
+            fetched_at = datetime.fromisoformat(value["cached_at"]).timestamp()
+        except ValueError:
+            pass
+    source = value.get("source") if isinstance(value, dict) else None
+    return {"fetched_at": fetched_at, "expires_at": None, "source": source, "schema_version": 0}, value
+
+def _rounded(data: Any, value_kind: Optional[str] = None) -> Any:
+    # value_kind is the kind of the "value" fields inside a trend series
+    if isinstance(data, list):
+        return [_rounded(item, value_kind) for item in data]
+    if not isinstance(data, dict):
+        return data
+    rounded = {}
+    for key, value in data.items():
+        kind = value_kind if key == "value" else FIELD_KINDS.get(key)
+        places = PRECISION.get(kind)
+        if isinstance(value, float) and places is not None:
+            rounded[key] = round(value, places)
+        else:
+            rounded[key] = _rounded(value, TREND_KINDS.get(key))
+    return rounded
+
+def apply_precision(data: Any) -> Any:
+    """Copy of data with money, per-share and percentage fields rounded to PRECISION; CACHE_PRECISION=full keeps it all"""
+    if settings.cache_precision == "full":
+        return data
+    return _rounded(data)
+
+def encode(data: Any, codec: Optional[str] = None, compression: Optional[str] = None) -> bytes:
+    """Serialize data in codec ("json" or "msgpack") with compression ("none" or "zstd").
+
+    Defaults to CACHE_FORMAT and CACHE_COMPRESSION. Uncompressed JSON is
+    written compact and without a marker, so it stays readable by any JSON tool.
+    """
+    codec = codec or settings.cache_format
+    compression = compression or settings.cache_compression
+    if codec == "msgpack" and msgpack is None:
+        codec = "json"
+    if compression == "zstd" and zstandard is None:
+        compression = "none"
+
+    if codec == "msgpack":
+        payload = msgpack.packb(data, use_bin_type=True)
+    else:
+        payload = json.dumps(data, separators=(",", ":")).encode()
+    if compression == "none" and codec == "json":
+        return payload
+    if compression == "zstd":
+        payload = zstandard.ZstdCompressor(level=10).compress(payload)
+    return MAGIC + CODECS[codec] + COMPRESSIONS[compression] + payload
+
+def decode(raw: bytes) -> Any:
+    """Parse bytes written by encode(), or plain JSON; raises ValueError if they do not parse"""
+    if not raw.startswith(MAGIC):
+        return json.loads(raw)
+    codec, compression = raw[len(MAGIC):len(MAGIC) + 1], raw[len(MAGIC) + 1:len(MAGIC) + 2]
+    payload = raw[len(MAGIC) + 2:]
+    if compression == COMPRESSIONS["zstd"]:
+        if zstandard is None:
+            raise ValueError("Cache entry is zstd-compressed but zstandard is not installed")
+        try:
+            payload = zstandard.ZstdDecompressor().decompress(payload)
+        except zstandard.ZstdError as e:
+            raise ValueError(f"Corrupt zstd cache entry: {e}")
+    elif compression != COMPRESSIONS["none"]:
+        raise ValueError(f"Unknown cache entry compression {compression!r}")
+
+    if codec == CODECS["json"]:
+        return json.loads(payload)
+    if codec == CODECS["msgpack"]:
+        if msgpack is None:
+            raise ValueError("Cache entry is msgpack but msgpack is not installed")
+        try:
+            return msgpack.unpackb(payload, raw=False)
+        except Exception as e:
+            raise ValueError(f"Corrupt msgpack cache entry: {e}")
+    raise ValueError(f"Unknown cache entry codec {codec!r}")
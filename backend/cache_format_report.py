@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Compare scraper cache encodings on the real cache: size on disk, time to load every entry, and deploy size.
+
+Every entry in ../data/cache is encoded in each format (with CACHE_PRECISION
+rounding applied, as CacheManager saves them) and decoded back. The deploy
+size is a gzipped tarball of the encoded files, which is what gets copied to
+the server by deploy_cache.sh. Nothing on disk is changed; run
+`python cache_migrate.py rewrite` to re-encode the cache in the configured format.
+"""
+import io
+import tarfile
+import time
+
+from cache_format import apply_precision, decode, encode, msgpack, zstandard
+from cache_store import FileCacheStore
+
+CACHE_DIR = "../data/cache"
+BLOCK_SIZE = 4096
+
+def format_bytes(size: int) -> str:
+    for unit in ["B", "KB", "MB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def tarball_size(files) -> int:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, raw in files:
+            info = tarfile.TarInfo(name)
+            info.size = len(raw)
+            tar.addfile(info, io.BytesIO(raw))
+    return buffer.tell()
+
+def measure(label, files, rounds: int = 5):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _, raw in files:
+            decode(raw)
+        samples.append((time.perf_counter() - start) * 1000)
+    size = sum(len(raw) for _, raw in files)
+    # Space the files take up, in whole filesystem blocks
+    allocated = sum(-(-len(raw) // BLOCK_SIZE) * BLOCK_SIZE for _, raw in files)
+    print(f"{label:<22} {format_bytes(size):>10} {format_bytes(allocated):>10}  "
+          f"{min(samples):7.1f}ms  {format_bytes(tarball_size(files)):>10}")
+
+def run_report():
+    store = FileCacheStore(CACHE_DIR)
+    current = []
+    entries = {}
+    for ticker, data_type in sorted(store.keys()):
+        name = f"{ticker}_{data_type}.json"
+        with open(store.path(ticker, data_type), 'rb') as f:
+            raw = f.read()
+        current.append((name, raw))
+        entries[name] = decode(raw)
+    print(f"{len(entries)} entries in {CACHE_DIR}\n")
+    print(f"{'format':<22} {'bytes':>10} {'on disk':>10}  {'load all':>9}  {'deploy':>10}")
+
+    measure("current files", current)
+    rounded = {name: apply_precision(data) for name, data in entries.items()}
+    formats = [("json", "none")]
+    if zstandard is not None:
+        formats.append(("json", "zstd"))
+    if msgpack is not None:
+        formats += [("msgpack", "none")] + ([("msgpack", "zstd")] if zstandard is not None else [])
+    for codec, compression in formats:
+        label = codec if codec != "json" else "compact json"
+        if compression != "none":
+            label += f" + {compression}"
+        measure(label, [(name, encode(data, codec, compression)) for name, data in rounded.items()])
+
+if __name__ == "__main__":
+    run_report()
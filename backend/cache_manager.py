@@ -1,50 +1,362 @@
-import json
-import os
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Iterable, List, Tuple
+from atomic_io import read_retrying
+from cache_format import HEADER_KEY, apply_precision, unwrap, wrap
+from cache_store import CacheStore, Entry, FileCacheStore, create_store
+from change_feed import change_feed
+from config import settings
+from coordination import coordinator
+from disk_quota import disk_quota
+from executors import fill_executor
+from ttl_policy import ttl_hours
 
 class CacheManager:
-    def __init__(self, cache_dir: str = "../data/cache"):
-        self.cache_dir = cache_dir
-        os.makedirs(cache_dir, exist_ok=True)
+    """Scraper cache: entries in a store (see cache_store.py), fronted by an in-memory LRU tier.
+
+    The default store is JSON files in cache_dir. The memory tier is bounded
+    by entry count and by the serialized size of its entries, and each entry
+    is checked against the store's version of it, so a write by another
+    process or script is never hidden. save_to_cache writes through both tiers.
+
+    Entries are stored with a header (cache_format.wrap) giving the time they
+    were fetched and expire, so freshness survives copying the files around.
+    Expiry times are also recorded in the coordinator database, shared with
+    other processes and scripts: on every write, and for the entries already
+    in the store by one scan the first time build_expiry_index() runs, so
+    expiring() never lists the store.
+
+    Writes and hits are recorded for the "cache" disk quota, which evicts
+    entries through delete().
+    """
+
+    def __init__(self, cache_dir: str = "../data/cache", stale_grace_hours: float = 24,
+                 memory_entries: int = 1024, memory_bytes: int = 64 * 1024 * 1024,
+                 store: Optional[CacheStore] = None):
+        self.store = store if store is not None else FileCacheStore(cache_dir)
+        self.stale_grace_hours = stale_grace_hours
+        self.memory_entries = memory_entries
+        self.memory_bytes = memory_bytes
+        # (ticker, data_type) -> (store version, header, parsed data), least recently used first
+        self.memory: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], Dict[str, Any], Any]]" = OrderedDict()
+        self.memory_used = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        # (ticker, data_type) -> background refresh in progress
+        self.refreshing: Dict[Tuple[str, str], Future] = {}
+        # Entries handed out stale and not refreshed since
+        self.stale_served: Dict[Tuple[str, str], float] = {}
+        self.refresh_listeners: List[Callable[[str, str, Dict[str, Any]], None]] = []
+        self.lock = threading.Lock()
+        
+    def get_cached_data(self, ticker: str, data_type: str, cache_hours: Optional[float] = None,
+                        refresh: Optional[Callable[[], Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+        """Get data from cache if valid.
         
-    def get_cache_path(self, ticker: str, data_type: str) -> str:
-        return os.path.join(self.cache_dir, f"{ticker}_{data_type}.json")
+        Entries expire at the expires_at in their header, or cache_hours after
+        they were fetched if cache_hours is given. Entries without an
+        expires_at use the TTL of data_type in ttl_policy.
+        
+        With refresh (stale-while-revalidate), an entry that expired less than
+        stale_grace_hours ago is still returned, and refresh is run once in the
+        background to fetch and save a fresh copy.
+        """
+        entry = self._read(ticker, data_type)
+        if entry is None:
+            with self.lock:
+                self.misses += 1
+            return None
+        header, data, tier = entry
+        now = time.time()
+        expires_at = self._expires_at(data_type, header, cache_hours)
+        
+        if now < expires_at:
+            self._count_hit(tier)
+            disk_quota.record_access("cache", quota_key(ticker, data_type))
+            return data
+        
+        if refresh is not None and now < expires_at + self.stale_grace_hours * 3600:
+            self._count_hit(tier)
+            disk_quota.record_access("cache", quota_key(ticker, data_type))
+            with self.lock:
+                self.stale_served[(ticker, data_type)] = header["fetched_at"]
+            self.schedule_refresh(ticker, data_type, refresh)
+            return data
+        
+        with self.lock:
+            # Too old to ever be served again; keep the memory tier for live entries
+            self._forget((ticker, data_type))
+            self.misses += 1
+        return None
     
-    def is_cache_valid(self, filepath: str, hours: int = 1) -> bool:
-        """Check if cache file exists and is recent enough"""
-        if not os.path.exists(filepath):
-            return False
+    @staticmethod
+    def _expires_at(data_type: str, header: Dict[str, Any], cache_hours: Optional[float] = None) -> float:
+        if cache_hours is not None:
+            return header["fetched_at"] + cache_hours * 3600
+        if header.get("expires_at") is not None:
+            return header["expires_at"]
+        return header["fetched_at"] + ttl_hours(data_type) * 3600
+    
+    def _read(self, ticker: str, data_type: str) -> Optional[Tuple[Dict[str, Any], Any, str]]:
+        """(header, parsed data, tier it came from) of an entry, or None if it is missing or unreadable.
+        
+        The returned data is shared between callers and must not be mutated.
+        """
+        key = (ticker, data_type)
+        version = self.store.version(ticker, data_type)
+        if version is None:
+            with self.lock:
+                self._forget(key)
+            return None
         
-        file_time = os.path.getmtime(filepath)
-        current_time = time.time()
-        age_hours = (current_time - file_time) / 3600
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None and entry[0] == version:
+                self.memory.move_to_end(key)
+                return entry[1], entry[2], "memory"
         
-        return age_hours < hours
+        try:
+            entry = read_retrying(lambda: self.store.get(ticker, data_type))
+        except ValueError:
+            # Still unparseable after retries: keep serving the last good copy rather than refetch
+            print(f"Unreadable {data_type} cache entry for {ticker}")
+            with self.lock:
+                entry = self.memory.get(key)
+            return (entry[1], entry[2], "memory") if entry is not None else None
+        if entry is None:
+            return None
+        header, data = self._loaded(key, entry)
+        return header, data, "disk"
     
-    def get_cached_data(self, ticker: str, data_type: str, cache_hours: int = 1) -> Optional[Dict[str, Any]]:
-        """Get data from cache if valid"""
-        cache_path = self.get_cache_path(ticker, data_type)
+    def _loaded(self, key: Tuple[str, str], entry: Entry) -> Tuple[Dict[str, Any], Any]:
+        """Unwrap an entry read from the store, and record it in the memory tier"""
+        version, mtime, value = entry
+        header, data = unwrap(value, mtime)
+        self._remember(key, version, header, data)
+        return header, data
+    
+    def get_many(self, keys: Iterable[Tuple[str, str]],
+                 cache_hours: Optional[float] = None) -> Dict[Tuple[str, str], Any]:
+        """Fresh entries for many (ticker, data_type) keys, read from the store in one batch.
         
-        if self.is_cache_valid(cache_path, cache_hours):
-            try:
-                with open(cache_path, 'r') as f:
-                    return json.load(f)
-            except:
-                pass
+        Like get_cached_data without refresh: expired and missing keys are left
+        out. Meant for scans, so it skips the memory tier and refills it instead.
+        """
+        keys = list(keys)
+        entries = self.store.get_many(keys)
+        now = time.time()
+        results = {}
+        for key in keys:
+            entry = entries.get(key)
+            if entry is not None:
+                header, data = self._loaded(key, entry)
+                if now < self._expires_at(key[1], header, cache_hours):
+                    self._count_hit("disk")
+                    results[key] = data
+                    continue
+            with self.lock:
+                self.misses += 1
+        return results
+    
+    def build_expiry_index(self, batch: int = 200) -> int:
+        """Record the expiry of the entries written before expiry was recorded; returns how many were read.
         
-        return None
+        Reads every entry in the store, so it only runs while the coordinator
+        has not been seeded; later calls return 0 without reading anything.
+        """
+        if coordinator.expiry_seeded():
+            return 0
+        keys = self.store.keys()
+        items = []
+        for start in range(0, len(keys), batch):
+            for key, entry in self.store.get_many(keys[start:start + batch]).items():
+                version, mtime, value = entry
+                header, _ = unwrap(value, mtime)
+                items.append((key[0], key[1], self._expires_at(key[1], header)))
+        coordinator.expiry_seed(items)
+        return len(items)
     
-    def save_to_cache(self, ticker: str, data_type: str, data: Dict[str, Any]):
-        """Save data to cache"""
-        cache_path = self.get_cache_path(ticker, data_type)
+    def expiring(self, within_hours: float, limit: Optional[int] = None) -> List[Tuple[float, str, str]]:
+        """(expires_at, ticker, data_type) of entries that expire in the next within_hours, soonest first.
         
+        Includes entries that have already expired. Looked up in the
+        coordinator's expiry index, seeded first if no process has done so.
+        """
+        self.build_expiry_index()
+        return coordinator.expiring(time.time() + within_hours * 3600, limit)
+    
+    def _count_hit(self, tier: str):
+        with self.lock:
+            if tier == "memory":
+                self.memory_hits += 1
+            else:
+                self.disk_hits += 1
+    
+    def _remember(self, key: Tuple[str, str], version: Tuple[int, int], header: Dict[str, Any], data: Any):
+        size = version[1]
+        with self.lock:
+            self._forget(key)
+            if size > self.memory_bytes:
+                return
+            self.memory[key] = (version, header, data)
+            self.memory_used += size
+            while len(self.memory) > self.memory_entries or self.memory_used > self.memory_bytes:
+                _, (evicted_version, _, _) = self.memory.popitem(last=False)
+                self.memory_used -= evicted_version[1]
+    
+    def _forget(self, key: Tuple[str, str]):
+        """Drop key from the memory tier; call with self.lock held"""
+        entry = self.memory.pop(key, None)
+        if entry is not None:
+            self.memory_used -= entry[0][1]
+    
+    def schedule_refresh(self, ticker: str, data_type: str, refresh: Callable[[], Dict[str, Any]]):
+        """Run refresh in the background unless one is already running for this entry"""
+        key = (ticker, data_type)
+        with self.lock:
+            if key in self.refreshing:
+                return
+            self.refreshing[key] = fill_executor.submit(self._run_refresh, key, refresh)
+    
+    def _run_refresh(self, key: Tuple[str, str], refresh: Callable[[], Dict[str, Any]]):
+        ticker, data_type = key
+        lock_name = f"refresh:{ticker}:{data_type}"
+        token = None
+        try:
+            # Another worker process may already be refreshing this entry
+            token = coordinator.try_lock(lock_name, settings.fill_lock_ttl)
+            if token is None:
+                return
+            with coordinator.lease(lock_name, token, settings.fill_lock_ttl):
+                data = refresh()
+                print(f"Refreshed stale {data_type} cache for {ticker}")
+                for listener in self.refresh_listeners:
+                    listener(ticker, data_type, data)
+        except Exception as e:
+            print(f"Error refreshing {data_type} cache for {ticker}: {getattr(e, 'detail', e)}")
+        finally:
+            if token is not None:
+                coordinator.release_lock(lock_name, token)
+            with self.lock:
+                self.refreshing.pop(key, None)
+    
+    def add_refresh_listener(self, listener: Callable[[str, str, Dict[str, Any]], None]):
+        """Call listener(ticker, data_type, data) after each successful background refresh"""
+        self.refresh_listeners.append(listener)
+    
+    def stale_age(self, ticker: str, data_type: str) -> Optional[int]:
+        """Age in seconds of an entry last served stale, or None if it has been refreshed since.
+        
+        Checked against the fetched_at of the entry now in the store, so a
+        refresh saved by another worker process is seen as well, and a failed
+        or skipped refresh leaves the entry flagged only while it is still stale.
+        """
+        key = (ticker, data_type)
+        with self.lock:
+            fetched_at = self.stale_served.get(key)
+        if fetched_at is None:
+            return None
+        entry = self._read(ticker, data_type)
+        if entry is None or entry[0]["fetched_at"] != fetched_at:
+            with self.lock:
+                if self.stale_served.get(key) == fetched_at:
+                    del self.stale_served[key]
+            return None
+        return max(0, int(time.time() - fetched_at))
+    
+    def save_to_cache(self, ticker: str, data_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Save data to cache; returns it as stored (rounded to CACHE_PRECISION)"""
+        return self.save_many([(ticker, data_type, data)])[0]
+    
+    def save_many(self, items: Iterable[Tuple[str, str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Save (ticker, data_type, data) entries, in one transaction where the store supports it.
+        
+        Each is stamped as fetched now, expiring after the TTL of its data_type.
+        Returns the data of each as stored, so a fresh fetch reads the same as
+        later cache hits.
+        """
+        now = time.time()
+        entries = []
+        for ticker, data_type, data in items:
+            data = apply_precision(data)
+            source = data.get("source") if isinstance(data, dict) else None
+            entries.append((ticker, data_type, wrap(data, now, now + ttl_hours(data_type) * 3600, source), None))
+        try:
+            written = self.store.put_many(entries)
+        except Exception as e:
+            print(f"Error saving cache for {', '.join(sorted({ticker for ticker, _, _, _ in entries}))}: {e}")
+            return [value["data"] for _, _, value, _ in entries]
+        disk_quota.record_writes("cache", [
+            (quota_key(ticker, data_type), ticker, version[1])
+            for (ticker, data_type, _, _), (version, _) in zip(entries, written)
+        ])
         try:
-            with open(cache_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            coordinator.expiry_record([
+                (ticker, data_type, value[HEADER_KEY]["expires_at"]) for ticker, data_type, value, _ in entries
+            ])
         except Exception as e:
-            print(f"Error saving cache for {ticker}: {e}")
+            print(f"Error recording cache expiry: {e}")
+        for (ticker, data_type, value, _), (version, _) in zip(entries, written):
+            header = value[HEADER_KEY]
+            self._remember((ticker, data_type), version, header, value["data"])
+            with self.lock:
+                self.stale_served.pop((ticker, data_type), None)
+            change_feed.notify(ticker, data_type, source="cache")
+        return [value["data"] for _, _, value, _ in entries]
+    
+    def keys(self) -> List[Tuple[str, str]]:
+        """Every (ticker, data_type) in the store, fresh or not"""
+        return self.store.keys()
+    
+    def delete(self, ticker: str, data_type: str):
+        """Remove an entry from the store, the memory tier and the expiry index"""
+        self.store.delete(ticker, data_type)
+        with self.lock:
+            self._forget((ticker, data_type))
+            self.stale_served.pop((ticker, data_type), None)
+        coordinator.expiry_remove(ticker, data_type)
+    
+    def quota_items(self) -> List[Tuple[str, str, int, float]]:
+        """(quota key, ticker, size, mtime) of every entry, for the disk quota's first count"""
+        return [(quota_key(ticker, data_type), ticker, size, mtime)
+                for (ticker, data_type), size, mtime in self.store.sizes()]
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-tier hit counts: served from memory, read from disk, or missing/expired"""
+        expiry_entries, next_expiry = coordinator.expiry_stats()
+        with self.lock:
+            total = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "backend": self.store.name,
+                "memory_entries": len(self.memory),
+                "max_memory_entries": self.memory_entries,
+                "memory_bytes": self.memory_used,
+                "max_memory_bytes": self.memory_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_hit_rate": round(self.memory_hits / total, 4) if total else 0.0,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / total, 4) if total else 0.0,
+                "expiry_index_entries": expiry_entries,
+                "next_expiry": next_expiry
+            }
+
+def quota_key(ticker: str, data_type: str) -> str:
+    """Key of a cache entry in the disk quota"""
+    return f"{ticker}/{data_type}"
+
+def evict_quota_key(key: str):
+    ticker, _, data_type = key.partition("/")
+    cache_manager.delete(ticker, data_type)
 
 # Global cache manager instance
-cache_manager = CacheManager()
\ No newline at end of file
+cache_manager = CacheManager(
+    store=create_store(settings.cache_backend, db_path=settings.cache_db),
+    stale_grace_hours=settings.cache_stale_grace_hours,
+    memory_entries=settings.scraper_cache_entries,
+    memory_bytes=settings.scraper_cache_mb * 1024 * 1024
+)
\ No newline at end of file
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Copy the scraper cache between the JSON file layout and the SQLite store, keeping each entry's mtime.
+
+Usage:
+    python cache_migrate.py import   # ../data/cache/*.json -> CACHE_DB
+    python cache_migrate.py export   # CACHE_DB -> ../data/cache/*.json
+    python cache_migrate.py rewrite  # re-encode the CACHE_BACKEND store in place
+
+Then set CACHE_BACKEND to the destination's backend ("sqlite" after an
+import, "files" after an export). The source is left as it was. Entries are
+written in CACHE_FORMAT / CACHE_COMPRESSION at CACHE_PRECISION, so rewrite
+converts an existing cache after those settings change.
+"""
+import sys
+
+from cache_format import apply_precision
+from cache_store import FileCacheStore, SQLiteCacheStore
+from config import settings
+
+CACHE_DIR = "../data/cache"
+# Entries per batch read from the source and written to the destination
+BATCH = 200
+
+def copy_entries(source, destination) -> int:
+    keys = sorted(source.keys())
+    copied = 0
+    for start in range(0, len(keys), BATCH):
+        entries = source.get_many(keys[start:start + BATCH])
+        destination.put_many(
+            (ticker, data_type, apply_precision(data), mtime)
+            for (ticker, data_type), (_, mtime, data) in sorted(entries.items())
+        )
+        copied += len(entries)
+    skipped = len(keys) - copied
+    print(f"Copied {copied} entries" + (f", skipped {skipped} unreadable" if skipped else ""))
+    return copied
+
+def main(argv):
+    if len(argv) != 2 or argv[1] not in ("import", "export", "rewrite"):
+        print(__doc__)
+        return 1
+    files = FileCacheStore(CACHE_DIR)
+    database = SQLiteCacheStore(settings.cache_db)
+    if argv[1] == "import":
+        print(f"Importing {CACHE_DIR} into {settings.cache_db}")
+        copy_entries(files, database)
+    elif argv[1] == "export":
+        print(f"Exporting {settings.cache_db} to {CACHE_DIR}")
+        copy_entries(database, files)
+    else:
+        store = database if settings.cache_backend == "sqlite" else files
+        print(f"Rewriting the {store.name} cache as {settings.cache_format}/{settings.cache_compression}")
+        copy_entries(store, store)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,237 @@
+"""
+Storage backends for the scraper cache: one file per entry, or a single SQLite database.
+
+Both hold the latest copy of each (ticker, data_type) entry, encoded by
+cache_format, with its mtime and a version that changes on every write,
+which is how CacheManager's memory tier knows its copy is current. The SQLite store keeps the whole cache in one WAL
+database, so scans of the full universe and bulk imports are a few queries
+instead of a thousand file opens.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from atomic_io import atomic_write
+from cache_format import decode, encode
+from config import settings
+
+Key = Tuple[str, str]
+# (ticker, data_type, data, mtime or None for now)
+Item = Tuple[str, str, Any, Optional[float]]
+# Changes on every write; the second part is the serialized size of the entry
+Version = Tuple[int, int]
+# (version, mtime, parsed data)
+Entry = Tuple[Version, float, Any]
+
+# Files kept in the cache directory that are not entries
+NOT_ENTRIES = {"prefetch_status.json"}
+
+class FileCacheStore:
+    """Entries as {ticker}_{data_type}.json files in cache_dir, written atomically.
+
+    The name is kept whatever CACHE_FORMAT is, so switching formats rewrites
+    entries in place as they are saved.
+    """
+
+    name = "files"
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, ticker: str, data_type: str) -> str:
+        return os.path.join(self.cache_dir, f"{ticker}_{data_type}.json")
+
+    def version(self, ticker: str, data_type: str) -> Optional[Version]:
+        try:
+            stat = os.stat(self.path(ticker, data_type))
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self, ticker: str, data_type: str) -> Optional[Entry]:
+        """The entry, or None if it is missing; raises ValueError if the file does not parse"""
+        try:
+            with open(self.path(ticker, data_type), 'rb') as f:
+                # Version taken from the open file, so it always describes the bytes parsed
+                stat = os.fstat(f.fileno())
+                raw = f.read()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size), stat.st_mtime, decode(raw)
+
+    def get_many(self, keys: Iterable[Key]) -> Dict[Key, Entry]:
+        entries = {}
+        for ticker, data_type in keys:
+            try:
+                entry = self.get(ticker, data_type)
+            except ValueError:
+                continue
+            if entry is not None:
+                entries[(ticker, data_type)] = entry
+        return entries
+
+    def put(self, ticker: str, data_type: str, data: Any, mtime: Optional[float] = None) -> Tuple[Version, float]:
+        path = self.path(ticker, data_type)
+        atomic_write(path, encode(data), mtime_ns=round(mtime * 1e9) if mtime is not None else None)
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size), stat.st_mtime
+
+    def put_many(self, items: Iterable[Item]) -> List[Tuple[Version, float]]:
+        return [self.put(ticker, data_type, data, mtime) for ticker, data_type, data, mtime in items]
+
+    def keys(self) -> List[Key]:
+        """Every (ticker, data_type) in the store"""
+        keys = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json") or name.startswith(".") or name in NOT_ENTRIES:
+                continue
+            ticker, sep, data_type = name[:-len(".json")].partition("_")
+            if sep:
+                keys.append((ticker, data_type))
+        return keys
+
+    def delete(self, ticker: str, data_type: str):
+        try:
+            os.unlink(self.path(ticker, data_type))
+        except FileNotFoundError:
+            pass
+
+    def sizes(self) -> List[Tuple[Key, int, float]]:
+        """(key, stored size, mtime) of every entry"""
+        sizes = []
+        for ticker, data_type in self.keys():
+            try:
+                stat = os.stat(self.path(ticker, data_type))
+            except OSError:
+                continue
+            sizes.append(((ticker, data_type), stat.st_size, stat.st_mtime))
+        return sizes
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    ticker TEXT NOT NULL,
+    data_type TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (ticker, data_type)
+);
+-- Last version handed out; continues from the highest existing one in databases created before it
+CREATE TABLE IF NOT EXISTS cache_sequence (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO cache_sequence (name, value) SELECT 'version', COALESCE(MAX(version), 0) FROM cache_entries;
+"""
+
+# Keys per query in get_many, under SQLite's bound-parameter limit
+BATCH_SIZE = 400
+
+class SQLiteCacheStore:
+    """Entries as rows of one SQLite database in WAL mode, shared by all worker processes.
+
+    Each write takes the next version from a store-wide counter, so a reader
+    needs one indexed lookup, not a file stat, to tell whether its in-memory
+    copy is current. Versions are never reused, even by an entry that was
+    deleted and written again.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, and a new one after a fork (gunicorn --preload)
+        conn = getattr(self.local, "conn", None)
+        if conn is None or self.local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=" + ("FULL" if settings.fsync_policy == "full" else "NORMAL"))
+            conn.executescript(SCHEMA)
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def version(self, ticker: str, data_type: str) -> Optional[Version]:
+        row = self._connection().execute(
+            "SELECT version, length(data) FROM cache_entries WHERE ticker = ? AND data_type = ?",
+            (ticker, data_type)
+        ).fetchone()
+        return tuple(row) if row is not None else None
+
+    def get(self, ticker: str, data_type: str) -> Optional[Entry]:
+        row = self._connection().execute(
+            "SELECT version, mtime, data FROM cache_entries WHERE ticker = ? AND data_type = ?",
+            (ticker, data_type)
+        ).fetchone()
+        if row is None:
+            return None
+        version, mtime, data = row
+        return (version, len(data)), mtime, decode(data)
+
+    def get_many(self, keys: Iterable[Key]) -> Dict[Key, Entry]:
+        keys = list(keys)
+        conn = self._connection()
+        entries = {}
+        for start in range(0, len(keys), BATCH_SIZE):
+            batch = keys[start:start + BATCH_SIZE]
+            placeholders = ", ".join(["(?, ?)"] * len(batch))
+            rows = conn.execute(
+                "SELECT ticker, data_type, version, mtime, data FROM cache_entries "
+                f"WHERE (ticker, data_type) IN (VALUES {placeholders})",
+                [part for key in batch for part in key]
+            )
+            for ticker, data_type, version, mtime, data in rows:
+                entries[(ticker, data_type)] = ((version, len(data)), mtime, decode(data))
+        return entries
+
+    def put(self, ticker: str, data_type: str, data: Any, mtime: Optional[float] = None) -> Tuple[Version, float]:
+        return self.put_many([(ticker, data_type, data, mtime)])[0]
+
+    def put_many(self, items: Iterable[Item]) -> List[Tuple[Version, float]]:
+        """Write items in one transaction"""
+        conn = self._connection()
+        results = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for ticker, data_type, data, mtime in items:
+                raw = encode(data)
+                mtime = time.time() if mtime is None else mtime
+                version, = conn.execute(
+                    "UPDATE cache_sequence SET value = value + 1 WHERE name = 'version' RETURNING value"
+                ).fetchone()
+                conn.execute(
+                    "INSERT INTO cache_entries (ticker, data_type, version, mtime, data) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (ticker, data_type) DO UPDATE SET "
+                    "version = excluded.version, mtime = excluded.mtime, data = excluded.data",
+                    (ticker, data_type, version, mtime, raw)
+                )
+                results.append(((version, len(raw)), mtime))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return results
+
+    def keys(self) -> List[Key]:
+        return [tuple(row) for row in self._connection().execute("SELECT ticker, data_type FROM cache_entries")]
+
+    def delete(self, ticker: str, data_type: str):
+        self._connection().execute("DELETE FROM cache_entries WHERE ticker = ? AND data_type = ?", (ticker, data_type))
+
+    def sizes(self) -> List[Tuple[Key, int, float]]:
+        rows = self._connection().execute("SELECT ticker, data_type, length(data), mtime FROM cache_entries")
+        return [((ticker, data_type), size, mtime) for ticker, data_type, size, mtime in rows]
+
+CacheStore = Union[FileCacheStore, SQLiteCacheStore]
+
+def create_store(backend: str, cache_dir: str = "../data/cache", db_path: str = "../data/cache.db") -> CacheStore:
+    """The store for a CACHE_BACKEND setting: "files" or "sqlite" """
+    if backend == "sqlite":
+        return SQLiteCacheStore(db_path)
+    if backend == "files":
+        return FileCacheStore(cache_dir)
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -0,0 +1,120 @@
+"""
+Push notifications of artifact and cache changes to subscribed clients, so they do not poll
+"""
+import asyncio
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Set
+
+from coordination import Coordinator, coordinator
+from executors import run_io
+
+# Changes queued for one subscriber before it is told to resync instead
+SUBSCRIBER_QUEUE_SIZE = 64
+
+# Seconds between reads of the shared log for changes made by other processes
+CHANGE_POLL_INTERVAL = 1.0
+
+class Subscription:
+    def __init__(self, tickers: Set[str]):
+        self.tickers = tickers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        # Set when changes were dropped because the client fell behind
+        self.overflowed = False
+
+class ChangeFeed:
+    """Fans out change notifications to the subscriptions for each ticker.
+
+    notify() may be called from any thread or process, including offline
+    scripts: the change is appended to the coordinator's log, delivered
+    straight away to subscribers in this process, and picked up by the relay
+    of every other worker. Subscriptions are indexed by ticker, so a change
+    costs one queue put per interested client and idle clients cost nothing.
+    """
+
+    def __init__(self, coordinator: Coordinator):
+        self.coordinator = coordinator
+        self.subscribers: Dict[str, Set[Subscription]] = {}
+        self.subscriptions = 0
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.last_seq = 0
+        self.delivered = 0
+        self.overflows = 0
+        self.lock = threading.Lock()
+
+    def _origin(self) -> str:
+        return f"{os.getpid()}:{id(self)}"
+
+    def subscribe(self, tickers: Iterable[str]) -> Subscription:
+        """Register a client for tickers; call from the event loop"""
+        subscription = Subscription(set(tickers))
+        for ticker in subscription.tickers:
+            self.subscribers.setdefault(ticker, set()).add(subscription)
+        self.subscriptions += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions -= 1
+        for ticker in subscription.tickers:
+            subscribers = self.subscribers.get(ticker)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscribers[ticker]
+
+    def notify(self, ticker: str, artifact: str, source: str = "artifact"):
+        """Announce that artifact (or, with source="cache", a scraper cache entry) changed for ticker"""
+        change = {
+            "ticker": ticker,
+            "artifact": artifact,
+            "source": source,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }
+        try:
+            self.coordinator.add_change(self._origin(), change)
+        except Exception as e:
+            print(f"Error logging change for {ticker}: {e}")
+        with self.lock:
+            loop = self.loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._dispatch, change)
+
+    def _dispatch(self, change: Dict[str, Any]):
+        for subscription in list(self.subscribers.get(change["ticker"], ())):
+            try:
+                subscription.queue.put_nowait(change)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                if not subscription.overflowed:
+                    self.overflows += 1
+                subscription.overflowed = True
+
+    async def relay(self):
+        """Deliver changes logged by other processes; runs for the life of the worker"""
+        with self.lock:
+            self.loop = asyncio.get_running_loop()
+        self.last_seq = await run_io(self.coordinator.last_change)
+        origin = self._origin()
+        while True:
+            await asyncio.sleep(CHANGE_POLL_INTERVAL)
+            try:
+                changes = await run_io(self.coordinator.changes_since, self.last_seq)
+            except Exception as e:
+                print(f"Error reading change log: {e}")
+                continue
+            for seq, change_origin, change in changes:
+                self.last_seq = seq
+                if change_origin != origin:
+                    self._dispatch(change)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscriptions": self.subscriptions,
+            "subscribed_tickers": len(self.subscribers),
+            "changes_delivered": self.delivered,
+            "subscriber_overflows": self.overflows
+        }
+
+# Global change feed instance
+change_feed = ChangeFeed(coordinator)
@@ -0,0 +1,231 @@
+"""
+In-memory search index over the stock universe used by /api/companies
+"""
+import base64
+import heapq
+import json
+import os
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+STOCK_FILE = "../data/nyse_stocks.json"
+
+# Used when ../data/nyse_stocks.json has not been generated yet
+DEFAULT_COMPANIES = [
+    {"ticker": "AAPL", "name": "Apple Inc.", "sector": "Technology", "market_cap": 3000000000000},
+    {"ticker": "MSFT", "name": "Microsoft Corporation", "sector": "Technology", "market_cap": 2800000000000},
+    {"ticker": "GOOGL", "name": "Alphabet Inc.", "sector": "Technology", "market_cap": 1800000000000},
+    {"ticker": "AMZN", "name": "Amazon.com Inc.", "sector": "Consumer Discretionary", "market_cap": 1700000000000},
+    {"ticker": "META", "name": "Meta Platforms Inc.", "sector": "Technology", "market_cap": 1200000000000},
+    {"ticker": "TSLA", "name": "Tesla Inc.", "sector": "Consumer Discretionary", "market_cap": 800000000000},
+    {"ticker": "NVDA", "name": "NVIDIA Corporation", "sector": "Technology", "market_cap": 1100000000000},
+    {"ticker": "JPM", "name": "JPMorgan Chase & Co.", "sector": "Financials", "market_cap": 500000000000},
+    {"ticker": "JNJ", "name": "Johnson & Johnson", "sector": "Healthcare", "market_cap": 450000000000},
+    {"ticker": "WMT", "name": "Walmart Inc.", "sector": "Consumer Staples", "market_cap": 400000000000}
+]
+
+# Longest n-gram kept in the postings; longer queries intersect their 3-grams
+MAX_GRAM = 3
+
+# Recent substring match sets kept per index build (type-ahead repeats queries a lot)
+MATCH_CACHE_SIZE = 256
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(offset: int, query: str, sector: Optional[str] = None) -> str:
+    raw = json.dumps({"o": offset, "q": query, "s": (sector or "").lower()}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, query: str, sector: Optional[str] = None) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw)
+        offset = int(state["o"])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+    if state.get("q") != query or state.get("s") != (sector or "").lower() or offset < 0:
+        raise InvalidCursor("Cursor does not belong to this search")
+    return offset
+
+class IndexSnapshot(NamedTuple):
+    companies: List[Dict[str, Any]]
+    haystacks: List[str]
+    ticker_exact: Dict[str, int]
+    ticker_keys: List[str]
+    ticker_ids: List[int]
+    token_keys: List[str]
+    token_ids: List[int]
+    grams: Dict[str, Set[int]]
+    sectors: Dict[str, List[int]]
+    match_cache: "OrderedDict[str, Set[int]]"
+
+class CompanyIndex:
+    """Companies are numbered by descending market cap, so smaller ids rank higher.
+
+    The snapshot holds:
+    - ticker_keys/ticker_ids: tickers sorted for exact and prefix lookups
+    - token_keys/token_ids: name words sorted for word-prefix lookups
+    - grams: 1..3-character substrings of ticker/name/sector -> ids, which
+      answers the same substring matches the old linear scan did
+    - sectors: lowercase sector -> ids
+    """
+
+    def __init__(self, stock_file: str = STOCK_FILE):
+        self.stock_file = stock_file
+        self.version: Optional[Tuple[int, int]] = None
+        self.lock = threading.Lock()
+        self.build([])
+
+    def _file_version(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.stock_file)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def is_current(self) -> bool:
+        return self.version is not None and self.version == (self._file_version() or (0, 0))
+
+    def load(self):
+        """(Re)build the index from the stock file, or the default list if there is none"""
+        with self.lock:
+            version = self._file_version()
+            if self.version is not None and self.version == (version or (0, 0)):
+                return
+            companies = DEFAULT_COMPANIES
+            if version is not None:
+                with open(self.stock_file, 'r') as f:
+                    companies = json.load(f).get('stocks', [])
+            self.build(companies)
+            self.version = version or (0, 0)
+
+    def build(self, companies: List[Dict[str, Any]]):
+        ordered = sorted(companies, key=lambda c: -(c.get('market_cap') or 0))
+
+        haystacks = []
+        ticker_exact: Dict[str, int] = {}
+        tickers = []
+        tokens = []
+        grams: Dict[str, Set[int]] = {}
+        sectors: Dict[str, List[int]] = {}
+        for company_id, company in enumerate(ordered):
+            ticker = (company.get('ticker') or '').lower()
+            name = (company.get('name') or '').lower()
+            sector = (company.get('sector') or '').lower()
+
+            # NUL never appears in a query, so matches cannot span two fields
+            haystacks.append(f"{ticker}\0{name}\0{sector}")
+            ticker_exact.setdefault(ticker, company_id)
+            tickers.append((ticker, company_id))
+            tokens.extend((token, company_id) for token in set(TOKEN_RE.findall(name)))
+            if sector:
+                sectors.setdefault(sector, []).append(company_id)
+            for text in (ticker, name, sector):
+                for n in range(1, MAX_GRAM + 1):
+                    for i in range(len(text) - n + 1):
+                        grams.setdefault(text[i:i + n], set()).add(company_id)
+
+        tickers.sort()
+        tokens.sort()
+        # Swapped in with a single assignment so concurrent searches see a consistent index
+        self.snapshot = IndexSnapshot(
+            companies=ordered,
+            haystacks=haystacks,
+            ticker_exact=ticker_exact,
+            ticker_keys=[key for key, _ in tickers],
+            ticker_ids=[company_id for _, company_id in tickers],
+            token_keys=[key for key, _ in tokens],
+            token_ids=[company_id for _, company_id in tokens],
+            grams=grams,
+            sectors=sectors,
+            match_cache=OrderedDict()
+        )
+
+    def _prefix_ids(self, keys: List[str], ids: List[int], prefix: str) -> List[int]:
+        lo = bisect_left(keys, prefix)
+        hi = bisect_left(keys, prefix + "\uffff", lo)
+        return ids[lo:hi]
+
+    def _substring_ids(self, snapshot: IndexSnapshot, query: str) -> Set[int]:
+        if len(query) <= MAX_GRAM:
+            return snapshot.grams.get(query, set())
+
+        cached = snapshot.match_cache.get(query)
+        if cached is not None:
+            return cached
+
+        postings = []
+        for i in range(len(query) - MAX_GRAM + 1):
+            ids = snapshot.grams.get(query[i:i + MAX_GRAM])
+            if not ids:
+                return set()
+            postings.append(ids)
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        haystacks = snapshot.haystacks
+        matches = {company_id for company_id in candidates if query in haystacks[company_id]}
+
+        snapshot.match_cache[query] = matches
+        if len(snapshot.match_cache) > MATCH_CACHE_SIZE:
+            snapshot.match_cache.popitem(last=False)
+        return matches
+
+    def search(self, query: Optional[str] = None, offset: int = 0, limit: int = 10,
+               sector: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """One page of matching companies and the total match count.
+
+        Ranking: exact ticker, ticker prefix, name word prefix, then any other
+        ticker/name/sector substring match; ties are broken by market cap.
+        """
+        snapshot = self.snapshot
+        query = (query or '').strip().lower()
+        wanted = offset + limit
+        sector_ids = snapshot.sectors.get(sector.lower(), []) if sector else None
+
+        if not query:
+            ids = sector_ids if sector_ids is not None else range(len(snapshot.companies))
+            page = list(ids[offset:wanted])
+            return [snapshot.companies[i] for i in page], len(ids)
+
+        matches = self._substring_ids(snapshot, query)
+        if sector_ids is not None:
+            matches = matches.intersection(sector_ids)
+
+        exact = snapshot.ticker_exact.get(query)
+        tiers = [
+            [exact] if exact is not None else [],
+            self._prefix_ids(snapshot.ticker_keys, snapshot.ticker_ids, query),
+            self._prefix_ids(snapshot.token_keys, snapshot.token_ids, query),
+        ]
+
+        ranked: List[int] = []
+        seen: Set[int] = set()
+        for tier in tiers:
+            if len(ranked) >= wanted:
+                break
+            # Prefix hits are always substring hits, unless a sector filter removed them
+            if sector_ids is None:
+                candidates = set(tier)
+            else:
+                candidates = {company_id for company_id in tier if company_id in matches}
+            for company_id in heapq.nsmallest(wanted - len(ranked) + len(seen), candidates):
+                if company_id not in seen and len(ranked) < wanted:
+                    ranked.append(company_id)
+                    seen.add(company_id)
+
+        if len(ranked) < wanted:
+            for company_id in heapq.nsmallest(wanted - len(ranked) + len(seen), matches):
+                if company_id not in seen and len(ranked) < wanted:
+                    ranked.append(company_id)
+                    seen.add(company_id)
+
+        return [snapshot.companies[i] for i in ranked[offset:wanted]], len(matches)
+
+# Global company index instance
+company_index = CompanyIndex()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Report bytes saved by precompressed gzip/brotli variants of the served JSON artifacts.
+
+Usage:
+    python compression_report.py           # report only
+    python compression_report.py --write   # also write missing/stale variants
+"""
+import glob
+import json
+import os
+import sys
+
+from precompressed import compress, negotiate, write_variants
+from schemas import render_artifact
+
+# Directory glob -> artifact name used to shape the served response
+SOURCES = [
+    ("../data/summaries/*_latest.json", "summary"),
+    ("../data/transcripts/*_latest.json", "transcript"),
+    ("../data/analyses/*_latest_analysis.json", "analysis"),
+    ("../data/historical/*_history.json", "historical"),
+]
+
+def format_bytes(size: int) -> str:
+    for unit in ["B", "KB", "MB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def run_report(write: bool = False):
+    totals = {"files": 0, "on_disk": 0, "compact": 0}
+    written = 0
+
+    for pattern, artifact in SOURCES:
+        for path in sorted(glob.glob(pattern)):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            try:
+                payload = render_artifact(data, artifact)
+            except Exception as e:
+                print(f"Skipping {path}: {e}")
+                continue
+
+            totals["files"] += 1
+            totals["on_disk"] += os.path.getsize(path)
+            totals["compact"] += len(payload)
+            for encoding, body in compress(payload).items():
+                totals[encoding] = totals.get(encoding, 0) + len(body)
+
+            if write and negotiate(path, "br, gzip") is None:
+                write_variants(path, data, artifact)
+                written += 1
+
+    if not totals["files"]:
+        print("No cached JSON found")
+        return
+
+    on_disk = totals["on_disk"]
+    print(f"Files:              {totals['files']}")
+    print(f"Pretty JSON (disk): {format_bytes(on_disk)}")
+    for label, key in [("Compact JSON", "compact"), ("gzip -9", "gzip"), ("brotli q11", "br")]:
+        if key in totals:
+            saved = on_disk - totals[key]
+            print(f"{label + ':':<20}{format_bytes(totals[key])}  (saves {format_bytes(saved)}, {saved / on_disk:.1%})")
+    if write:
+        print(f"\nWrote variants for {written} files")
+
+if __name__ == "__main__":
+    run_report(write="--write" in sys.argv)
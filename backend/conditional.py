@@ -0,0 +1,69 @@
+"""
+HTTP validators (ETag / Last-Modified) and conditional GET handling
+"""
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+# (etag, last modified unix time) for a response
+Validators = Tuple[str, float]
+
+# Compressed representations get their own strong ETag: "<hash>-<encoding>"
+ENCODING_SUFFIXES = ("-br", "-gzip")
+
+def combine_validators(parts: Iterable[Tuple[str, float]]) -> Validators:
+    """Strong validators for a response built from one or more artifacts"""
+    parts = list(parts)
+    if len(parts) == 1:
+        digest = parts[0][0]
+    else:
+        digest = hashlib.sha256("|".join(p[0] for p in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"', max(p[1] for p in parts)
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    return f'{etag[:-1]}-{encoding}"'
+
+def _strip_encoding(etag: str) -> str:
+    for suffix in ENCODING_SUFFIXES:
+        if etag.endswith(suffix + '"'):
+            return etag[:-len(suffix) - 1] + '"'
+    return etag
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no ETag was sent (RFC 7232)"""
+    etag, last_modified = validators
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # GET uses the weak comparison, so ignore any W/ prefix
+        candidates = [_strip_encoding(tag.strip().removeprefix("W/")) for tag in if_none_match.split(",")]
+        return etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+
+    return False
+
+def set_validators(response: Response, validators: Optional[Validators]):
+    if validators is None:
+        return
+    etag, last_modified = validators
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(last_modified)
+
+def not_modified(validators: Validators) -> Response:
+    response = Response(status_code=304)
+    set_validators(response, validators)
+    return response
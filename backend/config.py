@@ -16,7 +16,79 @@ class Settings(BaseSettings):
     
     # Environment
     environment: str = os.getenv("ENVIRONMENT", "development")
-    
+
+    # In-process cache of parsed artifacts (summaries, transcripts, analyses, historical) and their rendered responses
+    artifact_cache_mb: int = int(os.getenv("ARTIFACT_CACHE_MB", "64"))
+
+    # Serve cached artifacts as pre-rendered JSON bytes; "false" re-validates through the response models per request
+    raw_responses: bool = os.getenv("RAW_RESPONSES", "true").lower() == "true"
+
+    # Hours past expiry that a cache entry is still served while it is refreshed in the background
+    cache_stale_grace_hours: float = float(os.getenv("CACHE_STALE_GRACE_HOURS", "24"))
+
+    # Scraper cache store: "files" (JSON files in ../data/cache) or "sqlite" (one WAL database at CACHE_DB)
+    cache_backend: str = os.getenv("CACHE_BACKEND", "files")
+    cache_db: str = os.getenv("CACHE_DB", "../data/cache.db")
+    # Encoding of scraper cache entries (see cache_format.py): "json" (compact) or "msgpack", "none" or "zstd"
+    cache_format: str = os.getenv("CACHE_FORMAT", "json")
+    cache_compression: str = os.getenv("CACHE_COMPRESSION", "none")
+    # "rounded" stores money, per-share and percentage fields at the precision in cache_format.PRECISION; "full" keeps them as fetched
+    cache_precision: str = os.getenv("CACHE_PRECISION", "rounded")
+
+    # Memory tier in front of the scraper cache store: entries and total stored size of their data
+    scraper_cache_entries: int = int(os.getenv("SCRAPER_CACHE_ENTRIES", "1024"))
+    scraper_cache_mb: int = int(os.getenv("SCRAPER_CACHE_MB", "64"))
+
+    # Hours data stays fresh, in the scraper cache and in HTTP caches (see ttl_policy.py)
+    earnings_ttl_hours: float = float(os.getenv("EARNINGS_TTL_HOURS", "168"))
+    historical_ttl_hours: float = float(os.getenv("HISTORICAL_TTL_HOURS", "24"))
+    analysis_ttl_hours: float = float(os.getenv("ANALYSIS_TTL_HOURS", "168"))
+    # Hours a CDN may keep serving a cached response while the API is failing
+    stale_if_error_hours: float = float(os.getenv("STALE_IF_ERROR_HOURS", "168"))
+
+    # Disk quotas under ../data in MB (see disk_quota.py); 0 records usage without evicting
+    scraper_cache_quota_mb: int = int(os.getenv("SCRAPER_CACHE_QUOTA_MB", "256"))
+    artifact_quota_mb: int = int(os.getenv("ARTIFACT_QUOTA_MB", "512"))
+    analysis_history_quota_mb: int = int(os.getenv("ANALYSIS_HISTORY_QUOTA_MB", "64"))
+    # Which items go first when a class is over quota: "lru" (least recently read) or "lfu" (least often read)
+    eviction_policy: str = os.getenv("EVICTION_POLICY", "lru")
+    # Seconds between quota sweeps
+    quota_sweep_interval: int = int(os.getenv("QUOTA_SWEEP_INTERVAL", "60"))
+    # Tickers kept fresh by prefetch_data.py; their files are never evicted
+    priority_stocks: List[str] = [
+        "AAPL", "MSFT", "GOOGL", "AMZN", "META", "TSLA", "NVDA",
+        "JPM", "JNJ", "WMT", "SOFI", "HIMS", "AMD", "PLTR", "V",
+        "MA", "PG", "HD", "DIS", "ADBE", "CRM", "NFLX", "PFE"
+    ]
+
+    # Durability of atomic file writes: "none", "file" (fsync before rename) or "full" (also fsync the directory)
+    fsync_policy: str = os.getenv("FSYNC_POLICY", "file")
+
+    # Memory-mapped index of pre-rendered response bodies, shared by all workers through the page cache
+    warm_index_path: str = os.getenv("WARM_INDEX_PATH", "../data/warm_index.bin")
+
+    # Thread pools for blocking work (scrape/LLM fills and artifact file I/O)
+    fill_workers: int = int(os.getenv("FILL_WORKERS", "8"))
+    io_workers: int = int(os.getenv("IO_WORKERS", "4"))
+
+    # Background jobs (POST /api/jobs): concurrent jobs and attempts before a job is marked failed
+    job_workers: int = int(os.getenv("JOB_WORKERS", "4"))
+    job_max_attempts: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    # Seconds between checks for active jobs whose worker process died (once its lock on them expires)
+    job_reclaim_interval: int = int(os.getenv("JOB_RECLAIM_INTERVAL", "60"))
+
+    # SQLite database (WAL mode) shared by all worker processes: rate budget, fill locks, stats
+    coordination_db: str = os.getenv("COORDINATION_DB", "../data/coordination.db")
+    # Seconds a cross-process lock outlives its holder: held locks are renewed every third of this, so a
+    # worker that dies loses its fills, jobs and refreshes to another worker within this long
+    fill_lock_ttl: int = int(os.getenv("FILL_LOCK_TTL", "300"))
+
+    # Admission control for cold fills: concurrent runs and queued requests per cost class
+    scrape_concurrency: int = int(os.getenv("SCRAPE_CONCURRENCY", "4"))
+    scrape_queue_depth: int = int(os.getenv("SCRAPE_QUEUE_DEPTH", "16"))
+    llm_concurrency: int = int(os.getenv("LLM_CONCURRENCY", "2"))
+    llm_queue_depth: int = int(os.getenv("LLM_QUEUE_DEPTH", "8"))
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,16 @@
+"""
+Shared test fixtures: tests never write to the coordination database under ../data.
+"""
+import threading
+
+import pytest
+
+from coordination import coordinator
+
+@pytest.fixture(autouse=True)
+def coordination_db(tmp_path, monkeypatch):
+    """Point the global coordinator, and every module holding it, at a scratch database"""
+    monkeypatch.setattr(coordinator, "path", str(tmp_path / "coordination.db"))
+    # Connections are per thread; a fresh local makes every thread reconnect to the new path
+    monkeypatch.setattr(coordinator, "local", threading.local())
+    return coordinator
@@ -0,0 +1,333 @@
+"""
+State shared by all API worker processes on one host, kept in a SQLite database in WAL mode.
+
+Provides the shared upstream rate budget, cross-process fill locks and
+aggregated cache/fill counters, so running several uvicorn/gunicorn workers
+does not multiply the request rate to Yahoo or duplicate cold fills. Also
+holds the change log, the size and access record of every file under a
+disk quota, and the expiry time of every scraper cache entry.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_events (key TEXT NOT NULL, ts REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS rate_events_key_ts ON rate_events (key, ts);
+CREATE TABLE IF NOT EXISTS locks (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT NOT NULL, ts REAL NOT NULL, change TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS changes_ts ON changes (ts);
+CREATE TABLE IF NOT EXISTS quota_items (
+    class TEXT NOT NULL, key TEXT NOT NULL, ticker TEXT NOT NULL, size INTEGER NOT NULL,
+    last_access REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (class, key)
+);
+CREATE INDEX IF NOT EXISTS quota_items_lru ON quota_items (class, last_access);
+CREATE INDEX IF NOT EXISTS quota_items_lfu ON quota_items (class, hits, last_access);
+CREATE TABLE IF NOT EXISTS quota_usage (class TEXT PRIMARY KEY, bytes INTEGER NOT NULL, seeded INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS cache_expiry (
+    ticker TEXT NOT NULL, data_type TEXT NOT NULL, expires_at REAL NOT NULL, PRIMARY KEY (ticker, data_type)
+);
+CREATE INDEX IF NOT EXISTS cache_expiry_time ON cache_expiry (expires_at);
+CREATE TABLE IF NOT EXISTS cache_expiry_seeded (seeded_at REAL NOT NULL);
+"""
+
+# Seconds a change stays in the log for workers that have not read it yet
+CHANGE_RETENTION = 3600
+
+class Coordinator:
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, and a new one after a fork (gunicorn --preload)
+        conn = getattr(self.local, "conn", None)
+        if conn is None or self.local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction; BEGIN IMMEDIATE takes the write lock up front so check-then-write is atomic"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def try_acquire_rate(self, key: str, max_requests: int, time_window: float) -> float:
+        """Record a request against the shared budget for key.
+
+        Returns 0 if the request may go ahead, otherwise the seconds until a
+        slot frees up (nothing is recorded in that case).
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM rate_events WHERE key = ? AND ts <= ?", (key, now - time_window))
+            count, oldest = conn.execute(
+                "SELECT COUNT(*), MIN(ts) FROM rate_events WHERE key = ?", (key,)
+            ).fetchone()
+            if count < max_requests:
+                conn.execute("INSERT INTO rate_events (key, ts) VALUES (?, ?)", (key, now))
+                return 0.0
+        return max(0.0, oldest + time_window - now)
+
+    def try_lock(self, name: str, ttl: float) -> Optional[str]:
+        """Take the named lock for up to ttl seconds; returns a token for release_lock, or None if held.
+
+        The ttl is a lease: a lock left behind by a crashed worker expires on its own.
+        """
+        token = f"{os.getpid()}:{uuid.uuid4().hex}"
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT expires FROM locks WHERE name = ?", (name,)).fetchone()
+            if row is not None and row[0] > now:
+                return None
+            conn.execute(
+                "INSERT OR REPLACE INTO locks (name, owner, expires) VALUES (?, ?, ?)",
+                (name, token, now + ttl)
+            )
+        return token
+
+    def renew_lock(self, name: str, token: str, ttl: float) -> bool:
+        """Extend a held lock to ttl seconds from now; False if it expired and someone else took it"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE locks SET expires = ? WHERE name = ? AND owner = ?", (time.time() + ttl, name, token)
+            )
+            return cursor.rowcount == 1
+
+    @contextmanager
+    def lease(self, name: str, token: str, ttl: float):
+        """Renew a held lock every ttl/3 seconds while the block runs.
+
+        Renewal runs on its own thread, so a fill blocked in a slow scrape or
+        LLM call keeps its lock however long it takes, and a crashed worker's
+        lock still expires within ttl.
+        """
+        stop = threading.Event()
+
+        def renew():
+            while not stop.wait(ttl / 3):
+                try:
+                    if not self.renew_lock(name, token, ttl):
+                        print(f"Lost lock {name}: its lease expired before it was renewed")
+                        return
+                except Exception as e:
+                    print(f"Error renewing lock {name}: {e}")
+
+        thread = threading.Thread(target=renew, name=f"lease:{name}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+
+    def release_lock(self, name: str, token: str):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM locks WHERE name = ? AND owner = ?", (name, token))
+
+    def is_locked(self, name: str) -> bool:
+        row = self._connection().execute("SELECT expires FROM locks WHERE name = ?", (name,)).fetchone()
+        return row is not None and row[0] > time.time()
+
+    def add_counts(self, counts: Dict[str, int]):
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                [(name, value) for name, value in counts.items() if value]
+            )
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self._connection().execute("SELECT name, value FROM counters").fetchall())
+
+    def add_change(self, origin: str, change: Dict[str, Any]) -> int:
+        """Append change to the log shared by all processes; returns its sequence number"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM changes WHERE ts < ?", (now - CHANGE_RETENTION,))
+            cursor = conn.execute(
+                "INSERT INTO changes (origin, ts, change) VALUES (?, ?, ?)", (origin, now, json.dumps(change))
+            )
+            return cursor.lastrowid
+
+    def changes_since(self, seq: int) -> List[Tuple[int, str, Dict[str, Any]]]:
+        """(seq, origin, change) of every logged change after seq, oldest first"""
+        rows = self._connection().execute(
+            "SELECT seq, origin, change FROM changes WHERE seq > ? ORDER BY seq", (seq,)
+        ).fetchall()
+        return [(row_seq, origin, json.loads(change)) for row_seq, origin, change in rows]
+
+    def last_change(self) -> int:
+        return self._connection().execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+
+    def quota_record_writes(self, quota_class: str, items: List[Tuple[str, str, int]]):
+        """Record (key, ticker, size) items as just written, keeping the class's byte total in step.
+
+        A rewrite keeps the item's hit count: refreshing a popular entry must
+        not make it the first LFU victim.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            delta = 0
+            for key, ticker, size in items:
+                row = conn.execute(
+                    "SELECT size FROM quota_items WHERE class = ? AND key = ?", (quota_class, key)
+                ).fetchone()
+                delta += size - (row[0] if row is not None else 0)
+                conn.execute(
+                    "INSERT INTO quota_items (class, key, ticker, size, last_access) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (class, key) DO UPDATE SET size = excluded.size, last_access = excluded.last_access",
+                    (quota_class, key, ticker, size, now)
+                )
+            self._add_usage(conn, quota_class, delta)
+
+    def _add_usage(self, conn: sqlite3.Connection, quota_class: str, delta: int):
+        conn.execute(
+            "INSERT INTO quota_usage (class, bytes, seeded) VALUES (?, ?, 0) "
+            "ON CONFLICT (class) DO UPDATE SET bytes = bytes + excluded.bytes",
+            (quota_class, delta)
+        )
+
+    def quota_record_accesses(self, accesses: List[Tuple[str, str, int, float]]):
+        """Add (class, key, hits, last access time) to items already recorded; unknown keys are ignored"""
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE quota_items SET hits = hits + ?, last_access = MAX(last_access, ?) WHERE class = ? AND key = ?",
+                [(hits, last_access, quota_class, key) for quota_class, key, hits, last_access in accesses]
+            )
+
+    def quota_seed(self, quota_class: str, items: List[Tuple[str, str, int, float]]):
+        """Record the (key, ticker, size, last access) items already on disk, once per class"""
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO quota_items (class, key, ticker, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                [(quota_class, key, ticker, size, last_access) for key, ticker, size, last_access in items]
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM quota_items WHERE class = ?", (quota_class,)).fetchone()[0]
+            conn.execute(
+                "INSERT OR REPLACE INTO quota_usage (class, bytes, seeded) VALUES (?, ?, 1)", (quota_class, total)
+            )
+
+    def quota_usage(self, quota_class: str) -> Tuple[int, bool]:
+        """(bytes recorded, whether the files already on disk have been seeded) for a class"""
+        row = self._connection().execute(
+            "SELECT bytes, seeded FROM quota_usage WHERE class = ?", (quota_class,)
+        ).fetchone()
+        return (row[0], bool(row[1])) if row is not None else (0, False)
+
+    def quota_victims(self, quota_class: str, policy: str, pinned: List[str], limit: int) -> List[Tuple[str, int, float]]:
+        """(key, size, last access) of the items to evict first: least recently or, for "lfu", least often used.
+
+        Walks an index from its low end, so the cost depends on how many are
+        returned (plus any pinned items skipped), not on how many there are.
+        """
+        order = "hits, last_access" if policy == "lfu" else "last_access"
+        placeholders = ", ".join("?" * len(pinned))
+        return self._connection().execute(
+            f"SELECT key, size, last_access FROM quota_items WHERE class = ? AND ticker NOT IN ({placeholders}) "
+            f"ORDER BY {order} LIMIT ?",
+            (quota_class, *pinned, limit)
+        ).fetchall()
+
+    def quota_evict(self, quota_class: str, key: str, last_access: float, evict: Callable[[str], None]) -> bool:
+        """Run evict(key) and forget the item, unless it was written or read since last_access.
+
+        evict runs inside the write transaction, so no write can be recorded
+        between the check and the delete. If it raises, the item stays
+        recorded and the exception propagates.
+        """
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT size, last_access FROM quota_items WHERE class = ? AND key = ?", (quota_class, key)
+            ).fetchone()
+            if row is None or row[1] != last_access:
+                return False
+            evict(key)
+            conn.execute("DELETE FROM quota_items WHERE class = ? AND key = ?", (quota_class, key))
+            self._add_usage(conn, quota_class, -row[0])
+        return True
+
+    def expiry_record(self, items: List[Tuple[str, str, float]]):
+        """Record the expiry time of (ticker, data_type, expires_at) scraper cache entries just written"""
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO cache_expiry (ticker, data_type, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (ticker, data_type) DO UPDATE SET expires_at = excluded.expires_at",
+                items
+            )
+
+    def expiry_remove(self, ticker: str, data_type: str):
+        # One statement, so it also runs inside quota_evict's transaction when the disk quota evicts an entry
+        self._connection().execute("DELETE FROM cache_expiry WHERE ticker = ? AND data_type = ?", (ticker, data_type))
+
+    def expiry_seed(self, items: List[Tuple[str, str, float]]):
+        """Record the entries already in the store, once; expiry times recorded by writes are kept"""
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache_expiry (ticker, data_type, expires_at) VALUES (?, ?, ?)", items
+            )
+            conn.execute("INSERT INTO cache_expiry_seeded (seeded_at) VALUES (?)", (time.time(),))
+
+    def expiry_seeded(self) -> bool:
+        return self._connection().execute("SELECT 1 FROM cache_expiry_seeded LIMIT 1").fetchone() is not None
+
+    def expiring(self, before: float, limit: Optional[int] = None) -> List[Tuple[float, str, str]]:
+        """(expires_at, ticker, data_type) of entries expiring before the given time, soonest first.
+
+        Walks the expiry index, so the cost depends on how many are returned.
+        """
+        return self._connection().execute(
+            "SELECT expires_at, ticker, data_type FROM cache_expiry WHERE expires_at < ? "
+            "ORDER BY expires_at LIMIT ?", (before, -1 if limit is None else limit)
+        ).fetchall()
+
+    def expiry_stats(self) -> Tuple[int, Optional[float]]:
+        """(entries recorded, soonest expiry)"""
+        return self._connection().execute("SELECT COUNT(*), MIN(expires_at) FROM cache_expiry").fetchone()
+
+class SharedStats:
+    """Publishes the growth of this process's counters into the shared totals.
+
+    source() returns the process-local counters (monotonic ints); publish() adds
+    whatever they grew by since the last call.
+    """
+
+    def __init__(self, coordinator: Coordinator, source: Callable[[], Dict[str, int]]):
+        self.coordinator = coordinator
+        self.source = source
+        self.published: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def publish(self) -> Dict[str, int]:
+        """Flush local deltas and return the totals across all workers"""
+        with self.lock:
+            current = self.source()
+            deltas = {name: value - self.published.get(name, 0) for name, value in current.items()}
+            if any(deltas.values()):
+                self.coordinator.add_counts(deltas)
+            self.published = current
+        return self.coordinator.counts()
+
+# Global coordinator instance
+coordinator = Coordinator(settings.coordination_db)
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine, Column, String, Float, DateTime, Text, JSON
+from sqlalchemy import create_engine, Column, String, Float, Integer, DateTime, Text, JSON, Index
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -34,8 +35,31 @@ class EarningsSummary(Base):
     processed_at = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(String, primary_key=True)  # uuid4 hex
+    kind = Column(String, index=True)  # summary, transcript_analysis, historical
+    ticker = Column(String, index=True)
+    status = Column(String, index=True)  # queued, running, succeeded, failed
+    attempts = Column(Integer, default=0)
+    result = Column(JSON)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+# At most one queued or running job per (kind, ticker), across all worker processes
+active_jobs_index = Index("jobs_active_work", Job.kind, Job.ticker, unique=True,
+                          sqlite_where=Job.status.in_(["queued", "running"]))
+
 def init_db():
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so add the index to a jobs table created before it
+    try:
+        active_jobs_index.create(bind=engine, checkfirst=True)
+    except IntegrityError:
+        print("WARNING: duplicate active jobs in the jobs table; active jobs are not deduplicated across workers")
 
 def get_db():
     db = SessionLocal()
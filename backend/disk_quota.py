@@ -0,0 +1,168 @@
+"""
+Disk quotas for what the API keeps under ../data, with least recently/frequently used eviction.
+
+Each class of files (scraper cache entries, artifacts, analysis history) has
+a byte quota. Writes and reads are recorded in the coordinator database,
+shared by all worker processes: writes as they happen, reads buffered in
+memory and flushed in batches. The byte total of each class is kept up to
+date with every write and eviction, so a sweep never lists a directory; it
+takes victims from the low end of an index of last access (or hit count)
+and deletes them until the class is back under its quota. Items of the
+priority tickers in PRIORITY_STOCKS are never evicted.
+
+Files that existed before quotas were recorded are counted once, by a scan
+the first time a class is swept. An item's hit count survives rewrites, so
+LFU ranks entries by how often they are read, not how recently refetched.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import settings
+from coordination import coordinator
+
+# Victims fetched per query while a class is over quota
+SWEEP_BATCH = 50
+# Evictions per class per sweep; the next sweep carries on
+SWEEP_MAX_EVICTIONS = 1000
+# Fraction of the quota a class is brought down to, so a sweep is not needed after every write
+LOW_WATERMARK = 0.9
+
+# Suffixes of the precompressed variants stored next to an artifact (see precompressed.py)
+VARIANT_SUFFIXES = (".gz", ".br")
+
+def file_size(path: str) -> int:
+    """Bytes taken by a file and its precompressed variants; 0 if it is missing"""
+    size = 0
+    for candidate in (path,) + tuple(path + suffix for suffix in VARIANT_SUFFIXES):
+        try:
+            size += os.stat(candidate).st_size
+        except OSError:
+            pass
+    return size
+
+def remove_file(path: str):
+    """Delete a file and its precompressed variants"""
+    for candidate in (path,) + tuple(path + suffix for suffix in VARIANT_SUFFIXES):
+        try:
+            os.unlink(candidate)
+        except FileNotFoundError:
+            pass
+
+class QuotaClass:
+    def __init__(self, name: str, quota_bytes: int, evict: Callable[[str], None],
+                 scan: Callable[[], Iterable[Tuple[str, str, int, float]]]):
+        self.name = name
+        self.quota_bytes = quota_bytes
+        # Deletes the item with this key
+        self.evict = evict
+        # (key, ticker, size, last access) of every item on disk, for the first sweep
+        self.scan = scan
+        self.evicted = 0
+        self.evicted_bytes = 0
+
+class DiskQuota:
+    """Per-class byte quotas, enforced by sweep() evicting the least recently or frequently used items"""
+
+    def __init__(self, policy: str = "lru", pinned: Optional[List[str]] = None):
+        self.policy = policy
+        self.pinned = list(pinned or [])
+        self.classes: Dict[str, QuotaClass] = {}
+        # (class, key) -> [reads since the last flush, time of the last one]
+        self.accesses: Dict[Tuple[str, str], List[float]] = {}
+        self.lock = threading.Lock()
+
+    def register(self, name: str, quota_mb: int, evict: Callable[[str], None],
+                 scan: Callable[[], Iterable[Tuple[str, str, int, float]]]):
+        """Enforce a quota on a class of items; quota_mb 0 only records them"""
+        self.classes[name] = QuotaClass(name, quota_mb * 1024 * 1024, evict, scan)
+
+    def record_write(self, name: str, key: str, ticker: str, size: int):
+        self.record_writes(name, [(key, ticker, size)])
+
+    def record_writes(self, name: str, items: List[Tuple[str, str, int]]):
+        """Record (key, ticker, size) items as just written; a failure is logged, not raised"""
+        try:
+            coordinator.quota_record_writes(name, items)
+        except Exception as e:
+            print(f"Error recording {name} writes for the disk quota: {e}")
+
+    def record_file(self, name: str, key: str, ticker: str, path: str):
+        """Record a file (and its precompressed variants) as just written"""
+        self.record_write(name, key, ticker, file_size(path))
+
+    def record_access(self, name: str, key: str):
+        """Count a read; kept in memory until the next flush_accesses()"""
+        with self.lock:
+            access = self.accesses.setdefault((name, key), [0, 0.0])
+            access[0] += 1
+            access[1] = time.time()
+
+    def flush_accesses(self) -> int:
+        """Write the buffered reads to the coordinator; returns how many items they were for"""
+        with self.lock:
+            accesses, self.accesses = self.accesses, {}
+        if accesses:
+            coordinator.quota_record_accesses(
+                [(name, key, hits, last_access) for (name, key), (hits, last_access) in accesses.items()]
+            )
+        return len(accesses)
+
+    def sweep(self) -> Dict[str, int]:
+        """Evict from every class over its quota; returns the number evicted per class"""
+        return {name: self._sweep_class(quota_class) for name, quota_class in self.classes.items()}
+
+    def _sweep_class(self, quota_class: QuotaClass) -> int:
+        name = quota_class.name
+        used, seeded = coordinator.quota_usage(name)
+        if not seeded:
+            start = time.time()
+            coordinator.quota_seed(name, list(quota_class.scan()))
+            used, _ = coordinator.quota_usage(name)
+            print(f"Disk quota: counted {used} bytes of {name} in {time.time() - start:.1f}s")
+        if not quota_class.quota_bytes or used <= quota_class.quota_bytes:
+            return 0
+
+        target = quota_class.quota_bytes * LOW_WATERMARK
+        evicted = 0
+        while used > target and evicted < SWEEP_MAX_EVICTIONS:
+            victims = coordinator.quota_victims(name, self.policy, self.pinned, SWEEP_BATCH)
+            progressed = False
+            for key, size, last_access in victims:
+                try:
+                    # Skipped if it was written or read since it was picked
+                    if not coordinator.quota_evict(name, key, last_access, quota_class.evict):
+                        continue
+                except Exception as e:
+                    # Still recorded, so a later sweep tries it again
+                    print(f"Error evicting {name} {key}: {e}")
+                    continue
+                progressed = True
+                used -= size
+                evicted += 1
+                quota_class.evicted += 1
+                quota_class.evicted_bytes += size
+                if used <= target or evicted >= SWEEP_MAX_EVICTIONS:
+                    break
+            if not progressed:
+                # Nothing left to evict, or only items that failed or were just read; the next sweep retries
+                break
+        print(f"Disk quota: evicted {evicted} {name} items, {used} of {quota_class.quota_bytes} bytes used")
+        return evicted
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Usage and evictions by this worker, per class"""
+        stats = {}
+        for name, quota_class in self.classes.items():
+            used, _ = coordinator.quota_usage(name)
+            stats[name] = {
+                "bytes": used,
+                "quota_bytes": quota_class.quota_bytes,
+                "evicted": quota_class.evicted,
+                "evicted_bytes": quota_class.evicted_bytes,
+            }
+        return stats
+
+# Global disk quota instance
+disk_quota = DiskQuota(policy=settings.eviction_policy, pinned=settings.priority_stocks)
@@ -1,10 +1,15 @@
 import os
 import json
-from typing import Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Tuple
 from datetime import datetime
 import anthropic
 from openai import OpenAI
 from dotenv import load_dotenv
+from change_feed import change_feed
+from precompressed import write_variants
+from section_parser import JSONSectionParser
+from atomic_io import atomic_write_json
+from disk_quota import disk_quota
 
 load_dotenv()
 
@@ -17,12 +22,8 @@ class EnhancedAIEngine:
         elif provider == "openai":
             self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
     
-    def analyze_earnings_call(self, transcript: str, financial_data: str) -> Dict:
-        """
-        Comprehensive analysis of earnings call transcript including tone, topics, and insights
-        """
-        
-        prompt = f"""You are an expert financial analyst specializing in earnings call analysis. 
+    def _build_prompt(self, transcript: str, financial_data: str) -> str:
+        return f"""You are an expert financial analyst specializing in earnings call analysis. 
         Analyze the following earnings call transcript along with the financial data and provide:
 
 1. EXECUTIVE SUMMARY (3-4 sentences)
@@ -142,6 +143,13 @@ EARNINGS CALL TRANSCRIPT:
 FINANCIAL DATA:
 {financial_data}
 """
+    
+    def analyze_earnings_call(self, transcript: str, financial_data: str) -> Dict:
+        """
+        Comprehensive analysis of earnings call transcript including tone, topics, and insights
+        """
+        
+        prompt = self._build_prompt(transcript, financial_data)
         
         if self.provider == "anthropic":
             # Add JSON instruction
@@ -163,6 +171,39 @@ FINANCIAL DATA:
             )
             content = response.choices[0].message.content
         
+        return self.parse_response(content)
+    
+    def stream_earnings_call(self, transcript: str, financial_data: str) -> Iterator[str]:
+        """
+        Same analysis as analyze_earnings_call, yielding the model output as it is generated
+        """
+        prompt = self._build_prompt(transcript, financial_data)
+        
+        if self.provider == "anthropic":
+            json_prompt = prompt + "\n\nIMPORTANT: Return ONLY valid JSON, starting with { and ending with }. No other text."
+            
+            with self.client.messages.stream(
+                model="claude-3-haiku-20240307",
+                max_tokens=4000,
+                temperature=0.3,
+                messages=[{"role": "user", "content": json_prompt}]
+            ) as stream:
+                for text in stream.text_stream:
+                    yield text
+        else:
+            response = self.client.chat.completions.create(
+                model="gpt-3.5-turbo-16k",
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.3,
+                max_tokens=4000,
+                stream=True
+            )
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+    
+    def parse_response(self, content: str) -> Dict:
+        """Parse the model output into the analysis dict, falling back to the raw text"""
         try:
             # Parse JSON response
             analysis = json.loads(content)
@@ -319,6 +360,27 @@ class TranscriptProcessor:
             financial_context
         )
         
+        return self._complete_analysis(ticker, transcript_data, analysis)
+    
+    def stream_full_transcript(self, ticker: str, transcript_data: Dict, financial_data: Dict) -> Iterator[Tuple[str, Any]]:
+        """Process a full earnings call transcript, yielding events as the analysis streams in.
+        
+        Yields ("section", {"key", "value"}) for each top-level analysis section
+        as soon as it parses, then ("complete", analysis) once it has been saved.
+        """
+        financial_context = self._prepare_financial_context(financial_data)
+        
+        parser = JSONSectionParser()
+        for chunk in self.ai_engine.stream_earnings_call(transcript_data.get("content", ""), financial_context):
+            for key, value in parser.feed(chunk):
+                yield "section", {"key": key, "value": value}
+        
+        # The streamed sections are a preview; the saved analysis goes through the usual parsing
+        analysis = self.ai_engine.parse_response(parser.text)
+        yield "complete", self._complete_analysis(ticker, transcript_data, analysis)
+    
+    def _complete_analysis(self, ticker: str, transcript_data: Dict, analysis: Dict) -> Dict:
+        """Add trends and metadata to an analysis and save it"""
         # Load historical analyses if available
         historical = self._load_historical_analyses(ticker)
         
@@ -368,8 +430,10 @@ class TranscriptProcessor:
             
             # Load last 4 quarters
             for file in files[-4:]:
-                with open(os.path.join(analysis_dir, file), 'r') as f:
+                path = os.path.join(analysis_dir, file)
+                with open(path, 'r') as f:
                     historical.append(json.load(f))
+                disk_quota.record_access("analysis_history", path)
         
         return historical
     
@@ -383,13 +447,15 @@ class TranscriptProcessor:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filepath = os.path.join(analysis_dir, f"{ticker}_analysis_{timestamp}.json")
         
-        with open(filepath, 'w') as f:
-            json.dump(analysis, f, indent=2)
+        atomic_write_json(filepath, analysis)
+        disk_quota.record_file("analysis_history", filepath, ticker, filepath)
         
         # Also save as latest
         latest_path = os.path.join("../data/analyses", f"{ticker}_latest_analysis.json")
-        with open(latest_path, 'w') as f:
-            json.dump(analysis, f, indent=2)
+        atomic_write_json(latest_path, analysis)
+        write_variants(latest_path, analysis)
+        disk_quota.record_file("artifacts", f"{ticker}/analysis", ticker, latest_path)
+        change_feed.notify(ticker, "analysis")
         
         print(f"✓ Saved transcript analysis to {filepath}")
 
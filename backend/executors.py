@@ -0,0 +1,25 @@
+"""
+Bounded thread pools for blocking work done on behalf of async endpoints
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from config import settings
+
+# Scraping and LLM calls: slow, rate-limited, and allowed to queue
+fill_executor = ThreadPoolExecutor(max_workers=settings.fill_workers, thread_name_prefix="fill")
+
+# Artifact file reads and writes: fast, kept separate so cold fills never starve them
+io_executor = ThreadPoolExecutor(max_workers=settings.io_workers, thread_name_prefix="io")
+
+async def run_fill(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking scrape/LLM call without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(fill_executor, functools.partial(func, *args, **kwargs))
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """Run blocking file I/O without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor, functools.partial(func, *args, **kwargs))
@@ -0,0 +1,91 @@
+"""
+Structured financial_data record stored alongside scraped earnings content
+"""
+from typing import Any, Dict, Optional, TypedDict
+
+class FinancialData(TypedDict, total=False):
+    currentPrice: str
+    marketCap: str
+    yearHigh: str
+    yearLow: str
+    peRatio: str
+    revenueGrowth: str
+    profitMargins: str
+    epsTrailing: str
+    recommendation: str
+    targetPrice: str
+
+def _number(value: Any, fmt: str) -> Optional[str]:
+    """Format a numeric value, or None if missing; an empty fmt keeps str(value) as the content does"""
+    if value is None or value == 'N/A':
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return format(number, fmt) if fmt else str(value)
+
+def _compact(record: Dict[str, Optional[str]]) -> FinancialData:
+    return FinancialData(**{key: value for key, value in record.items() if value is not None})
+
+def from_yfinance_info(info: Dict[str, Any]) -> FinancialData:
+    """Record for a yfinance Ticker.info dict, formatted like the summary content lines"""
+    recommendation = info.get('recommendationKey')
+    return _compact({
+        "currentPrice": _number(info.get('currentPrice', info.get('regularMarketPrice')), ""),
+        "marketCap": _number(info.get('marketCap') or None, ",.0f"),
+        "yearHigh": _number(info.get('fiftyTwoWeekHigh'), ""),
+        "yearLow": _number(info.get('fiftyTwoWeekLow'), ""),
+        "peRatio": _number(info.get('trailingPE'), ""),
+        "revenueGrowth": _number(info['revenueGrowth'] * 100, ".1f") + "%" if info.get('revenueGrowth') else None,
+        "profitMargins": _number(info['profitMargins'] * 100, ".1f") + "%" if info.get('profitMargins') else None,
+        "epsTrailing": _number(info.get('trailingEps'), ""),
+        "recommendation": recommendation.upper() if recommendation else None,
+        "targetPrice": _number(info.get('targetMeanPrice'), ""),
+    })
+
+def from_quote(quote: Dict[str, Any]) -> FinancialData:
+    """Record for an AlternativeDataFetcher stock_info quote"""
+    return _compact({
+        "currentPrice": _number(quote.get('price'), ".2f"),
+        "marketCap": _number(quote.get('marketCap') or None, ",.0f"),
+        "yearHigh": _number(quote.get('fiftyTwoWeekHigh'), ".2f"),
+        "yearLow": _number(quote.get('fiftyTwoWeekLow'), ".2f"),
+        "peRatio": _number(quote.get('pe') or None, ""),
+    })
+
+def extract_financial_metrics(content: str) -> Dict:
+    """Extract financial metrics from transcript content"""
+    metrics = {}
+    lines = content.split('\n')
+
+    for line in lines:
+        if 'Stock Price:' in line:
+            metrics['currentPrice'] = line.split('$')[-1].strip()
+        elif 'Market Cap:' in line:
+            metrics['marketCap'] = line.split('$')[-1].strip()
+        elif '52-Week High:' in line:
+            metrics['yearHigh'] = line.split('$')[-1].strip()
+        elif '52-Week Low:' in line:
+            metrics['yearLow'] = line.split('$')[-1].strip()
+        elif 'P/E Ratio (TTM):' in line:
+            metrics['peRatio'] = line.split(':')[-1].strip()
+        elif 'Revenue Growth (YoY):' in line:
+            metrics['revenueGrowth'] = line.split(':')[-1].strip()
+        elif 'Profit Margins:' in line and 'margins' not in line.lower():
+            metrics['profitMargins'] = line.split(':')[-1].strip()
+        elif 'EPS (TTM):' in line:
+            metrics['epsTrailing'] = line.split('$')[-1].strip()
+        elif 'Recommendation:' in line:
+            metrics['recommendation'] = line.split(':')[-1].strip()
+        elif 'Target Mean Price:' in line:
+            metrics['targetPrice'] = line.split('$')[-1].strip()
+
+    return metrics
+
+def get_financial_data(earnings_data: Dict[str, Any]) -> Dict[str, str]:
+    """The stored financial_data record, parsed from the content for entries written before it existed"""
+    financial_data = earnings_data.get('financial_data')
+    if financial_data is None:
+        financial_data = extract_financial_metrics(earnings_data.get('content', ''))
+    return financial_data
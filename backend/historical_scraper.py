@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 import pandas as pd
 from typing import Dict, List, Optional
 import json
+from atomic_io import atomic_write_json
 
 class HistoricalEarningsScraper:
     def __init__(self):
@@ -314,8 +315,7 @@ class HistoricalEarningsScraper:
     def save_historical_data(self, ticker: str, data: Dict):
         """Save historical data to JSON file"""
         filename = f"../data/historical/{ticker}_history.json"
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+        atomic_write_json(filename, data)
         print(f"Saved historical data for {ticker}")
 
 if __name__ == "__main__":
@@ -5,18 +5,25 @@ from typing import Dict, List, Optional
 import json
 from rate_limiter import yfinance_limiter
 from cache_manager import cache_manager
+from precompressed import write_variants
+from atomic_io import atomic_write_json
+from disk_quota import disk_quota
 
 class ImprovedHistoricalScraper:
     def __init__(self):
         self.quarters_to_fetch = 8  # Get 2 years of quarterly data
         
-    def get_historical_earnings(self, ticker: str) -> Dict:
-        """Fetch historical earnings data combining multiple sources"""
-        # Check cache first
-        cached_data = cache_manager.get_cached_data(ticker, "historical", cache_hours=24)
-        if cached_data:
-            print(f"Using cached historical data for {ticker}")
-            return cached_data
+    def get_historical_earnings(self, ticker: str, refresh: bool = False) -> Dict:
+        """Fetch historical earnings data combining multiple sources (refresh=True bypasses the cache)"""
+        # Check cache first; an expired entry is still served while it is refetched in the background
+        if not refresh:
+            cached_data = cache_manager.get_cached_data(
+                ticker, "historical",
+                refresh=lambda: self.get_historical_earnings(ticker, refresh=True)
+            )
+            if cached_data:
+                print(f"Using cached historical data for {ticker}")
+                return cached_data
         
         # Apply rate limiting
         yfinance_limiter.wait_if_needed()
@@ -141,10 +148,8 @@ class ImprovedHistoricalScraper:
             # Calculate trends
             historical_data["analysis"] = self._calculate_trends(historical_data)
             
-            # Save to cache before returning
-            cache_manager.save_to_cache(ticker, "historical", historical_data)
-            
-            return historical_data
+            # Save to cache, returning it as cached so later reads match
+            return cache_manager.save_to_cache(ticker, "historical", historical_data)
             
         except Exception as e:
             print(f"Error fetching historical data for {ticker}: {e}")
@@ -221,8 +226,9 @@ class ImprovedHistoricalScraper:
     def save_historical_data(self, ticker: str, data: Dict):
         """Save historical data to JSON file"""
         filename = f"../data/historical/{ticker}_history.json"
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+        atomic_write_json(filename, data)
+        write_variants(filename, data, "historical")
+        disk_quota.record_file("artifacts", f"{ticker}/historical", ticker, filename)
         print(f"Saved historical data for {ticker}")
 
 if __name__ == "__main__":
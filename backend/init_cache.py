@@ -5,6 +5,7 @@ This runs when the app starts if no cache exists
 import os
 import json
 from datetime import datetime
+from cache_manager import cache_manager
 
 INITIAL_CACHE_DATA = {
     "AAPL": {
@@ -376,20 +377,17 @@ def init_cache():
     os.makedirs(cache_dir, exist_ok=True)
     
     # Check if cache already exists
-    existing_files = [f for f in os.listdir(cache_dir) if f.endswith('.json')]
-    if len(existing_files) > 0:
-        print(f"Cache already contains {len(existing_files)} files. Skipping initialization.")
+    existing_entries = cache_manager.keys()
+    if len(existing_entries) > 0:
+        print(f"Cache already contains {len(existing_entries)} entries. Skipping initialization.")
         return
     
     print("Initializing cache with pre-defined data...")
     
-    # Create cache files
-    initialized = 0
-    for ticker, data in INITIAL_CACHE_DATA.items():
-        cache_file = os.path.join(cache_dir, f"{ticker}_earnings_summary.json")
-        with open(cache_file, 'w') as f:
-            json.dump(data, f, indent=2)
-        initialized += 1
+    # Create cache entries
+    cache_manager.save_many((ticker, "earnings_summary", data) for ticker, data in INITIAL_CACHE_DATA.items())
+    initialized = len(INITIAL_CACHE_DATA)
+    for ticker in INITIAL_CACHE_DATA:
         print(f"  ✓ Cached {ticker}")
     
     # Create status file
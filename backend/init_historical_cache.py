@@ -2,8 +2,9 @@
 Initialize historical data cache with pre-populated data
 """
 import os
-import json
 from datetime import datetime
+from atomic_io import atomic_write_json
+from cache_manager import cache_manager
 
 INITIAL_HISTORICAL_DATA = {
     "NVDA": {
@@ -158,23 +159,18 @@ INITIAL_HISTORICAL_DATA = {
 
 def init_historical_cache():
     """Initialize historical data cache"""
-    cache_dir = "../data/cache"
     historical_dir = "../data/historical"
     
-    os.makedirs(cache_dir, exist_ok=True)
     os.makedirs(historical_dir, exist_ok=True)
     
+    # Save to the scraper cache
+    cache_manager.save_many((ticker, "historical", data) for ticker, data in INITIAL_HISTORICAL_DATA.items())
+    
     initialized = 0
     for ticker, data in INITIAL_HISTORICAL_DATA.items():
-        # Save to cache directory
-        cache_file = os.path.join(cache_dir, f"{ticker}_historical.json")
-        with open(cache_file, 'w') as f:
-            json.dump(data, f, indent=2)
-        
         # Also save to historical directory
         historical_file = os.path.join(historical_dir, f"{ticker}_history.json")
-        with open(historical_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        atomic_write_json(historical_file, data)
         
         initialized += 1
         print(f"  ✓ Cached historical data for {ticker}")
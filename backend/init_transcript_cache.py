@@ -2,8 +2,8 @@
 Initialize transcript analysis cache with pre-analyzed data
 """
 import os
-import json
 from datetime import datetime
+from atomic_io import atomic_write_json
 
 INITIAL_TRANSCRIPT_ANALYSES = {
     "AAPL": {
@@ -96,8 +96,7 @@ def init_transcript_cache():
     for ticker, data in INITIAL_TRANSCRIPT_ANALYSES.items():
         # Save to analyses directory
         analysis_file = os.path.join(analyses_dir, f"{ticker}_latest_analysis.json")
-        with open(analysis_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        atomic_write_json(analysis_file, data)
         
         # Also save to ticker-specific directory
         ticker_dir = os.path.join(analyses_dir, ticker)
@@ -105,8 +104,7 @@ def init_transcript_cache():
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         timestamped_file = os.path.join(ticker_dir, f"{ticker}_analysis_{timestamp}.json")
-        with open(timestamped_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        atomic_write_json(timestamped_file, data)
         
         initialized += 1
         print(f"  ✓ Cached transcript analysis for {ticker}")
@@ -0,0 +1,240 @@
+"""
+Background jobs for expensive analyses, persisted in the jobs table so clients can poll for results
+"""
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+from config import settings
+from admission import admission_exempt
+from coordination import coordinator
+from database import Job, SessionLocal, init_db
+from executors import run_io
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Seconds to wait before retry n (1-based), doubling each time
+RETRY_BACKOFF = 2
+
+def job_to_dict(job: Job) -> Dict[str, Any]:
+    data = {
+        "id": job.id,
+        "kind": job.kind,
+        "ticker": job.ticker,
+        "status": job.status,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "error": job.error,
+    }
+    if job.status == "succeeded":
+        data["result"] = job.result
+    return data
+
+class JobQueue:
+    """Runs registered job kinds per ticker, at most `workers` at a time.
+
+    A job that is queued or running is reused for the same (kind, ticker), so
+    repeated submissions never start duplicate work; a unique index on active
+    jobs enforces this across worker processes. Failed attempts are retried
+    with backoff up to max_attempts; a failed job can be retried again by hand.
+    Active jobs whose worker process died are picked up by resume() once that
+    worker's lock on them has expired.
+    """
+
+    def __init__(self, workers: int = 4, max_attempts: int = 3):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.runners: Dict[str, Callable[[str], Awaitable[Dict[str, Any]]]] = {}
+        self.semaphore = asyncio.Semaphore(workers)
+        # job id -> task running it in this process; held here so it is not garbage collected
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.ready = False
+
+    def register(self, kind: str, runner: Callable[[str], Awaitable[Dict[str, Any]]]):
+        """runner(ticker) does the work and returns the JSON-serializable result"""
+        self.runners[kind] = runner
+
+    def _ensure_db(self):
+        if not self.ready:
+            init_db()
+            self.ready = True
+
+    def _active(self, db, kind: str, ticker: str) -> Optional[Job]:
+        return db.query(Job).filter(
+            Job.kind == kind, Job.ticker == ticker, Job.status.in_(ACTIVE_STATUSES)
+        ).first()
+
+    def _create_or_get_active(self, kind: str, ticker: str):
+        self._ensure_db()
+        db = SessionLocal()
+        try:
+            while True:
+                job = self._active(db, kind, ticker)
+                if job is not None:
+                    return job_to_dict(job), False
+                job = Job(id=uuid.uuid4().hex, kind=kind, ticker=ticker, status="queued", attempts=0)
+                db.add(job)
+                try:
+                    db.commit()
+                except IntegrityError:
+                    # Another worker process created the active job since the check; return that one
+                    db.rollback()
+                    continue
+                return job_to_dict(job), True
+        finally:
+            db.close()
+
+    def _load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._ensure_db()
+        db = SessionLocal()
+        try:
+            job = db.get(Job, job_id)
+            return job_to_dict(job) if job is not None else None
+        finally:
+            db.close()
+
+    def _update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            job = db.get(Job, job_id)
+            if job is None:
+                return None
+            for name, value in fields.items():
+                setattr(job, name, value)
+            job.updated_at = datetime.utcnow()
+            db.commit()
+            return job_to_dict(job)
+        finally:
+            db.close()
+
+    def _requeue_failed(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Put a failed job back in the queue, unless an active job for the same work exists"""
+        db = SessionLocal()
+        try:
+            job = db.get(Job, job_id)
+            if job is None or job.status != "failed":
+                return None
+            active = self._active(db, job.kind, job.ticker)
+            if active is not None:
+                return job_to_dict(active)
+            job.status = "queued"
+            job.attempts = 0
+            job.error = None
+            job.finished_at = None
+            job.updated_at = datetime.utcnow()
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another worker process queued the same work since the check
+                db.rollback()
+                active = self._active(db, job.kind, job.ticker)
+                return job_to_dict(active) if active is not None else None
+            return job_to_dict(job)
+        finally:
+            db.close()
+
+    def _unclaimed(self):
+        """Jobs queued or running that no worker process holds the lock for"""
+        self._ensure_db()
+        db = SessionLocal()
+        try:
+            jobs = db.query(Job).filter(Job.status.in_(ACTIVE_STATUSES)).all()
+            return [
+                (job.id, job.kind, job.ticker) for job in jobs
+                if job.id not in self.tasks and not coordinator.is_locked(f"job:{job.id}")
+            ]
+        finally:
+            db.close()
+
+    def _start(self, job_id: str, kind: str, ticker: str):
+        if job_id in self.tasks:
+            return
+        task = asyncio.ensure_future(self._run(job_id, kind, ticker))
+        self.tasks[job_id] = task
+        task.add_done_callback(lambda _: self.tasks.pop(job_id, None))
+
+    async def submit(self, kind: str, ticker: str) -> Dict[str, Any]:
+        """Queue a job, or return the queued/running one for the same kind and ticker"""
+        if kind not in self.runners:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        job, created = await run_io(self._create_or_get_active, kind, ticker)
+        if created:
+            self._start(job["id"], kind, ticker)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await run_io(self._load, job_id)
+
+    async def retry(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Requeue a failed job; returns None if there is no failed job with this id"""
+        job = await run_io(self._requeue_failed, job_id)
+        if job is not None and job["id"] == job_id:
+            self._start(job["id"], job["kind"], job["ticker"])
+        return job
+
+    async def resume(self):
+        """Restart jobs interrupted by a shutdown or left behind by a worker process that died.
+
+        Jobs still held by another live worker process are left to it (see _run);
+        one held by a dead worker is picked up once its lock expires, so this is
+        run at startup and then every JOB_RECLAIM_INTERVAL seconds.
+        """
+        for job_id, kind, ticker in await run_io(self._unclaimed):
+            if kind in self.runners:
+                self._start(job_id, kind, ticker)
+            else:
+                await run_io(self._update, job_id, status="failed", error=f"Unknown job kind '{kind}'",
+                             finished_at=datetime.utcnow())
+
+    async def _run(self, job_id: str, kind: str, ticker: str):
+        # Lease covering every attempt, renewed while they run; only one worker process runs a given job
+        lock_name = f"job:{job_id}"
+        token = await run_io(coordinator.try_lock, lock_name, settings.fill_lock_ttl)
+        if token is None:
+            return
+        # Jobs are bounded by the worker count, so runs they start queue instead of being rejected
+        admission_exempt.set(True)
+        try:
+            with coordinator.lease(lock_name, token, settings.fill_lock_ttl):
+                await self._run_attempts(job_id, kind, ticker)
+        finally:
+            await run_io(coordinator.release_lock, lock_name, token)
+
+    async def _run_attempts(self, job_id: str, kind: str, ticker: str):
+        attempts = 0
+        while True:
+            attempts += 1
+            async with self.semaphore:
+                await run_io(self._update, job_id, status="running", attempts=attempts)
+                try:
+                    result = await self.runners[kind](ticker)
+                except Exception as e:
+                    error = e.detail if isinstance(e, HTTPException) else str(e)
+                    print(f"Job {job_id} ({kind} {ticker}) attempt {attempts} failed: {error}")
+                else:
+                    await run_io(self._update, job_id, status="succeeded", result=result, error=None,
+                                 finished_at=datetime.utcnow())
+                    return
+
+            if attempts >= self.max_attempts:
+                await run_io(self._update, job_id, status="failed", error=error,
+                             finished_at=datetime.utcnow())
+                return
+            # Back off outside the semaphore so waiting retries do not hold a worker
+            await run_io(self._update, job_id, status="queued", error=error)
+            await asyncio.sleep(RETRY_BACKOFF ** attempts)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "jobs_active": len(self.tasks),
+            "job_workers": self.workers,
+        }
+
+# Global job queue instance
+job_queue = JobQueue(workers=settings.job_workers, max_attempts=settings.job_max_attempts)
@@ -1,15 +1,38 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import Optional, List, Dict, Any, Iterator, Set, Tuple
+import asyncio
+import functools
+import glob
 import json
 import os
-from datetime import datetime
+import re
+import time
+from datetime import datetime, timezone
 from historical_scraper import HistoricalEarningsScraper
 
 app = FastAPI(title="Investor Edge API")
 
 from config import settings
+from cache_manager import cache_manager, evict_quota_key
+from atomic_io import atomic_write_json, stats as file_read_stats
+from schemas import TranscriptResponse, SummaryResponse, HistoricalEarningsResponse, JobRequest, render_artifact, render_json, resolve_summary_fields
+from artifact_cache import artifact_cache, MISSING
+from conditional import Validators, combine_validators, encoded_etag, http_date, is_not_modified, not_modified, set_validators
+from precompressed import negotiate, write_variants
+from executors import run_fill, run_io
+from single_flight import fill_flights
+from financial_data import get_financial_data
+from company_index import company_index, decode_cursor, encode_cursor, InvalidCursor
+from sse import format_event
+from jobs import job_queue
+from coordination import coordinator, SharedStats
+from admission import admission_exempt, fill_admission, Overloaded
+from warm_index import warm_index, Entry
+from change_feed import change_feed
+from ttl_policy import TTL_POLICIES, policy_for, remaining_seconds
+from disk_quota import disk_quota, file_size, remove_file
 
 # Run startup checks
 from startup import startup
@@ -23,139 +46,560 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-class TranscriptResponse(BaseModel):
-    ticker: str
-    quarter: str
-    content: str
-    date: str
-
-class SummaryResponse(BaseModel):
-    ticker: str
-    quarter: str
-    summary: str
-    sentiment_score: float
-    kpis: Dict[str, str]
-    date: Optional[str] = None
-    financial_data: Optional[Dict[str, str]] = None
-    guidance: Optional[Dict[str, Any]] = None
-    transcript_analysis: Optional[Dict[str, Any]] = None
-
-class HistoricalAnalysis(BaseModel):
-    revenue_growth: Optional[float] = None
-    eps_growth: Optional[float] = None
-    avg_surprise: Optional[float] = None
-    volatility: Optional[float] = None
-    trend_direction: str = "neutral"
-
-class TrendPoint(BaseModel):
-    date: str
-    value: float
-
-class HistoricalMetrics(BaseModel):
-    revenue_trend: List[TrendPoint]
-    eps_trend: List[TrendPoint]
-    earnings_dates: List[str]
-
-class HistoricalEarningsResponse(BaseModel):
-    ticker: str
-    quarters: List[Dict]
-    metrics: HistoricalMetrics
-    analysis: HistoricalAnalysis
-
 @app.get("/")
 def read_root():
     return {"message": "Investor Edge API is running"}
 
+ARTIFACT_PATHS = {
+    "transcript": "../data/transcripts/{ticker}_latest.json",
+    "summary": "../data/summaries/{ticker}_latest.json",
+    "analysis": "../data/analyses/{ticker}_latest_analysis.json",
+    "historical": "../data/historical/{ticker}_history.json",
+}
+
+# Artifacts each response is built from; the first one is required
+TRANSCRIPT_PARTS = ["transcript"]
+SUMMARY_PARTS = ["summary", "transcript", "analysis"]
+
+# Summary fields that come from an artifact other than the summary itself
+SUMMARY_FIELD_SOURCES = {
+    "financial_data": "transcript",
+    "transcript_analysis": "analysis",
+}
+ANALYSIS_PARTS = ["analysis"]
+HISTORICAL_PARTS = ["historical"]
+
+# Admission cost class of each artifact's cold fill
+FILL_COST_CLASSES = {
+    "transcript": "scrape",
+    "historical": "scrape",
+    "summary": "llm",
+    "analysis": "llm",
+}
+
+# Artifacts a fill is built from: each is filled first, through its own flight, and passed to the fill
+FILL_INPUTS = {
+    "summary": ["transcript"],
+}
+
+# Scraper cache entries (../data/cache) that artifacts are filled from
+CACHE_SOURCES = {
+    "transcript": "earnings_summary",
+    "historical": "historical",
+}
+
+# Artifacts an endpoint returns unchanged, so their rendered body (and its compressed
+# variants) can be kept when they are saved; a summary is only served as part of a composite
+STANDALONE_ARTIFACTS = ["transcript", "analysis", "historical"]
+
+def artifact_path(ticker: str, artifact: str) -> str:
+    return ARTIFACT_PATHS[artifact].format(ticker=ticker)
+
+def artifact_files() -> List[Tuple[str, str, str]]:
+    """(ticker, artifact, path) of every artifact on disk"""
+    files = []
+    for artifact, pattern in ARTIFACT_PATHS.items():
+        prefix, suffix = pattern.split("{ticker}")
+        for path in glob.glob(pattern.format(ticker="*")):
+            files.append((path[len(prefix):len(path) - len(suffix)], artifact, path))
+    return files
+
+def index_artifacts() -> int:
+    """Hash every artifact on disk so conditional requests can be answered from the index"""
+    return artifact_cache.index_files(path for _, _, path in artifact_files())
+
+def artifact_validators(ticker: str, artifacts: List[str], variant: Optional[str] = None) -> Optional[Validators]:
+    """ETag/Last-Modified for a response built from artifacts, using only stat and the hash index.
+
+    The first artifact is the required one. Returns None when it is missing or
+    when some part has not been indexed yet, in which case the request is
+    answered normally, as it is when the first artifact is too old to serve
+    (see load_servable). variant tells apart different representations built
+    from the same artifacts, such as a field projection.
+    """
+    parts = []
+    for artifact in artifacts:
+        part = artifact_cache.validator(artifact_path(ticker, artifact))
+        if part is None:
+            return None
+        parts.append(part)
+    if parts[0] is MISSING or not TTL_POLICIES[artifacts[0]].servable(time.time() - parts[0][1]):
+        return None
+    if variant is not None:
+        parts.append((variant, 0.0))
+    return combine_validators(parts)
+
+def precompressed_response(request: Request, ticker: str, artifact: str, validators: Validators) -> Optional[FileResponse]:
+    """Stream the stored gzip/brotli variant of an artifact if the client accepts one"""
+    variant = negotiate(artifact_path(ticker, artifact), request.headers.get("accept-encoding", ""))
+    if variant is None:
+        return None
+    
+    path, encoding = variant
+    etag, last_modified = validators
+    return FileResponse(path, media_type="application/json", headers={
+        "Content-Encoding": encoding,
+        "Vary": "Accept-Encoding",
+        "ETag": encoded_etag(etag, encoding),
+        "Last-Modified": http_date(last_modified)
+    })
+
+def raw_response(payload: bytes, validators: Optional[Validators]) -> Response:
+    """Return an already serialized JSON body as-is, skipping validation and re-encoding"""
+    response = Response(content=payload, media_type="application/json")
+    set_validators(response, validators)
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+def cached_payload(ticker: str, name: str, validators: Optional[Validators]) -> Optional[Response]:
+    """Raw response from the payload rendered for these validators, if there is one"""
+    if not settings.raw_responses or validators is None:
+        return None
+    payload = artifact_cache.get_payload(ticker, name, validators[0])
+    if payload is None:
+        payload = warm_index.get_payload(ticker, name, validators[0])
+    if payload is None:
+        return None
+    return raw_response(payload, validators)
+
+def render_payload(ticker: str, name: str, payload: bytes, validators: Optional[Validators], parts: List[str],
+                   variant: Optional[str] = None) -> Response:
+    """Keep a freshly rendered body for the next request and return it raw.
+
+    The body is stored under the validators taken before the artifacts were
+    read, so it is never older than the ETag it is served with.
+    """
+    if validators is not None:
+        artifact_cache.put_payload(ticker, name, validators[0], payload)
+    return raw_response(payload, artifact_validators(ticker, parts, variant))
+
+async def load_artifact(ticker: str, artifact: str) -> Optional[Dict[str, Any]]:
+    """Load a cached artifact, only leaving the event loop when it has to be read from disk"""
+    path = artifact_path(ticker, artifact)
+    data = artifact_cache.get(ticker, artifact, path)
+    if data is None:
+        data = await run_io(artifact_cache.load, ticker, artifact, path)
+    return data
+
+def artifact_age(ticker: str, artifact: str) -> Optional[float]:
+    """Seconds since the artifact was written, or None if it does not exist"""
+    try:
+        return max(0.0, time.time() - os.path.getmtime(artifact_path(ticker, artifact)))
+    except OSError:
+        return None
+
+def artifact_ages(ticker: str, artifacts: List[str]) -> Dict[str, float]:
+    """Age of each of the artifacts that exist"""
+    ages = {}
+    for artifact in artifacts:
+        age = artifact_age(ticker, artifact)
+        if age is not None:
+            ages[artifact] = age
+    return ages
+
+async def load_servable(ticker: str, artifact: str, fresh: bool = False) -> Optional[Dict[str, Any]]:
+    """load_artifact, treating an artifact past its TTL plus the stale-while-revalidate window as missing.
+
+    With fresh, an artifact past its TTL is treated as missing too.
+    """
+    age = artifact_age(ticker, artifact)
+    if age is None:
+        return None
+    policy = TTL_POLICIES[artifact]
+    if not (policy.fresh(age) if fresh else policy.servable(age)):
+        return None
+    return await load_artifact(ticker, artifact)
+
+# Seconds between checks while another worker process holds the fill lock
+FILL_LOCK_POLL = 0.5
+
+# Process-local counters published to the shared stats
+fill_counters = {"fill_lock_waits": 0}
+
+async def fill_artifact(ticker: str, artifact: str, fill, refresh: bool = False) -> Dict[str, Any]:
+    """Run a blocking fill for a missing or expired artifact, sharing one run among concurrent requests.
+    
+    Requests in this process share one run through single-flight; across worker
+    processes a coordinator lock makes the others wait for the saved artifact.
+    The run needs a slot in the artifact's cost class. A request that would
+    start a run when that queue is full gets Overloaded (503 with Retry-After);
+    exempt work (see admission_exempt) queues instead.
+    
+    Artifacts the fill is built from (FILL_INPUTS) go through fill_artifact
+    themselves, so a concurrent request for one of them shares the run.
+    
+    An artifact too old to serve is filled again; with refresh, so is one
+    just past its TTL. If the fill fails and an old copy is on disk, the old
+    copy is returned (stale-if-error).
+    """
+    lock_name = f"fill:{ticker}:{artifact}"
+    cost_class = FILL_COST_CLASSES[artifact]
+    
+    async def run_once():
+        # Set here, not inherited from whichever request started the run: the fills this
+        # one waits on are part of work already admitted, so they queue rather than fail
+        admission_exempt.set(True)
+        # The place in the queue taken when the run started, given back if it is not needed
+        reserved = True
+        try:
+            waited = False
+            while True:
+                # A fill that finished just before this request registered may already have saved it
+                data = await load_servable(ticker, artifact, fresh=refresh)
+                if data is not None:
+                    return data
+                token = await run_io(coordinator.try_lock, lock_name, settings.fill_lock_ttl)
+                if token is not None:
+                    break
+                if not waited:
+                    fill_counters["fill_lock_waits"] += 1
+                    waited = True
+                await asyncio.sleep(FILL_LOCK_POLL)
+            
+            try:
+                with coordinator.lease(lock_name, token, settings.fill_lock_ttl):
+                    data = await load_servable(ticker, artifact, fresh=refresh)
+                    if data is not None:
+                        return data
+                    inputs = [
+                        await fill_artifact(ticker, name, ARTIFACT_FILLS[name], refresh=refresh)
+                        for name in FILL_INPUTS.get(artifact, [])
+                    ]
+                    reserved = False
+                    async with fill_admission.slot(cost_class, reserved=True):
+                        return await run_fill(fill, ticker, *inputs)
+            finally:
+                await run_io(coordinator.release_lock, lock_name, token)
+        finally:
+            if reserved:
+                fill_admission.cancel(cost_class)
+    
+    try:
+        if (ticker, artifact) not in fill_flights.in_flight:
+            # Only a request starting a run adds work; those joining one are never turned away
+            fill_admission.reserve(cost_class, exempt=admission_exempt.get())
+        return await fill_flights.do((ticker, artifact), run_once)
+    except Exception as e:
+        data = await load_artifact(ticker, artifact)
+        if data is None:
+            raise
+        print(f"Serving expired {artifact} for {ticker} after its refill failed: {getattr(e, 'detail', e)}")
+        return data
+
+def save_artifact(ticker: str, artifact: str, data: Dict[str, Any]):
+    """Persist a freshly filled artifact and keep the in-process cache in sync"""
+    path = artifact_path(ticker, artifact)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Validated here, once, so reads can serve the rendered bytes without checking them again
+    payload = render_artifact(data, artifact)
+    raw = atomic_write_json(path, data)
+    if artifact in STANDALONE_ARTIFACTS:
+        write_variants(path, data, artifact, payload)
+    artifact_cache.put(ticker, artifact, path, data, raw)
+    disk_quota.record_file("artifacts", f"{ticker}/{artifact}", ticker, path)
+    validators = artifact_validators(ticker, [artifact])
+    if artifact in STANDALONE_ARTIFACTS and validators is not None:
+        artifact_cache.put_payload(ticker, artifact, validators[0], payload)
+    change_feed.notify(ticker, artifact)
+
+def fill_transcript(ticker: str) -> Dict[str, Any]:
+    """Scrape the latest earnings data for ticker and save it as its transcript (blocking)"""
+    from simple_scraper import SimpleEarningsScraper
+    
+    scraper = SimpleEarningsScraper()
+    transcript_data = scraper.get_earnings_summary(ticker)
+    save_artifact(ticker, "transcript", transcript_data)
+    return transcript_data
+
+def fill_summary(ticker: str, transcript_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate the AI summary of the ticker's transcript and save it (blocking)"""
+    from ai_engine import AIEngine
+    
+    # Generate AI summary
+    ai_engine = AIEngine()
+    summary = ai_engine.summarize_transcript(transcript_data['content'])
+    
+    # Prepare summary data
+    summary_data = {
+        "ticker": ticker,
+        "quarter": transcript_data.get('quarter', 'Latest'),
+        "summary": summary['summary'],
+        "sentiment_score": summary['sentiment_score'],
+        "kpis": summary['kpis'],
+        "guidance": summary.get('guidance', {}),
+        "date": transcript_data.get('date', datetime.now().strftime("%Y-%m-%d"))
+    }
+    
+    save_artifact(ticker, "summary", summary_data)
+    return summary_data
+
+def fetch_full_transcript(ticker: str) -> Dict[str, Any]:
+    """Fetch the full earnings call transcript (blocking)"""
+    from transcript_scraper import EarningsTranscriptScraper, COMPANY_DOMAINS
+    
+    scraper = EarningsTranscriptScraper()
+    domain = COMPANY_DOMAINS.get(ticker)
+    return scraper.get_earnings_transcript(ticker, domain)
+
+def fetch_financial_data(ticker: str) -> Dict[str, str]:
+    """Financial data to give the AI analysis as context (blocking)"""
+    from simple_scraper import SimpleEarningsScraper
+    
+    financial_scraper = SimpleEarningsScraper()
+    return get_financial_data(financial_scraper.get_earnings_summary(ticker))
+
+def fill_transcript_analysis(ticker: str) -> Dict[str, Any]:
+    """Fetch the full earnings call transcript and run the AI analysis on it (blocking)"""
+    from enhanced_ai_engine import TranscriptProcessor
+    
+    transcript_data = fetch_full_transcript(ticker)
+    financial_data = fetch_financial_data(ticker)
+    
+    # Process with AI (saves the analysis as the latest artifact)
+    processor = TranscriptProcessor()
+    return processor.process_full_transcript(ticker, transcript_data, financial_data)
+
+def stream_transcript_analysis(ticker: str):
+    """fill_transcript_analysis as (event, data) pairs, streaming the analysis sections (blocking)"""
+    from enhanced_ai_engine import TranscriptProcessor
+    
+    yield "progress", {"stage": "fetching_transcript"}
+    transcript_data = fetch_full_transcript(ticker)
+    
+    yield "progress", {"stage": "fetching_financial_data"}
+    financial_data = fetch_financial_data(ticker)
+    
+    yield "progress", {"stage": "analyzing"}
+    processor = TranscriptProcessor()
+    yield from processor.stream_full_transcript(ticker, transcript_data, financial_data)
+
+def fill_streamed_analysis(ticker: str, on_event) -> Dict[str, Any]:
+    """fill_transcript_analysis, passing each event of stream_transcript_analysis to on_event (blocking)"""
+    analysis = None
+    for event, data in stream_transcript_analysis(ticker):
+        on_event(event, data)
+        if event == "complete":
+            analysis = data
+    return analysis
+
+def fill_historical(ticker: str) -> Dict[str, Any]:
+    """Fetch historical earnings for ticker and save them (blocking)"""
+    from improved_historical_scraper import ImprovedHistoricalScraper
+    
+    scraper = ImprovedHistoricalScraper()
+    data = scraper.get_historical_earnings(ticker)
+    
+    # Save for caching
+    scraper.save_historical_data(ticker, data)
+    artifact_cache.put(ticker, "historical", artifact_path(ticker, "historical"), data)
+    change_feed.notify(ticker, "historical")
+    return data
+
+def on_cache_refreshed(ticker: str, data_type: str, data: Dict[str, Any]):
+    """Rewrite artifacts that were filled from a stale cache entry once it has been refreshed"""
+    for artifact, source in CACHE_SOURCES.items():
+        if source == data_type and os.path.exists(artifact_path(ticker, artifact)):
+            save_artifact(ticker, artifact, data)
+
+cache_manager.add_refresh_listener(on_cache_refreshed)
+
+# Fill that writes each artifact, run again in the background once it is past its TTL
+ARTIFACT_FILLS = {
+    "transcript": fill_transcript,
+    "summary": fill_summary,
+    "analysis": fill_transcript_analysis,
+    "historical": fill_historical,
+}
+
+def refresh_expired(ticker: str, artifacts: List[str]) -> Dict[str, float]:
+    """Start a background refill of each artifact past its TTL; returns the age of every artifact that exists"""
+    ages = artifact_ages(ticker, artifacts)
+    for artifact, age in ages.items():
+        if not TTL_POLICIES[artifact].fresh(age):
+            start_background_fill(ticker, artifact, ARTIFACT_FILLS[artifact], refresh=True)
+    return ages
+
+async def index_cache_expiry():
+    try:
+        start = time.time()
+        # Reads the whole store only the first time, before any process has recorded it
+        count = await run_io(cache_manager.build_expiry_index)
+        if count:
+            print(f"Indexed expiry of {count} scraper cache entries in {time.time() - start:.1f}s")
+    except Exception as e:
+        print(f"Error indexing scraper cache expiry: {e}")
+
+expiry_indexer = None
+
+@app.on_event("startup")
+async def start_expiry_indexer():
+    global expiry_indexer
+    # In the background: nothing waits on the index, and a full scan of a file store takes a while
+    expiry_indexer = asyncio.ensure_future(index_cache_expiry())
+
+ANALYSIS_HISTORY_PATTERN = "../data/analyses/*/*.json"
+
+def artifact_quota_items() -> List[Tuple[str, str, int, float]]:
+    items = []
+    for ticker, artifact, path in artifact_files():
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            continue
+        items.append((f"{ticker}/{artifact}", ticker, file_size(path), mtime))
+    return items
+
+def record_artifact_access(ticker: str, artifacts: List[str]):
+    for artifact in artifacts:
+        disk_quota.record_access("artifacts", f"{ticker}/{artifact}")
+
+def evict_artifact(key: str):
+    ticker, _, artifact = key.partition("/")
+    remove_file(artifact_path(ticker, artifact))
+    artifact_cache.invalidate(ticker, artifact)
+
+def analysis_history_items() -> List[Tuple[str, str, int, float]]:
+    """Timestamped analyses kept for comparison with later calls (see EnhancedAIEngine._save_analysis)"""
+    items = []
+    for path in glob.glob(ANALYSIS_HISTORY_PATTERN):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        items.append((path, os.path.basename(os.path.dirname(path)), stat.st_size, stat.st_mtime))
+    return items
+
+disk_quota.register("cache", settings.scraper_cache_quota_mb, evict_quota_key, cache_manager.quota_items)
+disk_quota.register("artifacts", settings.artifact_quota_mb, evict_artifact, artifact_quota_items)
+disk_quota.register("analysis_history", settings.analysis_history_quota_mb, remove_file, analysis_history_items)
+
+QUOTA_SWEEP_LOCK = "quota-sweep"
+
+def sweep_disk_quota():
+    """Record this worker's reads, then evict over-quota classes unless another worker is already sweeping"""
+    disk_quota.flush_accesses()
+    token = coordinator.try_lock(QUOTA_SWEEP_LOCK, settings.fill_lock_ttl)
+    if token is None:
+        return
+    try:
+        with coordinator.lease(QUOTA_SWEEP_LOCK, token, settings.fill_lock_ttl):
+            disk_quota.sweep()
+    finally:
+        coordinator.release_lock(QUOTA_SWEEP_LOCK, token)
+
+async def sweep_disk_quota_periodically():
+    while True:
+        await asyncio.sleep(settings.quota_sweep_interval)
+        try:
+            await run_io(sweep_disk_quota)
+        except Exception as e:
+            print(f"Error sweeping disk quota: {e}")
+
+quota_sweeper = None
+
+@app.on_event("startup")
+async def start_quota_sweeper():
+    global quota_sweeper
+    quota_sweeper = asyncio.ensure_future(sweep_disk_quota_periodically())
+
+def with_cache_headers(result, response: Response, ticker: str, artifacts: List[str]):
+    """Cache-Control from the TTL policy of the artifacts a response is built from.
+    
+    max-age is what is left of the TTL of the artifact closest to expiring.
+    An artifact past its TTL is refilled in the background, like a stale
+    cache entry. A response built from either is flagged with X-Cache/Age and
+    gets max-age=0, so shared caches revalidate it instead of keeping it for
+    a full TTL. A response that already set Cache-Control keeps it.
+    """
+    target = result if isinstance(result, Response) else response
+    record_artifact_access(ticker, artifacts)
+    ages = refresh_expired(ticker, artifacts)
+    stale_ages = [cache_manager.stale_age(ticker, CACHE_SOURCES[artifact]) for artifact in artifacts if artifact in CACHE_SOURCES]
+    stale_ages += [int(age) for artifact, age in ages.items() if not TTL_POLICIES[artifact].fresh(age)]
+    age = max((age for age in stale_ages if age is not None), default=None)
+    if age is not None:
+        target.headers["X-Cache"] = "STALE"
+        target.headers["Age"] = str(age)
+    if "cache-control" not in target.headers:
+        target.headers["Cache-Control"] = policy_for(artifacts).cache_control(
+            stale=age is not None, max_age=remaining_seconds(ages))
+    return result
+
 @app.get("/api/transcripts/{ticker}")
-async def get_transcript(ticker: str):
+async def get_transcript(ticker: str, request: Request, response: Response):
     ticker = ticker.upper()
-    transcript_path = f"../data/transcripts/{ticker}_latest.json"
+    result = await transcript_response(ticker, request, response)
+    return with_cache_headers(result, response, ticker, TRANSCRIPT_PARTS)
+
+async def transcript_response(ticker: str, request: Request, response: Response):
+    validators = artifact_validators(ticker, TRANSCRIPT_PARTS)
+    if validators:
+        if is_not_modified(request, validators):
+            return not_modified(validators)
+        precompressed = precompressed_response(request, ticker, "transcript", validators)
+        if precompressed is not None:
+            return precompressed
+        cached = cached_payload(ticker, "transcript", validators)
+        if cached is not None:
+            return cached
     
-    if not os.path.exists(transcript_path):
+    data = await load_servable(ticker, "transcript")
+    
+    if data is None:
         # Try to scrape if it doesn't exist
-        from simple_scraper import SimpleEarningsScraper
-        
         try:
-            scraper = SimpleEarningsScraper()
-            transcript_data = scraper.get_earnings_summary(ticker)
-            
-            # Save transcript
-            os.makedirs("../data/transcripts", exist_ok=True)
-            with open(transcript_path, 'w') as f:
-                json.dump(transcript_data, f, indent=2)
-                
-            return TranscriptResponse(**transcript_data)
+            data = await fill_artifact(ticker, "transcript", fill_transcript)
         except HTTPException:
             raise
         except Exception as e:
             print(f"Error fetching transcript for {ticker}: {e}")
             raise HTTPException(status_code=503, detail=f"Real-time data temporarily unavailable. Please try again later.")
     
-    with open(transcript_path, 'r') as f:
-        data = json.load(f)
+    if settings.raw_responses:
+        return render_payload(ticker, "transcript", render_artifact(data, "transcript"), validators, TRANSCRIPT_PARTS)
     
+    set_validators(response, artifact_validators(ticker, TRANSCRIPT_PARTS))
+    response.headers["Vary"] = "Accept-Encoding"
     return TranscriptResponse(**data)
 
-@app.get("/api/summaries/{ticker}")
-async def get_summary(ticker: str):
-    ticker = ticker.upper()
-    summary_path = f"../data/summaries/{ticker}_latest.json"
-    transcript_path = f"../data/transcripts/{ticker}_latest.json"
+def summary_parts(fields: Optional[Set[str]]) -> List[str]:
+    """Artifacts a summary with these fields (None: all of them) is built from"""
+    if fields is None:
+        return SUMMARY_PARTS
+    return ["summary"] + [artifact for field, artifact in SUMMARY_FIELD_SOURCES.items() if field in fields]
+
+def project_summary(summary: SummaryResponse, fields: Optional[Set[str]]) -> Dict[str, Any]:
+    return summary.model_dump(mode="json", include=fields)
+
+async def build_summary(ticker: str, fields: Optional[Set[str]] = None) -> SummaryResponse:
+    """Assemble the summary response for ticker, filling the summary if it is missing.
+
+    With fields, artifacts only needed for other fields are not read and the
+    fields they provide are left empty.
+    """
+    parts = summary_parts(fields)
+    summary_data = await load_servable(ticker, "summary")
     
     # If summary doesn't exist, try to create it
-    if not os.path.exists(summary_path):
-        # Import scraper and AI engine
-        from simple_scraper import SimpleEarningsScraper
-        from ai_engine import AIEngine
-        
+    if summary_data is None:
         try:
-            # Scrape latest earnings data
-            scraper = SimpleEarningsScraper()
-            transcript_data = scraper.get_earnings_summary(ticker)
-            
-            # Save transcript
-            os.makedirs("../data/transcripts", exist_ok=True)
-            with open(transcript_path, 'w') as f:
-                json.dump(transcript_data, f, indent=2)
-            
-            # Generate AI summary
-            ai_engine = AIEngine()
-            summary = ai_engine.summarize_transcript(transcript_data['content'])
-            
-            # Prepare summary data
-            summary_data = {
-                "ticker": ticker,
-                "quarter": transcript_data.get('quarter', 'Latest'),
-                "summary": summary['summary'],
-                "sentiment_score": summary['sentiment_score'],
-                "kpis": summary['kpis'],
-                "guidance": summary.get('guidance', {}),
-                "date": transcript_data.get('date', datetime.now().strftime("%Y-%m-%d"))
-            }
-            
-            # Save summary
-            os.makedirs("../data/summaries", exist_ok=True)
-            with open(summary_path, 'w') as f:
-                json.dump(summary_data, f, indent=2)
-                
+            summary_data = await fill_artifact(ticker, "summary", fill_summary)
         except HTTPException:
             raise
         except Exception as e:
             print(f"Error fetching data for {ticker}: {e}")
             raise HTTPException(status_code=503, detail=f"Real-time data temporarily unavailable. Please try again later.")
     
-    else:
-        with open(summary_path, 'r') as f:
-            summary_data = json.load(f)
-    
-    # Try to load financial data from transcript
+    transcript_data = await load_artifact(ticker, "transcript") if "transcript" in parts else None
+    transcript_analysis = await load_artifact(ticker, "analysis") if "analysis" in parts else None
+    return assemble_summary(summary_data, transcript_data, transcript_analysis)
+
+def assemble_summary(summary_data: Dict[str, Any], transcript_data: Optional[Dict[str, Any]],
+                     transcript_analysis: Optional[Dict[str, Any]]) -> SummaryResponse:
+    # Financial data is stored with the transcript when it is scraped
     financial_data = None
-    if os.path.exists(transcript_path):
-        with open(transcript_path, 'r') as f:
-            transcript_data = json.load(f)
-            # Extract financial metrics from transcript content
-            content = transcript_data.get('content', '')
-            financial_data = extract_financial_metrics(content)
+    if transcript_data is not None:
+        financial_data = get_financial_data(transcript_data)
     
     response_data = summary_data.copy()
     response_data['financial_data'] = financial_data
@@ -164,148 +608,699 @@ async def get_summary(ticker: str):
         response_data['guidance'] = {}
     
     # Check if we have transcript analysis
-    analysis_path = f"../data/analyses/{ticker}_latest_analysis.json"
-    if os.path.exists(analysis_path):
-        with open(analysis_path, 'r') as f:
-            transcript_analysis = json.load(f)
-            response_data['transcript_analysis'] = transcript_analysis.get('analysis', {})
+    if transcript_analysis is not None:
+        response_data['transcript_analysis'] = transcript_analysis.get('analysis', {})
     
     return SummaryResponse(**response_data)
 
-def extract_financial_metrics(content: str) -> Dict:
-    """Extract financial metrics from transcript content"""
-    metrics = {}
-    lines = content.split('\n')
-    
-    for line in lines:
-        if 'Stock Price:' in line:
-            metrics['currentPrice'] = line.split('$')[-1].strip()
-        elif 'Market Cap:' in line:
-            metrics['marketCap'] = line.split('$')[-1].strip()
-        elif '52-Week High:' in line:
-            metrics['yearHigh'] = line.split('$')[-1].strip()
-        elif '52-Week Low:' in line:
-            metrics['yearLow'] = line.split('$')[-1].strip()
-        elif 'P/E Ratio (TTM):' in line:
-            metrics['peRatio'] = line.split(':')[-1].strip()
-        elif 'Revenue Growth (YoY):' in line:
-            metrics['revenueGrowth'] = line.split(':')[-1].strip()
-        elif 'Profit Margins:' in line and 'margins' not in line.lower():
-            metrics['profitMargins'] = line.split(':')[-1].strip()
-        elif 'EPS (TTM):' in line:
-            metrics['epsTrailing'] = line.split('$')[-1].strip()
-        elif 'Recommendation:' in line:
-            metrics['recommendation'] = line.split(':')[-1].strip()
-        elif 'Target Mean Price:' in line:
-            metrics['targetPrice'] = line.split('$')[-1].strip()
-    
-    return metrics
+def summary_fields(fields: Optional[str], profile: Optional[str]) -> Optional[Set[str]]:
+    try:
+        return resolve_summary_fields(fields, profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/summaries/{ticker}")
+async def get_summary(ticker: str, request: Request, response: Response, fields: Optional[str] = None,
+                      profile: Optional[str] = None):
+    """AI summary for ticker.
+    
+    fields=a,b or profile=card|full limit the response to those fields; parts
+    that are not needed are never read from disk.
+    """
+    ticker = ticker.upper()
+    selected = summary_fields(fields, profile)
+    parts = summary_parts(selected)
+    result = await summary_response(ticker, request, response, selected, parts)
+    return with_cache_headers(result, response, ticker, parts)
+
+async def summary_response(ticker: str, request: Request, response: Response, selected: Optional[Set[str]],
+                           parts: List[str]):
+    projection = ",".join(sorted(selected)) if selected is not None else None
+    name = f"summary?fields={projection}" if projection is not None else "summary"
+    
+    validators = artifact_validators(ticker, parts, projection)
+    if validators:
+        if is_not_modified(request, validators):
+            return not_modified(validators)
+        cached = cached_payload(ticker, name, validators)
+        if cached is not None:
+            return cached
+    
+    summary = await build_summary(ticker, selected)
+    if settings.raw_responses:
+        return render_payload(ticker, name, render_json(project_summary(summary, selected)), validators, parts, projection)
+    
+    set_validators(response, artifact_validators(ticker, parts, projection))
+    return project_summary(summary, selected) if selected is not None else summary
+
+MAX_BATCH_TICKERS = 50
+# Tickers taken from query strings and request bodies; they become file names, so nothing else is let through
+TICKER_RE = re.compile(r"^[A-Z0-9.\-]{1,10}$")
+MAX_COMPANIES_PAGE = 100
+
+# Fills started by partial batch requests; held here so they are not garbage collected
+background_fills = set()
+
+def start_background_fill(ticker: str, artifact: str, fill, refresh: bool = False):
+    """Start (or join) a fill without waiting for it"""
+    task = asyncio.ensure_future(fill_artifact(ticker, artifact, fill, refresh))
+    background_fills.add(task)
+    task.add_done_callback(background_fills.discard)
+    task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+def valid_ticker(ticker: str) -> str:
+    """ticker upper-cased; 400 unless it matches TICKER_RE"""
+    ticker = ticker.strip().upper()
+    if not TICKER_RE.match(ticker):
+        raise HTTPException(status_code=400, detail=f"Invalid ticker '{ticker}'")
+    return ticker
+
+def requested_tickers(tickers: str) -> List[str]:
+    """Distinct upper-cased tickers from a comma-separated list of at most MAX_BATCH_TICKERS"""
+    requested = list(dict.fromkeys(valid_ticker(t) for t in tickers.split(",") if t.strip()))
+    if not requested:
+        raise HTTPException(status_code=400, detail="No tickers requested")
+    if len(requested) > MAX_BATCH_TICKERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_TICKERS} tickers per request")
+    return requested
+
+@app.get("/api/summaries")
+async def get_summaries(tickers: str, response: Response, partial: bool = False, fields: Optional[str] = None,
+                        profile: Optional[str] = None):
+    """Summaries for several tickers in one response.
+
+    Cached summaries are assembled immediately and missing ones are filled
+    concurrently. With partial=true the response does not wait for fills:
+    missing tickers are reported as pending and their fills continue in the
+    background, so a later request picks them up from cache. fields and
+    profile select fields as for a single summary.
+    """
+    selected = summary_fields(fields, profile)
+    requested = requested_tickers(tickers)
+    
+    pending = []
+    if partial:
+        cached = await asyncio.gather(*[load_servable(t, "summary") for t in requested])
+        pending = [t for t, data in zip(requested, cached) if data is None]
+        for ticker in pending:
+            start_background_fill(ticker, "summary", fill_summary)
+    
+    ready = [t for t in requested if t not in pending]
+    results = await asyncio.gather(*[build_summary(t, selected) for t in ready], return_exceptions=True)
+    
+    summaries = {}
+    status = {ticker: {"status": "pending"} for ticker in pending}
+    # Oldest age of each part across the tickers, for max-age
+    ages: Dict[str, float] = {}
+    for ticker, result in zip(ready, results):
+        if isinstance(result, HTTPException):
+            status[ticker] = {"status": "error", "code": result.status_code, "detail": result.detail}
+        elif isinstance(result, Exception):
+            print(f"Error building summary for {ticker}: {result}")
+            status[ticker] = {"status": "error", "code": 500, "detail": "Unable to build summary"}
+        else:
+            summaries[ticker] = project_summary(result, selected)
+            status[ticker] = {"status": "ok"}
+            record_artifact_access(ticker, summary_parts(selected))
+            for artifact, age in refresh_expired(ticker, summary_parts(selected)).items():
+                ages[artifact] = max(age, ages.get(artifact, 0.0))
+    
+    # Pending or failed tickers will change on the next request, so only complete batches may be cached
+    complete = all(entry["status"] == "ok" for entry in status.values())
+    stale = any(not TTL_POLICIES[artifact].fresh(age) for artifact, age in ages.items())
+    response.headers["Cache-Control"] = policy_for(summary_parts(selected)).cache_control(
+        stale=stale, max_age=remaining_seconds(ages)) if complete else "no-store"
+    
+    return {
+        "summaries": summaries,
+        "status": {ticker: status[ticker] for ticker in requested}
+    }
+
+# Response bodies kept in the warm index, and the artifacts each is built from
+WARM_PARTS = {
+    "transcript": TRANSCRIPT_PARTS,
+    "summary": SUMMARY_PARTS,
+    "analysis": ANALYSIS_PARTS,
+    "historical": HISTORICAL_PARTS,
+}
+
+WARM_INDEX_LOCK = "warm_index"
+
+# Set once the warm index is mapped (or could not be built); see /api/ready
+warm_ready = False
+
+def read_artifact_file(ticker: str, artifact: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(artifact_path(ticker, artifact), 'rb') as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+def render_warm_payload(ticker: str, artifact: str) -> bytes:
+    """Full response body of the endpoint serving artifact, as the endpoint itself renders it"""
+    data = read_artifact_file(ticker, artifact)
+    if data is None:
+        raise ValueError(f"{artifact} for {ticker} is unreadable")
+    if artifact != "summary":
+        return render_artifact(data, artifact)
+    summary = assemble_summary(data, read_artifact_file(ticker, "transcript"), read_artifact_file(ticker, "analysis"))
+    return render_json(project_summary(summary, None))
+
+def warm_entries(files: List[Tuple[str, str, str]]) -> Iterator[Entry]:
+    """Warm index records for files, reusing bodies from the current index whose ETag still matches"""
+    for ticker, artifact, path in files:
+        hashed = artifact_cache.hashed(path)
+        validators = artifact_validators(ticker, WARM_PARTS[artifact])
+        if hashed is None or validators is None:
+            continue
+        etag = validators[0]
+        payload = warm_index.lookup(ticker, artifact, etag)
+        if payload is None:
+            try:
+                payload = render_warm_payload(ticker, artifact)
+            except Exception as e:
+                # Recorded without a body so the index still counts as current for this file
+                print(f"Warm index: skipping {artifact} for {ticker}: {e}")
+                etag, payload = "", b""
+        yield ticker, artifact, hashed[0], hashed[1], etag, payload
+
+def warm_index_current(files: List[Tuple[str, str, str]]) -> bool:
+    """True if the index has a record for every artifact file at its current version"""
+    versions = {(ticker, artifact): version for ticker, artifact, version, _ in warm_index.records()}
+    for ticker, artifact, path in files:
+        hashed = artifact_cache.hashed(path)
+        if hashed is None or versions.get((ticker, artifact)) != hashed[0]:
+            return False
+    return True
+
+def warm_start() -> Dict[str, Any]:
+    """Map the warm index, rebuilding it first if artifacts changed since it was written.
+
+    Artifact hashes are taken from the index for files that have not changed,
+    so a restart with a current index reads no artifact files. One worker
+    rebuilds while the others wait for it under a coordinator lock.
+    """
+    files = artifact_files()
+    if warm_index.open():
+        artifact_cache.seed_hashes(
+            (artifact_path(ticker, artifact), version, digest)
+            for ticker, artifact, version, digest in warm_index.records()
+        )
+    index_artifacts()
+    if warm_index.mapped and warm_index_current(files):
+        return warm_index.stats()
+    
+    token = coordinator.try_lock(WARM_INDEX_LOCK, settings.fill_lock_ttl)
+    if token is None:
+        # Another worker is rebuilding it; map its index once it is done
+        while coordinator.is_locked(WARM_INDEX_LOCK):
+            time.sleep(FILL_LOCK_POLL)
+        warm_index.open()
+        return warm_index.stats()
+    try:
+        with coordinator.lease(WARM_INDEX_LOCK, token, settings.fill_lock_ttl):
+            start = time.time()
+            count = warm_index.write(warm_entries(files))
+            print(f"Built warm index of {count} artifacts in {time.time() - start:.1f}s")
+    finally:
+        coordinator.release_lock(WARM_INDEX_LOCK, token)
+    return warm_index.stats()
+
+@app.on_event("startup")
+async def load_warm_index():
+    global warm_ready
+    try:
+        stats = await run_io(warm_start)
+        print(f"Warm index mapped: {stats['records']} artifacts, {stats['bytes']} bytes")
+    except Exception as e:
+        print(f"Warm index unavailable, serving from disk: {e}")
+    warm_ready = True
+
+@app.get("/api/ready")
+async def get_ready():
+    """200 once the warm index is mapped and cached responses are served from it, 503 before"""
+    if not warm_ready:
+        raise HTTPException(status_code=503, detail="Warm index is still loading")
+    return {"ready": True, "warm_index": warm_index.stats()}
+
+def local_counters() -> Dict[str, int]:
+    cache = artifact_cache.stats()
+    fills = fill_flights.stats()
+    scraper = cache_manager.stats()
+    return {
+        "hits": cache["hits"],
+        "misses": cache["misses"],
+        "payload_hits": cache["payload_hits"],
+        "warm_hits": warm_index.stats()["hits"],
+        "scraper_memory_hits": scraper["memory_hits"],
+        "scraper_disk_hits": scraper["disk_hits"],
+        "scraper_misses": scraper["misses"],
+        **{f"file_{name}": count for name, count in file_read_stats().items()},
+        "fills_started": fills["fills_started"],
+        "fills_coalesced": fills["fills_coalesced"],
+        **fill_counters,
+    }
+
+shared_stats = SharedStats(coordinator, local_counters)
+
+# Seconds between publishing this worker's counters to the shared totals
+STATS_PUBLISH_INTERVAL = 10
+
+async def publish_stats_periodically():
+    while True:
+        await asyncio.sleep(STATS_PUBLISH_INTERVAL)
+        try:
+            await run_io(shared_stats.publish)
+        except Exception as e:
+            print(f"Error publishing shared stats: {e}")
+
+stats_publisher = None
+
+@app.on_event("startup")
+async def start_stats_publisher():
+    global stats_publisher
+    stats_publisher = asyncio.ensure_future(publish_stats_periodically())
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters for this worker's artifact cache and in-flight fills.
+    
+    "shared" holds the same counters summed over all worker processes, as of
+    each worker's last publish (every STATS_PUBLISH_INTERVAL seconds).
+    """
+    shared = await run_io(shared_stats.publish)
+    return {
+        **artifact_cache.stats(),
+        **fill_flights.stats(),
+        "admission": fill_admission.stats(),
+        "warm_index": warm_index.stats(),
+        "scraper_cache": cache_manager.stats(),
+        "updates": change_feed.stats(),
+        "file_reads": file_read_stats(),
+        "disk_quota": await run_io(disk_quota.stats),
+        "pid": os.getpid(),
+        "shared": shared
+    }
 
 @app.get("/api/companies")
-async def get_companies(limit: int = 10, search: Optional[str] = None):
-    # Load stock data
-    stock_file = "../data/nyse_stocks.json"
-    
-    if os.path.exists(stock_file):
-        with open(stock_file, 'r') as f:
-            stock_data = json.load(f)
-            all_stocks = stock_data.get('stocks', [])
-    else:
-        # Fallback to original list
-        all_stocks = [
-            {"ticker": "AAPL", "name": "Apple Inc.", "sector": "Technology", "market_cap": 3000000000000},
-            {"ticker": "MSFT", "name": "Microsoft Corporation", "sector": "Technology", "market_cap": 2800000000000},
-            {"ticker": "GOOGL", "name": "Alphabet Inc.", "sector": "Technology", "market_cap": 1800000000000},
-            {"ticker": "AMZN", "name": "Amazon.com Inc.", "sector": "Consumer Discretionary", "market_cap": 1700000000000},
-            {"ticker": "META", "name": "Meta Platforms Inc.", "sector": "Technology", "market_cap": 1200000000000},
-            {"ticker": "TSLA", "name": "Tesla Inc.", "sector": "Consumer Discretionary", "market_cap": 800000000000},
-            {"ticker": "NVDA", "name": "NVIDIA Corporation", "sector": "Technology", "market_cap": 1100000000000},
-            {"ticker": "JPM", "name": "JPMorgan Chase & Co.", "sector": "Financials", "market_cap": 500000000000},
-            {"ticker": "JNJ", "name": "Johnson & Johnson", "sector": "Healthcare", "market_cap": 450000000000},
-            {"ticker": "WMT", "name": "Walmart Inc.", "sector": "Consumer Staples", "market_cap": 400000000000}
-        ]
-    
-    # Filter by search term if provided
-    if search:
-        search_lower = search.lower()
-        filtered_stocks = [
-            stock for stock in all_stocks
-            if search_lower in stock['ticker'].lower() or 
-               search_lower in stock['name'].lower() or
-               (stock.get('sector') and search_lower in stock['sector'].lower())
-        ]
-    else:
-        filtered_stocks = all_stocks
-    
-    # Limit results
-    limited_stocks = filtered_stocks[:limit]
+async def get_companies(limit: int = 10, search: Optional[str] = None, cursor: Optional[str] = None,
+                        sector: Optional[str] = None):
+    """Search companies by ticker, name or sector, best matches and largest companies first.
+
+    Pass the returned next_cursor back as cursor, with the same search and
+    sector, to fetch the following page. limit is capped at MAX_COMPANIES_PAGE.
+    """
+    limit = max(1, min(limit, MAX_COMPANIES_PAGE))
+    
+    # Build the index once, and again only when the stock file changes
+    if not company_index.is_current():
+        await run_io(company_index.load)
+    
+    query = (search or '').strip().lower()
+    try:
+        offset = decode_cursor(cursor, query, sector) if cursor else 0
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    companies, total = company_index.search(query, offset=offset, limit=limit, sector=sector)
+    has_more = offset + len(companies) < total
     
     return {
-        "companies": limited_stocks,
-        "total": len(filtered_stocks),
-        "has_more": len(filtered_stocks) > limit
+        "companies": companies,
+        "total": total,
+        "has_more": has_more,
+        "next_cursor": encode_cursor(offset + len(companies), query, sector) if has_more else None
     }
 
 @app.get("/api/transcript/{ticker}")
-async def get_earnings_transcript(ticker: str):
+async def get_earnings_transcript(ticker: str, request: Request, response: Response):
     """Fetch and analyze full earnings call transcript"""
     ticker = ticker.upper()
+    result = await analysis_response(ticker, request, response)
+    return with_cache_headers(result, response, ticker, ANALYSIS_PARTS)
+
+async def analysis_response(ticker: str, request: Request, response: Response):
+    validators = artifact_validators(ticker, ANALYSIS_PARTS)
+    if validators:
+        if is_not_modified(request, validators):
+            return not_modified(validators)
+        precompressed = precompressed_response(request, ticker, "analysis", validators)
+        if precompressed is not None:
+            return precompressed
+        cached = cached_payload(ticker, "analysis", validators)
+        if cached is not None:
+            return cached
     
     # Check if we have a cached analysis
-    analysis_path = f"../data/analyses/{ticker}_latest_analysis.json"
-    if os.path.exists(analysis_path):
-        with open(analysis_path, 'r') as f:
-            return json.load(f)
+    analysis = await load_servable(ticker, "analysis")
     
     # Otherwise, fetch and analyze
-    from transcript_scraper import EarningsTranscriptScraper, COMPANY_DOMAINS
-    from enhanced_ai_engine import TranscriptProcessor
+    if analysis is None:
+        try:
+            analysis = await fill_artifact(ticker, "analysis", fill_transcript_analysis)
+        except Overloaded:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error analyzing transcript: {str(e)}")
+    
+    if settings.raw_responses:
+        return render_payload(ticker, "analysis", render_artifact(analysis, "analysis"), validators, ANALYSIS_PARTS)
     
+    set_validators(response, artifact_validators(ticker, ANALYSIS_PARTS))
+    response.headers["Vary"] = "Accept-Encoding"
+    return analysis
+
+@app.get("/api/transcript/{ticker}/stream")
+async def stream_earnings_transcript(ticker: str):
+    """Full earnings call analysis as server-sent events.
+    
+    Emits progress events, a section event ({"key", "value"}) for each top-level
+    analysis section as soon as the model has produced it, then a complete event
+    with the saved analysis. Failures are reported as an error event.
+    """
+    ticker = ticker.upper()
+    return StreamingResponse(
+        transcript_events(ticker),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def transcript_events(ticker: str):
+    yield format_event("progress", {"stage": "started"})
+    fill = None
     try:
-        # Fetch transcript
-        scraper = EarningsTranscriptScraper()
-        domain = COMPANY_DOMAINS.get(ticker)
-        transcript_data = scraper.get_earnings_transcript(ticker, domain)
-        
-        # Get financial data
-        from simple_scraper import SimpleEarningsScraper
-        financial_scraper = SimpleEarningsScraper()
-        financial_info = financial_scraper.get_earnings_summary(ticker)
-        
-        # Process with AI
-        processor = TranscriptProcessor()
-        analysis = processor.process_full_transcript(
-            ticker, 
-            transcript_data,
-            extract_financial_metrics(financial_info.get('content', ''))
-        )
-        
-        return analysis
+        analysis = await load_servable(ticker, "analysis")
+        streamed = False
+        if analysis is None:
+            if (ticker, "analysis") in fill_flights.in_flight:
+                # Another request is already analyzing this ticker; share its result
+                yield format_event("progress", {"stage": "waiting"})
+            
+            # A fill like any other (one run per ticker, admitted as llm), relaying its events
+            # here as they stream in; a client going away leaves it running to completion
+            loop = asyncio.get_running_loop()
+            events: asyncio.Queue = asyncio.Queue()
+            done = object()
+            
+            def on_event(event, data):
+                loop.call_soon_threadsafe(events.put_nowait, (event, data))
+            
+            fill = asyncio.ensure_future(
+                fill_artifact(ticker, "analysis", functools.partial(fill_streamed_analysis, on_event=on_event))
+            )
+            fill.add_done_callback(lambda _: events.put_nowait(done))
+            while True:
+                item = await events.get()
+                if item is done:
+                    break
+                event, data = item
+                streamed = event == "complete"
+                yield format_event(event, data)
+            analysis = fill.result()
         
+        if not streamed:
+            for key, value in analysis.get("analysis", {}).items():
+                yield format_event("section", {"key": key, "value": value})
+            yield format_event("complete", analysis)
+    except Overloaded as e:
+        # Same shape as the other error events, with the retry hints alongside
+        yield format_event("error", {"detail": e.detail["message"], "retry_after": e.detail["retry_after"],
+                                     "queue_position": e.detail["queue_position"]})
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error analyzing transcript: {str(e)}")
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        yield format_event("error", {"detail": f"Error analyzing transcript: {detail}"})
+    finally:
+        if fill is not None and not fill.done():
+            # Stops waiting only; the shared run keeps its slot until it finishes
+            fill.cancel()
 
 @app.get("/api/historical/{ticker}")
-async def get_historical_earnings(ticker: str):
+async def get_historical_earnings(ticker: str, request: Request, response: Response):
     ticker = ticker.upper()
-    historical_path = f"../data/historical/{ticker}_history.json"
+    result = await historical_response(ticker, request, response)
+    return with_cache_headers(result, response, ticker, HISTORICAL_PARTS)
+
+async def historical_response(ticker: str, request: Request, response: Response):
+    validators = artifact_validators(ticker, HISTORICAL_PARTS)
+    if validators:
+        if is_not_modified(request, validators):
+            return not_modified(validators)
+        precompressed = precompressed_response(request, ticker, "historical", validators)
+        if precompressed is not None:
+            return precompressed
+        cached = cached_payload(ticker, "historical", validators)
+        if cached is not None:
+            return cached
     
     # Check if cached data exists
-    if os.path.exists(historical_path):
-        with open(historical_path, 'r') as f:
-            data = json.load(f)
-        return HistoricalEarningsResponse(**data)
+    data = await load_servable(ticker, "historical")
     
     # Otherwise, fetch fresh data
-    from improved_historical_scraper import ImprovedHistoricalScraper
+    if data is None:
+        try:
+            data = await fill_artifact(ticker, "historical", fill_historical)
+        except Overloaded:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=404, detail=f"Unable to fetch historical data for {ticker}: {str(e)}")
+    
+    if settings.raw_responses:
+        return render_payload(ticker, "historical", render_artifact(data, "historical"), validators, HISTORICAL_PARTS)
     
+    set_validators(response, artifact_validators(ticker, HISTORICAL_PARTS))
+    response.headers["Vary"] = "Accept-Encoding"
+    return HistoricalEarningsResponse(**data)
+
+# Artifacts behind the dashboard; the summary is required, like for the summary endpoint
+DASHBOARD_PARTS = ["summary", "transcript", "analysis", "historical"]
+
+# Filled on a miss as their own endpoints do; a missing analysis is reported instead,
+# since generating one is best followed through /api/transcript/{ticker}/stream
+DASHBOARD_FILLS = {
+    "summary": fill_summary,
+    "historical": fill_historical,
+}
+
+# financial_data and transcript_analysis are dashboard sections of their own
+DASHBOARD_SUMMARY_FIELDS = set(SummaryResponse.model_fields) - set(SUMMARY_FIELD_SOURCES)
+
+async def load_or_fill(ticker: str, artifact: str) -> Optional[Dict[str, Any]]:
+    if artifact not in DASHBOARD_FILLS:
+        return await load_artifact(ticker, artifact)
+    data = await load_servable(ticker, artifact)
+    if data is None:
+        data = await fill_artifact(ticker, artifact, DASHBOARD_FILLS[artifact])
+    return data
+
+def artifact_stale(ticker: str, artifact: str, mtime: float) -> bool:
+    """Whether an artifact written at mtime is past its TTL or was filled from a stale scraper cache entry"""
+    if not TTL_POLICIES[artifact].fresh(time.time() - mtime):
+        return True
+    return artifact in CACHE_SOURCES and cache_manager.stale_age(ticker, CACHE_SOURCES[artifact]) is not None
+
+def stale_variant(ticker: str, artifacts: List[str]) -> Optional[str]:
+    """Validator variant for a body that reports staleness, so its ETag and cached payload change with it"""
+    stale = []
+    for artifact in artifacts:
+        try:
+            mtime = os.path.getmtime(artifact_path(ticker, artifact))
+        except OSError:
+            continue
+        if artifact_stale(ticker, artifact, mtime):
+            stale.append(artifact)
+    return "stale:" + ",".join(stale) if stale else None
+
+def section_status(ticker: str, artifact: str) -> Dict[str, Any]:
+    """Freshness of the section built from artifact: when it was written and whether it is stale"""
     try:
-        scraper = ImprovedHistoricalScraper()
-        data = scraper.get_historical_earnings(ticker)
-        
-        # Save for caching
-        scraper.save_historical_data(ticker, data)
-        
-        return HistoricalEarningsResponse(**data)
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=f"Unable to fetch historical data for {ticker}: {str(e)}")
\ No newline at end of file
+        mtime = os.path.getmtime(artifact_path(ticker, artifact))
+    except OSError:
+        return {"status": "missing"}
+    return {"status": "ok", "updated_at": datetime.fromtimestamp(mtime, tz=timezone.utc).isoformat(),
+            "stale": artifact_stale(ticker, artifact, mtime)}
+
+def error_status(ticker: str, section: str, error: Exception) -> Dict[str, Any]:
+    if isinstance(error, HTTPException):
+        return {"status": "error", "code": error.status_code, "detail": error.detail}
+    print(f"Error building {section} section for {ticker}: {error}")
+    return {"status": "error", "code": 500, "detail": f"Unable to load {section}"}
+
+@app.get("/api/dashboard/{ticker}")
+async def get_dashboard(ticker: str, request: Request, response: Response):
+    """Summary, historical metrics, transcript analysis and financial data for ticker in one response.
+    
+    The artifacts are loaded concurrently and each is read once. A missing
+    summary or historical data is filled; a missing analysis is reported as
+    missing. "sections" gives each section's status ("ok", "missing" or
+    "error" with code and detail) and, when it has data, its updated_at time
+    and whether it is stale: past its TTL, or filled from a stale scraper
+    cache entry.
+    """
+    ticker = ticker.upper()
+    result = await dashboard_response(ticker, request, response)
+    return with_cache_headers(result, response, ticker, DASHBOARD_PARTS)
+
+async def dashboard_response(ticker: str, request: Request, response: Response):
+    # The body reports which sections are stale, which changes with time alone
+    variant = stale_variant(ticker, DASHBOARD_PARTS)
+    validators = artifact_validators(ticker, DASHBOARD_PARTS, variant)
+    if validators:
+        if is_not_modified(request, validators):
+            return not_modified(validators)
+        cached = cached_payload(ticker, "dashboard", validators)
+        if cached is not None:
+            return cached
+    
+    results = await asyncio.gather(*[load_or_fill(ticker, artifact) for artifact in DASHBOARD_PARTS],
+                                   return_exceptions=True)
+    loaded = dict(zip(DASHBOARD_PARTS, results))
+    if loaded["transcript"] is None:
+        # Filling the summary also saves the transcript
+        loaded["transcript"] = await load_artifact(ticker, "transcript")
+    
+    builders = {
+        "summary": ("summary", lambda data: project_summary(assemble_summary(data, None, None), DASHBOARD_SUMMARY_FIELDS)),
+        "historical": ("historical", lambda data: HistoricalEarningsResponse(**data).model_dump(mode="json")),
+        "analysis": ("analysis", lambda data: data),
+        "financial_data": ("transcript", get_financial_data),
+    }
+    body = {"ticker": ticker}
+    sections = {}
+    for section, (artifact, build) in builders.items():
+        result = loaded[artifact]
+        body[section] = None
+        if isinstance(result, Exception):
+            sections[section] = error_status(ticker, section, result)
+            continue
+        try:
+            body[section] = build(result) if result is not None else None
+        except Exception as e:
+            sections[section] = error_status(ticker, section, e)
+            continue
+        sections[section] = section_status(ticker, artifact) if body[section] is not None else {"status": "missing"}
+    body["sections"] = sections
+    
+    # Errors are usually transient, so only complete dashboards get validators and are kept
+    if any(status["status"] == "error" for status in sections.values()):
+        response.headers["Cache-Control"] = "no-store"
+        return body
+    if settings.raw_responses:
+        return render_payload(ticker, "dashboard", render_json(body), validators, DASHBOARD_PARTS, variant)
+    
+    set_validators(response, artifact_validators(ticker, DASHBOARD_PARTS, variant))
+    return body
+
+# Seconds between keep-alive comments on an idle update stream
+UPDATES_HEARTBEAT = 15
+
+@app.get("/api/updates")
+async def stream_updates(tickers: str):
+    """Server-sent change events for the tickers a client is viewing, instead of polling.
+    
+    Emits subscribed once, then a change event ({"ticker", "artifact",
+    "source", "updated_at"}) whenever an artifact or scraper cache entry for
+    one of the tickers is rewritten by any worker or script. A resync event
+    means changes were dropped because the client fell behind, so it should
+    reload everything it shows.
+    """
+    requested = requested_tickers(tickers)
+    return StreamingResponse(
+        update_events(requested),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def update_events(tickers: List[str]):
+    subscription = change_feed.subscribe(tickers)
+    try:
+        yield format_event("subscribed", {"tickers": tickers})
+        while True:
+            if subscription.overflowed:
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.overflowed = False
+                yield format_event("resync", {"tickers": tickers})
+            try:
+                change = await asyncio.wait_for(subscription.queue.get(), UPDATES_HEARTBEAT)
+            except asyncio.TimeoutError:
+                # Comment line, ignored by EventSource; keeps proxies from closing the idle connection
+                yield ": keep-alive\n\n"
+                continue
+            yield format_event("change", change)
+    finally:
+        change_feed.unsubscribe(subscription)
+
+change_relay = None
+
+@app.on_event("startup")
+async def start_change_relay():
+    global change_relay
+    change_relay = asyncio.ensure_future(change_feed.relay())
+
+async def summary_job(ticker: str) -> Dict[str, Any]:
+    summary = await build_summary(ticker)
+    return summary.model_dump(mode="json")
+
+async def transcript_analysis_job(ticker: str) -> Dict[str, Any]:
+    analysis = await load_servable(ticker, "analysis")
+    if analysis is None:
+        analysis = await fill_artifact(ticker, "analysis", fill_transcript_analysis)
+    return analysis
+
+async def historical_job(ticker: str) -> Dict[str, Any]:
+    data = await load_servable(ticker, "historical")
+    if data is None:
+        data = await fill_artifact(ticker, "historical", fill_historical)
+    return HistoricalEarningsResponse(**data).model_dump(mode="json")
+
+job_queue.register("summary", summary_job)
+job_queue.register("transcript_analysis", transcript_analysis_job)
+job_queue.register("historical", historical_job)
+
+async def resume_jobs_periodically():
+    while True:
+        await asyncio.sleep(settings.job_reclaim_interval)
+        try:
+            await job_queue.resume()
+        except Exception as e:
+            print(f"Error resuming jobs: {e}")
+
+job_resumer = None
+
+@app.on_event("startup")
+async def resume_jobs():
+    global job_resumer
+    await job_queue.resume()
+    job_resumer = asyncio.ensure_future(resume_jobs_periodically())
+
+@app.post("/api/jobs", status_code=202)
+async def create_job(job: JobRequest):
+    """Queue an analysis and return its job immediately; poll GET /api/jobs/{id} for the result.
+    
+    Submitting a kind and ticker that already has a queued or running job returns that job.
+    """
+    if not job.ticker.strip():
+        raise HTTPException(status_code=400, detail="No ticker given")
+    ticker = valid_ticker(job.ticker)
+    try:
+        return await job_queue.submit(job.kind, ticker)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{e}; expected one of {', '.join(job_queue.runners)}")
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/api/jobs/{job_id}/retry", status_code=202)
+async def retry_job(job_id: str):
+    """Run a failed job again"""
+    job = await job_queue.retry(job_id)
+    if job is None:
+        existing = await job_queue.get(job_id)
+        if existing is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        raise HTTPException(status_code=409, detail=f"Job is {existing['status']}, only failed jobs can be retried")
+    return job
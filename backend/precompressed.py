@@ -0,0 +1,83 @@
+"""
+Precompressed (gzip / brotli) variants of cached JSON, written once and streamed as-is
+"""
+import gzip
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from atomic_io import atomic_write
+from schemas import render_artifact
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# Content-Encoding -> file suffix, in order of preference
+VARIANTS = [("br", ".br"), ("gzip", ".gz")] if brotli is not None else [("gzip", ".gz")]
+
+def compress(payload: bytes) -> Dict[str, bytes]:
+    """All available encodings of payload"""
+    encoded = {"gzip": gzip.compress(payload, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoded["br"] = brotli.compress(payload, quality=11)
+    return encoded
+
+def write_variants(path: str, data: Dict[str, Any], artifact: Optional[str] = None,
+                   payload: Optional[bytes] = None):
+    """Store compressed copies of data's serialized response next to path.
+
+    Call after path itself is written: each variant is stamped with the JSON
+    file's mtime, which is how stale variants are recognised later. payload is
+    the already rendered response, if the caller has it.
+    """
+    try:
+        source = os.stat(path)
+        encoded = compress(payload if payload is not None else render_artifact(data, artifact))
+        for encoding, suffix in VARIANTS:
+            atomic_write(path + suffix, encoded[encoding], mtime_ns=source.st_mtime_ns)
+    except Exception as e:
+        print(f"Error writing compressed variants for {path}: {e}")
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """Encodings the client accepts (q > 0), from an Accept-Encoding header"""
+    accepted = []
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name and q > 0:
+            accepted.append(name.strip().lower())
+    return accepted
+
+def negotiate(path: str, accept_encoding: str) -> Optional[Tuple[str, str]]:
+    """(variant path, encoding) to serve for path, or None to serve it uncompressed.
+
+    A variant whose mtime no longer matches the JSON file is stale and ignored.
+    """
+    accepted = accepted_encodings(accept_encoding)
+    if not accepted:
+        return None
+
+    try:
+        source_mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+    for encoding, suffix in VARIANTS:
+        if encoding not in accepted and "*" not in accepted:
+            continue
+        try:
+            if os.stat(path + suffix).st_mtime_ns == source_mtime:
+                return path + suffix, encoding
+        except OSError:
+            continue
+    return None
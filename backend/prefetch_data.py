@@ -2,15 +2,21 @@
 """
 Pre-fetch real data from yfinance to populate cache
 This should be run periodically (e.g., via cron) to ensure data availability
+
+Usage:
+    python prefetch_data.py              # priority stocks
+    python prefetch_data.py --expiring   # entries that expire within EXPIRING_HOURS
 """
 import json
 import os
+import sys
 import time
 from datetime import datetime
 from simple_scraper import SimpleEarningsScraper
 from improved_historical_scraper import ImprovedHistoricalScraper
 from transcript_scraper import TranscriptScraper
 from cache_manager import cache_manager
+from config import settings
 from rate_limiter import yfinance_limiter
 
 def prefetch_stock_data():
@@ -20,12 +26,8 @@ def prefetch_stock_data():
     with open("../data/nyse_stocks.json", "r") as f:
         stock_data = json.load(f)
     
-    # Priority stocks to always have fresh data
-    priority_stocks = [
-        "AAPL", "MSFT", "GOOGL", "AMZN", "META", "TSLA", "NVDA", 
-        "JPM", "JNJ", "WMT", "SOFI", "HIMS", "AMD", "PLTR", "V",
-        "MA", "PG", "HD", "DIS", "ADBE", "CRM", "NFLX", "PFE"
-    ]
+    # Priority stocks to always have fresh data (never evicted by the disk quota)
+    priority_stocks = settings.priority_stocks
     
     simple_scraper = SimpleEarningsScraper()
     historical_scraper = ImprovedHistoricalScraper()
@@ -78,5 +80,35 @@ def prefetch_stock_data():
     with open("../data/cache/prefetch_status.json", "w") as f:
         json.dump(status, f, indent=2)
 
+# Entries expiring this soon are refreshed by --expiring
+EXPIRING_HOURS = 1
+
+def refresh_expiring(within_hours: float = EXPIRING_HOURS):
+    """Refetch the cache entries that expire in the next within_hours, soonest first"""
+    simple_scraper = SimpleEarningsScraper()
+    historical_scraper = ImprovedHistoricalScraper()
+    fetchers = {
+        "earnings_summary": lambda ticker: simple_scraper.get_earnings_summary(ticker, refresh=True),
+        "historical": lambda ticker: historical_scraper.get_historical_earnings(ticker, refresh=True),
+    }
+
+    # Looked up in the expiry index kept in the coordinator database, not by reading the cache
+    expiring = [entry for entry in cache_manager.expiring(within_hours) if entry[2] in fetchers]
+    print(f"{len(expiring)} entries expire within {within_hours}h")
+
+    refreshed = 0
+    for expires_at, ticker, data_type in expiring:
+        try:
+            yfinance_limiter.wait_if_needed()
+            fetchers[data_type](ticker)
+            refreshed += 1
+            print(f"  ✓ {ticker} {data_type}")
+        except Exception as e:
+            print(f"  ✗ {ticker} {data_type}: {e}")
+    print(f"Refreshed {refreshed} of {len(expiring)} expiring entries")
+
 if __name__ == "__main__":
-    prefetch_stock_data()
\ No newline at end of file
+    if "--expiring" in sys.argv:
+        refresh_expiring()
+    else:
+        prefetch_stock_data()
\ No newline at end of file
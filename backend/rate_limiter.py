@@ -1,12 +1,20 @@
+import threading
 import time
-from typing import Dict
+from typing import Dict, Optional
 from datetime import datetime, timedelta
+from coordination import Coordinator, coordinator
 
 class RateLimiter:
-    def __init__(self, max_requests: int = 5, time_window: int = 60):
+    def __init__(self, max_requests: int = 5, time_window: int = 60, name: str = "default",
+                 shared: Optional[Coordinator] = None):
         self.max_requests = max_requests
         self.time_window = time_window  # seconds
+        self.name = name
+        # With a coordinator the budget is shared by every worker process on the host
+        self.shared = shared
         self.requests: Dict[str, list] = {}
+        # Fills run on worker threads, so check-and-record must be atomic
+        self.lock = threading.Lock()
     
     def can_make_request(self, key: str = "global") -> bool:
         """Check if we can make a request"""
@@ -32,9 +40,19 @@ class RateLimiter:
     
     def wait_if_needed(self, key: str = "global"):
         """Wait if rate limit is exceeded"""
-        while not self.can_make_request(key):
+        if self.shared is not None:
+            while True:
+                wait = self.shared.try_acquire_rate(f"{self.name}:{key}", self.max_requests, self.time_window)
+                if wait == 0:
+                    return
+                time.sleep(min(max(wait, 0.05), 1))
+        
+        while True:
+            with self.lock:
+                if self.can_make_request(key):
+                    self.add_request(key)
+                    return
             time.sleep(1)
-        self.add_request(key)
 
 # Global rate limiter for yfinance - very conservative for production
-yfinance_limiter = RateLimiter(max_requests=1, time_window=10)
\ No newline at end of file
+yfinance_limiter = RateLimiter(max_requests=1, time_window=10, name="yfinance", shared=coordinator)
\ No newline at end of file
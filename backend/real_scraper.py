@@ -1,12 +1,12 @@
 import requests
 from bs4 import BeautifulSoup
-import json
 import os
 from datetime import datetime, timedelta
 from typing import Dict, Optional, List
 import time
 import re
 from urllib.parse import quote
+from atomic_io import atomic_write_json
 
 class RealEarningsTranscriptScraper:
     def __init__(self, alpha_vantage_key: Optional[str] = None):
@@ -262,8 +262,7 @@ areas we're actively monitoring and managing.
         os.makedirs("../data/transcripts", exist_ok=True)
         filepath = f"../data/transcripts/{ticker}_latest.json"
         
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        atomic_write_json(filepath, data)
         
         print(f"Saved transcript for {ticker} to {filepath} (source: {data.get('source', 'unknown')})")
     
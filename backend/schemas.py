@@ -0,0 +1,96 @@
+"""
+Pydantic response models for the API
+"""
+import json
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Any, Set
+
+class TranscriptResponse(BaseModel):
+    ticker: str
+    quarter: str
+    content: str
+    date: str
+
+class SummaryResponse(BaseModel):
+    ticker: str
+    quarter: str
+    summary: str
+    sentiment_score: float
+    kpis: Dict[str, str]
+    date: Optional[str] = None
+    financial_data: Optional[Dict[str, str]] = None
+    guidance: Optional[Dict[str, Any]] = None
+    transcript_analysis: Optional[Dict[str, Any]] = None
+
+class HistoricalAnalysis(BaseModel):
+    revenue_growth: Optional[float] = None
+    eps_growth: Optional[float] = None
+    avg_surprise: Optional[float] = None
+    volatility: Optional[float] = None
+    trend_direction: str = "neutral"
+
+class TrendPoint(BaseModel):
+    date: str
+    value: float
+
+class HistoricalMetrics(BaseModel):
+    revenue_trend: List[TrendPoint]
+    eps_trend: List[TrendPoint]
+    earnings_dates: List[str]
+
+class HistoricalEarningsResponse(BaseModel):
+    ticker: str
+    quarters: List[Dict]
+    metrics: HistoricalMetrics
+    analysis: HistoricalAnalysis
+
+# Named field sets for /api/summaries; None means every field
+SUMMARY_PROFILES = {
+    "card": ["ticker", "quarter", "date", "sentiment_score", "kpis", "financial_data"],
+    "full": None,
+}
+
+def resolve_summary_fields(fields: Optional[str] = None, profile: Optional[str] = None) -> Optional[Set[str]]:
+    """Fields selected by ?fields=a,b and/or ?profile=, or None for the full summary.
+
+    Raises ValueError for an unknown profile or field.
+    """
+    if profile is not None and profile not in SUMMARY_PROFILES:
+        raise ValueError(f"Unknown profile '{profile}'; expected one of {', '.join(SUMMARY_PROFILES)}")
+    if profile is not None and SUMMARY_PROFILES[profile] is None:
+        return None
+    if fields is None and profile is None:
+        return None
+
+    selected = set(SUMMARY_PROFILES[profile]) if profile is not None else set()
+    if fields is not None:
+        selected.update(field.strip() for field in fields.split(",") if field.strip())
+    unknown = selected - set(SummaryResponse.model_fields)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    selected.add("ticker")
+    return selected
+
+class JobRequest(BaseModel):
+    kind: str
+    ticker: str
+
+# Artifacts that an endpoint returns on their own, validated through a response model
+ARTIFACT_MODELS = {
+    "transcript": TranscriptResponse,
+    "historical": HistoricalEarningsResponse,
+}
+
+def render_json(data: Any) -> bytes:
+    """Canonical compact JSON used for stored and raw-served response bodies"""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+def render_artifact(data: Dict[str, Any], artifact: Optional[str] = None) -> bytes:
+    """Serialize an artifact as compact JSON, shaped like its endpoint's response.
+
+    Raises pydantic's ValidationError if data does not fit the response model.
+    """
+    model = ARTIFACT_MODELS.get(artifact)
+    if model is not None:
+        data = model(**data).model_dump(mode="json")
+    return render_json(data)
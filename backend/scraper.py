@@ -1,10 +1,10 @@
 import requests
 from bs4 import BeautifulSoup
-import json
 import os
 from datetime import datetime
 from typing import Dict, Optional
 import time
+from atomic_io import atomic_write_json
 
 class EarningsTranscriptScraper:
     def __init__(self):
@@ -100,8 +100,7 @@ class EarningsTranscriptScraper:
         os.makedirs("../data/transcripts", exist_ok=True)
         filepath = f"../data/transcripts/{ticker}_latest.json"
         
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        atomic_write_json(filepath, data)
         
         print(f"Saved transcript for {ticker} to {filepath}")
     
@@ -0,0 +1,66 @@
+"""
+Incremental parser that pulls top-level sections out of a JSON object as it streams in
+"""
+import json
+from typing import Any, List, Tuple
+
+class JSONSectionParser:
+    """Feed chunks of streamed model output; each top-level "key": value member of
+    the JSON object is returned as soon as its closing comma or brace arrives.
+
+    Text before the opening brace is ignored, as is a member that does not parse.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.pos = 0
+        self.started = False
+        self.finished = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.member_start = 0
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self.text += chunk
+        sections = []
+        text = self.text
+
+        while self.pos < len(text) and not self.finished:
+            ch = text[self.pos]
+            if not self.started:
+                if ch == '{':
+                    self.started = True
+                    self.depth = 1
+                    self.member_start = self.pos + 1
+            elif self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in '{[':
+                self.depth += 1
+            elif ch in '}]':
+                self.depth -= 1
+                if self.depth == 0:
+                    sections.extend(self._member(self.member_start, self.pos))
+                    self.finished = True
+            elif ch == ',' and self.depth == 1:
+                sections.extend(self._member(self.member_start, self.pos))
+                self.member_start = self.pos + 1
+            self.pos += 1
+
+        return sections
+
+    def _member(self, start: int, end: int) -> List[Tuple[str, Any]]:
+        member = self.text[start:end].strip()
+        if not member:
+            return []
+        try:
+            return list(json.loads("{" + member + "}").items())
+        except ValueError:
+            return []
@@ -1,12 +1,13 @@
 import yfinance as yf
-import json
 import os
 from datetime import datetime
 from typing import Dict
 import time
 from cache_manager import cache_manager
+from financial_data import from_quote, from_yfinance_info
 from rate_limiter import yfinance_limiter
 from fastapi import HTTPException
+from atomic_io import atomic_write_json
 
 class SimpleEarningsScraper:
     def __init__(self):
@@ -23,19 +24,24 @@ class SimpleEarningsScraper:
             "WMT": "Walmart Inc."
         }
     
-    def get_earnings_summary(self, ticker: str) -> Dict:
-        """Get simplified earnings data using yfinance"""
+    def get_earnings_summary(self, ticker: str, refresh: bool = False) -> Dict:
+        """Get simplified earnings data using yfinance (refresh=True bypasses the cache)"""
         print(f"Fetching data for {ticker}...")
         
-        # Check cache first (extended cache time for production)
-        cached_data = cache_manager.get_cached_data(ticker, "earnings_summary", cache_hours=168)  # 7 days
-        if cached_data:
-            print(f"Using cached data for {ticker}")
-            return cached_data
+        # Check cache first; an expired entry is still served while a fresh copy
+        # is fetched in the background
+        if not refresh:
+            cached_data = cache_manager.get_cached_data(
+                ticker, "earnings_summary",
+                refresh=lambda: self.get_earnings_summary(ticker, refresh=True)
+            )
+            if cached_data:
+                print(f"Using cached data for {ticker}")
+                return cached_data
         
         # Try alternative data fetcher first
         from alternative_data import alt_fetcher
-        alt_data = alt_fetcher.get_stock_data(ticker)
+        alt_data = alt_fetcher.get_stock_data(ticker, refresh=refresh)
         
         if alt_data:
             # Build earnings summary from alternative data
@@ -64,12 +70,12 @@ class SimpleEarningsScraper:
                 "quarter": f"Q{(datetime.now().month-1)//3 + 1} {datetime.now().year}",
                 "date": datetime.now().strftime("%Y-%m-%d"),
                 "content": "\n".join(content_parts),
+                "financial_data": alt_data.get('financial_data') or from_quote(alt_data),
                 "source": "alternative-data"
             }
             
             # Save to cache
-            cache_manager.save_to_cache(ticker, "earnings_summary", result)
-            return result
+            return cache_manager.save_to_cache(ticker, "earnings_summary", result)
         
         # Fallback to original method with rate limiting
         yfinance_limiter.wait_if_needed()
@@ -144,13 +150,12 @@ class SimpleEarningsScraper:
                 "quarter": quarter,
                 "date": datetime.now().strftime("%Y-%m-%d"),
                 "content": "\n".join(content_parts),
+                "financial_data": from_yfinance_info(info),
                 "source": "yfinance-simple"
             }
             
             # Save to cache
-            cache_manager.save_to_cache(ticker, "earnings_summary", result)
-            
-            return result
+            return cache_manager.save_to_cache(ticker, "earnings_summary", result)
             
         except Exception as e:
             print(f"Error fetching data for {ticker}: {e}")
@@ -227,8 +232,7 @@ Real-time data requires active internet connection.
         os.makedirs("../data/transcripts", exist_ok=True)
         filepath = f"../data/transcripts/{ticker}_latest.json"
         
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        atomic_write_json(filepath, data)
         
         print(f"✓ Saved {ticker} (source: {data['source']})")
     
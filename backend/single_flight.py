@@ -0,0 +1,45 @@
+"""
+Coalesce concurrent cold-miss fills so each (ticker, artifact) is only fetched once at a time
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    def __init__(self):
+        self.in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run func for key, or wait on the run already in flight for it.
+
+        All callers share the leader's result or its exception. The fill runs as
+        its own task so one caller disconnecting does not cancel it for the others.
+        """
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self.in_flight[key] = task
+            self.started += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        # Mark the exception as retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "fills_in_flight": len(self.in_flight),
+            "fills_started": self.started,
+            "fills_coalesced": self.coalesced
+        }
+
+# Global registry of in-flight artifact fills
+fill_flights = SingleFlight()
@@ -0,0 +1,9 @@
+"""
+Server-sent events formatting for streaming endpoints
+"""
+import json
+from typing import Any
+
+def format_event(event: str, data: Any) -> str:
+    """One SSE message; data is sent as single-line JSON"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}\n\n"
@@ -14,15 +14,15 @@ def check_cache_status():
         os.makedirs(cache_dir, exist_ok=True)
         return False
     
-    # Check for any cached files
-    cache_files = [f for f in os.listdir(cache_dir) if f.endswith('.json')]
+    # Check for any cached entries
+    cache_entries = cache_manager.keys()
     
-    if len(cache_files) == 0:
+    if len(cache_entries) == 0:
         print("WARNING: No cached data found. API will rely on real-time data fetching.")
         print("Consider running prefetch_data.py to populate cache.")
         return False
     
-    print(f"Found {len(cache_files)} cached data files")
+    print(f"Found {len(cache_entries)} cached data entries ({cache_manager.store.name} backend)")
     
     # Check prefetch status
     status_file = os.path.join(cache_dir, "prefetch_status.json")
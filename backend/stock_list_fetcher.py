@@ -1,10 +1,10 @@
 import yfinance as yf
 import pandas as pd
 import requests
-import json
 from typing import List, Dict
 import time
 from datetime import datetime
+from atomic_io import atomic_write_json
 
 class StockListFetcher:
     def __init__(self):
@@ -167,8 +167,7 @@ class StockListFetcher:
             'stocks': stocks_sorted
         }
         
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+        atomic_write_json(filename, data)
         
         print(f"Saved {len(stocks_sorted)} stocks to {filename}")
         
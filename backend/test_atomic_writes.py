@@ -0,0 +1,96 @@
+"""
+Readers racing cache writers must never see a partial entry, so a cached entry
+is never reported missing (which would send the caller upstream to refetch it).
+
+Run with: pytest test_atomic_writes.py  (or python test_atomic_writes.py)
+
+Quota records and change notifications go to a scratch coordination
+database (see conftest.py), not the one under ../data.
+"""
+import os
+import tempfile
+import threading
+
+import pytest
+
+import atomic_io
+from cache_manager import CacheManager
+from cache_store import create_store
+
+TICKERS = ["ZZA", "ZZB", "ZZC"]
+WRITERS_PER_TICKER = 2
+READERS = 8
+WRITES = 20
+DATA_TYPE = "historical"
+
+def make_entry(ticker, version):
+    # Large enough that a non-atomic write is visible half-done
+    return {"ticker": ticker, "version": version, "content": f"{ticker}-{version} " * 20000}
+
+def run_stress(cache):
+    for ticker in TICKERS:
+        cache.save_to_cache(ticker, DATA_TYPE, make_entry(ticker, 0))
+
+    done = threading.Event()
+    refetches = []
+    torn = []
+
+    def writer(ticker, offset):
+        for i in range(WRITES):
+            cache.save_to_cache(ticker, DATA_TYPE, make_entry(ticker, offset + i * WRITERS_PER_TICKER))
+
+    def reader():
+        while not done.is_set():
+            for ticker in TICKERS:
+                data = cache.get_cached_data(ticker, DATA_TYPE, cache_hours=1)
+                if data is None:
+                    refetches.append(ticker)
+                elif data["content"] != f"{ticker}-{data['version']} " * 20000:
+                    torn.append(ticker)
+
+    readers = [threading.Thread(target=reader) for _ in range(READERS)]
+    writers = [threading.Thread(target=writer, args=(ticker, offset))
+               for ticker in TICKERS for offset in range(1, WRITERS_PER_TICKER + 1)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+    return refetches, torn
+
+@pytest.mark.parametrize("backend", ["files", "sqlite"])
+def test_concurrent_writes_cause_no_refetches(backend):
+    before = atomic_io.stats()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        store = create_store(backend, cache_dir=cache_dir, db_path=os.path.join(cache_dir, "cache.db"))
+        # No memory tier, so every read goes to the entry being rewritten
+        cache = CacheManager(memory_bytes=0, store=store)
+        refetches, torn = run_stress(cache)
+        leftovers = [name for name in os.listdir(cache_dir) if name.endswith(".tmp")]
+
+    print(f"\nreads: {cache.disk_hits}, spurious refetches: {len(refetches)}, torn reads: {len(torn)}")
+    assert cache.disk_hits > 0
+    assert refetches == []
+    assert torn == []
+    assert cache.misses == 0
+    assert atomic_io.stats()["unreadable"] == before["unreadable"]
+    assert leftovers == []
+
+def test_unreadable_file_serves_last_good_copy():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = CacheManager(cache_dir)
+        cache.save_to_cache("ZZA", DATA_TYPE, make_entry("ZZA", 1))
+        # A writer that bypasses atomic_write, stopped part way through
+        with open(cache.store.path("ZZA", DATA_TYPE), 'w') as f:
+            f.write('{"ticker": "ZZA", "vers')
+
+        data = cache.get_cached_data("ZZA", DATA_TYPE, cache_hours=1)
+
+    assert data is not None and data["version"] == 1
+    assert cache.misses == 0
+
+if __name__ == "__main__":
+    # Through pytest, so the scratch coordination database fixture applies
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,79 @@
+"""
+A class over its disk quota is brought back under it by evicting the least
+recently (or least often) read items, never those of pinned tickers.
+
+Run with: pytest test_disk_quota.py
+"""
+import pytest
+
+import disk_quota as disk_quota_module
+from coordination import Coordinator
+from disk_quota import DiskQuota
+
+SIZE = 1000
+
+@pytest.fixture
+def coordinator(tmp_path, monkeypatch):
+    coordinator = Coordinator(str(tmp_path / "coordination.db"))
+    monkeypatch.setattr(disk_quota_module, "coordinator", coordinator)
+    return coordinator
+
+def make_quota(policy, evict, quota_items=5):
+    quota = DiskQuota(policy=policy, pinned=["PIN"])
+    quota.register("test", 0, evict, lambda: [])
+    quota.classes["test"].quota_bytes = quota_items * SIZE
+    quota.record_write("test", "PIN/a", "PIN", SIZE)
+    for i in range(9):
+        quota.record_write("test", f"T{i}/a", f"T{i}", SIZE)
+    return quota
+
+def test_sweep_evicts_least_recently_used(coordinator):
+    evicted = []
+    quota = make_quota("lru", evicted.append)
+    quota.record_access("test", "T0/a")
+    quota.flush_accesses()
+
+    assert quota.sweep() == {"test": 6}
+    assert evicted == [f"T{i}/a" for i in range(1, 7)]
+    assert quota.stats()["test"]["bytes"] == 4 * SIZE
+
+def test_sweep_evicts_least_frequently_used(coordinator):
+    evicted = []
+    quota = make_quota("lfu", evicted.append)
+    # Read counts run opposite to write order, so LFU and LRU disagree
+    for i in range(9):
+        for _ in range(9 - i):
+            quota.record_access("test", f"T{i}/a")
+    quota.flush_accesses()
+    # A rewrite keeps the read count
+    quota.record_write("test", "T0/a", "T0", SIZE)
+
+    assert quota.sweep() == {"test": 6}
+    assert evicted == [f"T{i}/a" for i in range(8, 2, -1)]
+
+def test_pinned_tickers_are_never_victims(coordinator):
+    make_quota("lru", lambda key: None)
+    for policy in ("lru", "lfu"):
+        victims = coordinator.quota_victims("test", policy, ["PIN"], 100)
+        assert len(victims) == 9
+        assert "PIN/a" not in [key for key, _, _ in victims]
+
+def test_item_read_since_picked_is_skipped(coordinator):
+    evicted = []
+    quota = make_quota("lru", evicted.append)
+    key, _, last_access = coordinator.quota_victims("test", "lru", ["PIN"], 1)[0]
+    quota.record_access("test", key)
+    quota.flush_accesses()
+
+    assert not coordinator.quota_evict("test", key, last_access, evicted.append)
+    assert evicted == []
+    assert coordinator.quota_usage("test")[0] == 10 * SIZE
+
+def test_failed_eviction_stays_recorded(coordinator):
+    def evict(key):
+        raise OSError("read-only filesystem")
+    quota = make_quota("lru", evict)
+
+    assert quota.sweep() == {"test": 0}
+    assert coordinator.quota_usage("test")[0] == 10 * SIZE
+    assert len(coordinator.quota_victims("test", "lru", ["PIN"], 100)) == 9
@@ -0,0 +1,109 @@
+"""
+Cached requests must stay fast while slow cold fills are in flight, and cold
+fills beyond the admission queue are shed with a fast 503.
+
+Run with: pytest test_event_loop.py  (or python test_event_loop.py)
+
+Artifacts are read from and written to a scratch data directory, and the
+coordination database is a scratch one too (see conftest.py).
+"""
+import asyncio
+import json
+import os
+import time
+
+import httpx
+import pytest
+
+import main
+from admission import CostClass
+
+HOT_TICKER = "ZZHOT"
+COLD_TICKER = "ZZCOLD"
+SLOW_FILL_SECONDS = 2.0
+
+def make_historical(ticker):
+    return {
+        "ticker": ticker,
+        "quarters": [],
+        "metrics": {"revenue_trend": [], "eps_trend": [], "earnings_dates": []},
+        "analysis": {"trend_direction": "neutral"}
+    }
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Artifact paths under tmp_path, with the hot ticker's historical artifact in place"""
+    paths = {artifact: str(tmp_path / pattern[len("../data/"):]) for artifact, pattern in main.ARTIFACT_PATHS.items()}
+    monkeypatch.setattr(main, "ARTIFACT_PATHS", paths)
+    hot_path = main.artifact_path(HOT_TICKER, "historical")
+    os.makedirs(os.path.dirname(hot_path), exist_ok=True)
+    with open(hot_path, 'w') as f:
+        json.dump(make_historical(HOT_TICKER), f)
+    yield tmp_path
+    main.artifact_cache.invalidate(HOT_TICKER, "historical")
+
+def created_files(data_dir):
+    hot_path = main.artifact_path(HOT_TICKER, "historical")
+    return [os.path.join(root, name) for root, _, names in os.walk(data_dir)
+            for name in names if os.path.join(root, name) != hot_path and not name.startswith("coordination.db")]
+
+def slow_fill_historical(ticker):
+    # Stands in for a rate-limited yfinance scrape
+    time.sleep(SLOW_FILL_SECONDS)
+    return make_historical(ticker)
+
+async def measure_hot_reads_during_cold_fill():
+    async with httpx.AsyncClient(app=main.app, base_url="http://test") as client:
+        cold = asyncio.create_task(client.get(f"/api/historical/{COLD_TICKER}"))
+        await asyncio.sleep(0.1)
+
+        latencies = []
+        for _ in range(20):
+            start = time.perf_counter()
+            response = await client.get(f"/api/historical/{HOT_TICKER}")
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200
+
+        cold_finished_early = cold.done()
+        cold_response = await cold
+        return latencies, cold_finished_early, cold_response
+
+def test_cached_reads_not_blocked_by_cold_fill(data_dir, monkeypatch):
+    monkeypatch.setattr(main, "fill_historical", slow_fill_historical)
+    latencies, cold_finished_early, cold_response = asyncio.run(measure_hot_reads_during_cold_fill())
+
+    assert created_files(data_dir) == []
+    assert not cold_finished_early
+    assert cold_response.status_code == 200
+    assert max(latencies) < 0.25, f"cached read took {max(latencies):.3f}s during a cold fill"
+
+async def burst_of_cold_fills(count):
+    async with httpx.AsyncClient(app=main.app, base_url="http://test") as client:
+        cold = [asyncio.create_task(client.get(f"/api/historical/{COLD_TICKER}{i}")) for i in range(count)]
+        await asyncio.sleep(0.1)
+
+        start = time.perf_counter()
+        hot = await client.get(f"/api/historical/{HOT_TICKER}")
+        hot_latency = time.perf_counter() - start
+        assert hot.status_code == 200
+
+        return await asyncio.gather(*cold), hot_latency
+
+def test_cold_fills_shed_when_queue_full(data_dir, monkeypatch):
+    monkeypatch.setattr(main, "fill_historical", slow_fill_historical)
+    # One running and one queued; the third concurrent cold fill must be rejected
+    monkeypatch.setitem(main.fill_admission.classes, "scrape",
+                        CostClass("scrape", 1, 1, expected_seconds=SLOW_FILL_SECONDS))
+    responses, hot_latency = asyncio.run(burst_of_cold_fills(3))
+
+    assert created_files(data_dir) == []
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [200, 200, 503], statuses
+    rejected = next(response for response in responses if response.status_code == 503)
+    assert int(rejected.headers["retry-after"]) >= 1
+    assert rejected.json()["detail"]["queue_position"] == 2
+    assert hot_latency < 0.25, f"cached read took {hot_latency:.3f}s during a burst of cold fills"
+
+if __name__ == "__main__":
+    # Through pytest, so the scratch data directory and coordination database apply
+    raise SystemExit(pytest.main(["-q", __file__]))
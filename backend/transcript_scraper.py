@@ -1,11 +1,11 @@
 import requests
 from bs4 import BeautifulSoup
-import json
 import os
 from datetime import datetime
 from typing import Dict, Optional
 import time
 import re
+from atomic_io import atomic_write_json
 
 class EarningsTranscriptScraper:
     def __init__(self):
@@ -118,7 +118,7 @@ class EarningsTranscriptScraper:
         """
         # First check if we have cached earnings data
         from cache_manager import cache_manager
-        cached_summary = cache_manager.get_cached_data(ticker, "earnings_summary", cache_hours=168)
+        cached_summary = cache_manager.get_cached_data(ticker, "earnings_summary")
         
         if cached_summary and 'content' in cached_summary:
             # Parse financial data from cached content
@@ -360,8 +360,7 @@ Operator: This concludes today's conference call. Thank you for participating.
         os.makedirs("../data/transcripts/full", exist_ok=True)
         filepath = f"../data/transcripts/full/{ticker}_latest_transcript.json"
         
-        with open(filepath, 'w') as f:
-            json.dump(transcript_data, f, indent=2)
+        atomic_write_json(filepath, transcript_data)
         
         print(f"✓ Saved transcript to {filepath}")
 
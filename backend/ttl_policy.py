@@ -0,0 +1,70 @@
+"""
+Time-to-live of each kind of cached data, used both for the scraper cache checks and for HTTP caching headers
+"""
+from typing import Dict, Iterable, Optional
+
+from config import settings
+
+class TTLPolicy:
+    """Fresh for ttl_hours. Past that, a cache may keep serving it for
+    stale_while_revalidate_hours while it refreshes it, and for
+    stale_if_error_hours when the origin fails.
+    """
+
+    def __init__(self, ttl_hours: float, stale_while_revalidate_hours: float, stale_if_error_hours: float):
+        self.ttl_hours = ttl_hours
+        self.stale_while_revalidate_hours = stale_while_revalidate_hours
+        self.stale_if_error_hours = stale_if_error_hours
+
+    def cache_control(self, stale: bool = False, max_age: Optional[float] = None) -> str:
+        """Cache-Control for a response; stale ones (already being refreshed here) get max-age=0.
+
+        max_age is the seconds of freshness the data has left (see
+        remaining_seconds); the full TTL if not given.
+        """
+        if stale:
+            max_age = 0
+        elif max_age is None:
+            max_age = self.ttl_hours * 3600
+        max_age = max(0, int(max_age))
+        return (
+            f"public, max-age={max_age}, "
+            f"stale-while-revalidate={int(self.stale_while_revalidate_hours * 3600)}, "
+            f"stale-if-error={int(self.stale_if_error_hours * 3600)}"
+        )
+
+    def fresh(self, age: float) -> bool:
+        """True if data this many seconds old is still within its TTL"""
+        return age < self.ttl_hours * 3600
+
+    def servable(self, age: float) -> bool:
+        """True if data this many seconds old may still be served while it is refreshed"""
+        return age < (self.ttl_hours + self.stale_while_revalidate_hours) * 3600
+
+def _policy(ttl_hours: float) -> TTLPolicy:
+    # The stale-while-revalidate window matches the grace period CacheManager serves expired entries for
+    return TTLPolicy(ttl_hours, settings.cache_stale_grace_hours, settings.stale_if_error_hours)
+
+TTL_POLICIES: Dict[str, TTLPolicy] = {
+    # Scraper cache entries (../data/cache); "historical" is also the artifact filled from it
+    "earnings_summary": _policy(settings.earnings_ttl_hours),
+    "stock_info": _policy(settings.earnings_ttl_hours),
+    "historical": _policy(settings.historical_ttl_hours),
+    # Artifacts served by the API; transcripts and summaries come from the earnings summary
+    "transcript": _policy(settings.earnings_ttl_hours),
+    "summary": _policy(settings.earnings_ttl_hours),
+    "analysis": _policy(settings.analysis_ttl_hours),
+}
+
+def ttl_hours(name: str) -> float:
+    return TTL_POLICIES[name].ttl_hours
+
+def remaining_seconds(ages: Dict[str, float]) -> Optional[float]:
+    """Seconds until the first of several pieces of data (name -> age in seconds) expires; None if there are none"""
+    if not ages:
+        return None
+    return min(TTL_POLICIES[name].ttl_hours * 3600 - age for name, age in ages.items())
+
+def policy_for(names: Iterable[str]) -> TTLPolicy:
+    """Policy of a response built from several kinds of data: the shortest TTL among them"""
+    return min((TTL_POLICIES[name] for name in names), key=lambda policy: policy.ttl_hours)
@@ -0,0 +1,174 @@
+"""
+Memory-mapped index of pre-rendered response bodies, built (or reused) at boot.
+
+One file holds a sorted table of fixed-size records, one per (ticker, artifact),
+followed by the packed payloads. Every worker maps the same file read-only, so
+the payloads live once in the OS page cache however many workers there are, and
+lookups binary-search the mapped table instead of building a dict per worker.
+"""
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from config import settings
+
+MAGIC = b"IEWARM01"
+HEADER = struct.Struct("<8sI")
+# key (ticker/artifact), sha256 of the artifact file, its mtime_ns and size,
+# ETag of the payload, payload offset and length
+RECORD = struct.Struct("<24s64sqQ40sQI")
+
+# One record: (ticker, artifact, (mtime_ns, size), sha256, etag, payload)
+Entry = Tuple[str, str, Tuple[int, int], str, str, bytes]
+
+def _key(ticker: str, artifact: str) -> Optional[bytes]:
+    key = f"{ticker}/{artifact}".encode()
+    return key if len(key) <= 24 else None
+
+class WarmIndex:
+    def __init__(self, path: str):
+        self.path = path
+        self.file = None
+        self.map: Optional[mmap.mmap] = None
+        self.count = 0
+        self.hits = 0
+        self.lock = threading.Lock()
+
+    @property
+    def mapped(self) -> bool:
+        return self.map is not None
+
+    def open(self) -> bool:
+        """Map the index file, replacing any previous mapping; False if there is no usable file"""
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            return False
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            f.close()
+            return False
+
+        magic, count = HEADER.unpack_from(mapped, 0) if len(mapped) >= HEADER.size else (None, 0)
+        if magic != MAGIC or len(mapped) < HEADER.size + count * RECORD.size:
+            mapped.close()
+            f.close()
+            return False
+
+        with self.lock:
+            self.close()
+            self.file, self.map, self.count = f, mapped, count
+        return True
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.file.close()
+        self.file, self.map, self.count = None, None, 0
+
+    def _record(self, i: int):
+        return RECORD.unpack_from(self.map, HEADER.size + i * RECORD.size)
+
+    def _find(self, key: bytes):
+        lo, hi = 0, self.count
+        padded = key.ljust(24, b"\0")
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = HEADER.size + mid * RECORD.size
+            probe = self.map[start:start + 24]
+            if probe < padded:
+                lo = mid + 1
+            elif probe > padded:
+                hi = mid
+            else:
+                return self._record(mid)
+        return None
+
+    def lookup(self, ticker: str, artifact: str, etag: str) -> Optional[bytes]:
+        """Body rendered for artifact when it had this ETag, copied out of the mapping"""
+        key = _key(ticker, artifact)
+        if key is None:
+            return None
+        with self.lock:
+            if self.map is None:
+                return None
+            record = self._find(key)
+            if record is None or record[4].rstrip(b"\0").decode() != etag:
+                return None
+            offset, length = record[5], record[6]
+            return self.map[offset:offset + length]
+
+    def get_payload(self, ticker: str, artifact: str, etag: str) -> Optional[bytes]:
+        """lookup() for serving a request, counted in the hit stats"""
+        payload = self.lookup(ticker, artifact, etag)
+        if payload is not None:
+            with self.lock:
+                self.hits += 1
+        return payload
+
+    def records(self) -> Iterator[Tuple[str, str, Tuple[int, int], str]]:
+        """(ticker, artifact, (mtime_ns, size), sha256) of the artifact file behind each record"""
+        with self.lock:
+            count = self.count
+        for i in range(count):
+            with self.lock:
+                if self.map is None or i >= self.count:
+                    return
+                key, sha, mtime_ns, size = self._record(i)[:4]
+            ticker, artifact = key.rstrip(b"\0").decode().split("/", 1)
+            yield ticker, artifact, (mtime_ns, size), sha.decode()
+
+    def write(self, entries: Iterable[Entry]) -> int:
+        """Write a new index file from entries and map it; returns the number of records.
+
+        Payloads are streamed to a scratch file while only the small table is
+        kept in memory, then the table and payloads are written out together and
+        moved into place, so readers never see a partial index.
+        """
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        table = []
+        with tempfile.TemporaryFile(dir=directory) as blob:
+            for ticker, artifact, version, sha, etag, payload in entries:
+                key = _key(ticker, artifact)
+                if key is None:
+                    continue
+                table.append((key, sha.encode(), version[0], version[1], etag.encode(), blob.tell(), len(payload)))
+                blob.write(payload)
+            table.sort()
+
+            base = HEADER.size + len(table) * RECORD.size
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(self.path) + ".")
+            try:
+                with os.fdopen(fd, 'wb') as out:
+                    out.write(HEADER.pack(MAGIC, len(table)))
+                    for key, sha, mtime_ns, size, etag, offset, length in table:
+                        out.write(RECORD.pack(key, sha, mtime_ns, size, etag, base + offset, length))
+                    blob.seek(0)
+                    shutil.copyfileobj(blob, out)
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+        self.open()
+        return len(table)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "mapped": self.map is not None,
+                "records": self.count,
+                "bytes": len(self.map) if self.map is not None else 0,
+                "hits": self.hits
+            }
+
+# Global warm index instance
+warm_index = WarmIndex(settings.warm_index_path)
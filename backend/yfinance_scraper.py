@@ -1,9 +1,9 @@
 import yfinance as yf
 import requests
 from datetime import datetime, timedelta
-import json
 import os
 from typing import Dict, List, Optional
+from atomic_io import atomic_write_json
 
 class YFinanceEarningsScraper:
     def __init__(self):
@@ -152,8 +152,7 @@ class YFinanceEarningsScraper:
         os.makedirs("../data/transcripts", exist_ok=True)
         filepath = f"../data/transcripts/{ticker}_latest.json"
         
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        atomic_write_json(filepath, data)
         
         print(f"Saved {ticker} earnings data (source: {data['source']})")
     
@@ -5,6 +5,10 @@ echo "========================================"
 echo ""
 echo "This script will help you deploy the cache files to your Render instance."
 echo ""
+echo "Before copying, store the cache compactly (compact JSON, rounded money and percentages):"
+echo "   (cd backend && python cache_migrate.py rewrite)"
+echo "   (cd backend && python cache_format_report.py)  # sizes and load times per format"
+echo ""
 echo "Option 1: Manual Copy via SSH"
 echo "-----------------------------"
 echo "1. SSH into your Render instance:"
@@ -34,4 +38,5 @@ echo "1. Create a startup script that copies embedded cache data"
 echo "2. Use the pre-populated cache files that are included in this directory"
 echo ""
 echo "The cache files are located in: $(pwd)/data/cache/"
-echo "Total cache files: $(ls -1 data/cache/*.json 2>/dev/null | wc -l)"
\ No newline at end of file
+echo "Total cache files: $(ls -1 data/cache/*.json 2>/dev/null | wc -l)"
+echo "Total cache size: $(cat data/cache/*.json 2>/dev/null | wc -c) bytes"
\ No newline at end of file
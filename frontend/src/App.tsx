@@ -1,22 +1,49 @@
-import React, { useState } from 'react';
+import React, { useCallback, useEffect, useState } from 'react';
 import SearchBar from './components/SearchBar';
 import EnhancedSummaryCard from './components/EnhancedSummaryCard';
 import MarketOverview from './components/MarketOverview';
-import { getSummary } from './api';
-import { SummaryData } from './types';
+import { getDashboard, subscribeToUpdates } from './api';
+import { DashboardData } from './types';
 
 function App() {
-  const [selectedSummary, setSelectedSummary] = useState<SummaryData | null>(null);
+  const [dashboard, setDashboard] = useState<DashboardData | null>(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
+  // Reload the open dashboard in place when the server reports that its data changed
+  const refreshDashboard = useCallback(async (ticker: string) => {
+    try {
+      const data = await getDashboard(ticker);
+      if (data.summary) {
+        setDashboard(data);
+      }
+    } catch (err) {
+      console.error(err);
+    }
+  }, []);
+
+  const openTicker = dashboard?.ticker;
+  useEffect(() => {
+    if (!openTicker) {
+      return;
+    }
+    return subscribeToUpdates([openTicker], (change) => {
+      if (!change || change.source === 'artifact') {
+        refreshDashboard(openTicker);
+      }
+    });
+  }, [openTicker, refreshDashboard]);
+
   const handleSelectCompany = async (ticker: string) => {
     setLoading(true);
     setError(null);
     
     try {
-      const summary = await getSummary(ticker);
-      setSelectedSummary(summary);
+      const data = await getDashboard(ticker);
+      if (!data.summary) {
+        throw new Error(data.sections.summary.detail || 'Summary unavailable');
+      }
+      setDashboard(data);
     } catch (err) {
       setError(`Failed to load summary for ${ticker}. Please make sure the backend is running.`);
       console.error(err);
@@ -45,7 +72,7 @@ function App() {
           <SearchBar onSelectCompany={handleSelectCompany} />
         </div>
 
-        {!selectedSummary && !loading && !error && (
+        {!dashboard && !loading && !error && (
           <MarketOverview onSelectCompany={handleSelectCompany} />
         )}
 
@@ -63,8 +90,12 @@ function App() {
           </div>
         )}
 
-        {selectedSummary && !loading && !error && (
-          <EnhancedSummaryCard summary={selectedSummary} />
+        {dashboard?.summary && !loading && !error && (
+          <EnhancedSummaryCard
+            summary={{ ...dashboard.summary, financial_data: dashboard.financial_data ?? undefined }}
+            historical={dashboard.historical}
+            analysis={dashboard.analysis?.analysis}
+          />
         )}
 
       </main>
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { Company, TranscriptData, SummaryData, HistoricalData } from './types';
+import { Company, TranscriptData, SummaryData, HistoricalData, DashboardData } from './types';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
 
@@ -27,7 +27,52 @@ export const getSummary = async (ticker: string): Promise<SummaryData> => {
   return response.data;
 };
 
+export interface SummaryBatch {
+  summaries: Record<string, SummaryData>;
+  status: Record<string, { status: 'ok' | 'pending' | 'error'; code?: number; detail?: string }>;
+}
+
+export type SummaryProfile = 'card' | 'full';
+
+export const getSummaries = async (tickers: string[], partial: boolean = false, profile?: SummaryProfile): Promise<SummaryBatch> => {
+  const params = new URLSearchParams();
+  params.append('tickers', tickers.join(','));
+  if (partial) {
+    params.append('partial', 'true');
+  }
+  if (profile) {
+    params.append('profile', profile);
+  }
+  const response = await api.get<SummaryBatch>(`/api/summaries?${params.toString()}`);
+  return response.data;
+};
+
 export const getHistoricalEarnings = async (ticker: string): Promise<HistoricalData> => {
   const response = await api.get<HistoricalData>(`/api/historical/${ticker}`);
   return response.data;
-};
\ No newline at end of file
+};
+
+// Summary, historical data, transcript analysis and financial data for one company in a single request
+export const getDashboard = async (ticker: string): Promise<DashboardData> => {
+  const response = await api.get<DashboardData>(`/api/dashboard/${ticker}`);
+  return response.data;
+};
+
+export interface ChangeEvent {
+  ticker: string;
+  artifact: string;
+  source: 'artifact' | 'cache';
+  updated_at: string;
+}
+
+// Calls onChange whenever data for one of the tickers is rewritten on the server; returns an unsubscribe function
+export const subscribeToUpdates = (tickers: string[], onChange: (change: ChangeEvent | null) => void): (() => void) => {
+  if (typeof EventSource === 'undefined') {
+    return () => {};
+  }
+  const source = new EventSource(`${API_BASE_URL}/api/updates?tickers=${encodeURIComponent(tickers.join(','))}`);
+  source.addEventListener('change', (event) => onChange(JSON.parse((event as MessageEvent).data)));
+  // Changes were dropped; everything shown should be reloaded
+  source.addEventListener('resync', () => onChange(null));
+  return () => source.close();
+};
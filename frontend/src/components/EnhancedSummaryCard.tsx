@@ -6,15 +6,23 @@ import TranscriptInsights from './TranscriptInsights';
 
 interface EnhancedSummaryCardProps {
   summary: SummaryData;
+  // Already loaded with the dashboard; fetched separately when undefined
+  historical?: HistoricalData | null;
+  analysis?: Record<string, any>;
 }
 
-const EnhancedSummaryCard: React.FC<EnhancedSummaryCardProps> = ({ summary }) => {
-  const [historicalData, setHistoricalData] = useState<HistoricalData | null>(null);
+const EnhancedSummaryCard: React.FC<EnhancedSummaryCardProps> = ({ summary, historical, analysis }) => {
+  const [historicalData, setHistoricalData] = useState<HistoricalData | null>(historical ?? null);
   const [loadingHistorical, setLoadingHistorical] = useState(false);
   const [showTrends, setShowTrends] = useState(false);
   const [showTranscriptInsights, setShowTranscriptInsights] = useState(false);
 
   useEffect(() => {
+    if (historical !== undefined) {
+      setHistoricalData(historical);
+      return;
+    }
+
     const fetchHistoricalData = async () => {
       setLoadingHistorical(true);
       try {
@@ -28,7 +36,7 @@ const EnhancedSummaryCard: React.FC<EnhancedSummaryCardProps> = ({ summary }) =>
     };
 
     fetchHistoricalData();
-  }, [summary.ticker]);
+  }, [summary.ticker, historical]);
   const getSentimentColor = (score: number) => {
     if (score > 1) return 'text-green-600';
     if (score > 0) return 'text-green-500';
@@ -330,6 +338,7 @@ const EnhancedSummaryCard: React.FC<EnhancedSummaryCardProps> = ({ summary }) =>
       {showTranscriptInsights && (
         <TranscriptInsights
           ticker={summary.ticker}
+          initialAnalysis={analysis}
           onClose={() => setShowTranscriptInsights(false)}
         />
       )}
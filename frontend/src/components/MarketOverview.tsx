@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import { getCompanies, getSummary } from '../api';
+import { getCompanies, getSummaries } from '../api';
 import { Company, SummaryData } from '../types';
 
 interface CompanyOverview {
@@ -28,22 +28,16 @@ const MarketOverview: React.FC<MarketOverviewProps> = ({ onSelectCompany }) => {
       }));
       setCompanies(overviewData);
 
-      // Load summaries for each company
-      for (const company of companiesList) {
-        try {
-          const summary = await getSummary(company.ticker);
-          setCompanies(prev => prev.map(c => 
-            c.company.ticker === company.ticker 
-              ? { ...c, summary, loading: false }
-              : c
-          ));
-        } catch (error) {
-          setCompanies(prev => prev.map(c => 
-            c.company.ticker === company.ticker 
-              ? { ...c, loading: false }
-              : c
-          ));
-        }
+      // Load all summaries in one request, with only the fields the cards show
+      try {
+        const { summaries } = await getSummaries(companiesList.map(company => company.ticker), false, 'card');
+        setCompanies(prev => prev.map(c => ({
+          ...c,
+          summary: summaries[c.company.ticker],
+          loading: false
+        })));
+      } catch (error) {
+        setCompanies(prev => prev.map(c => ({ ...c, loading: false })));
       }
     } catch (error) {
       console.error('Failed to load market data:', error);
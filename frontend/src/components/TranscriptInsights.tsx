@@ -56,18 +56,62 @@ interface TranscriptAnalysis {
 
 interface TranscriptInsightsProps {
   ticker: string;
+  // Analysis already loaded with the dashboard; streamed from the server when not given
+  initialAnalysis?: TranscriptAnalysis;
   onClose?: () => void;
 }
 
-const TranscriptInsights: React.FC<TranscriptInsightsProps> = ({ ticker, onClose }) => {
-  const [analysis, setAnalysis] = useState<TranscriptAnalysis | null>(null);
-  const [loading, setLoading] = useState(true);
+const TranscriptInsights: React.FC<TranscriptInsightsProps> = ({ ticker, initialAnalysis, onClose }) => {
+  const [analysis, setAnalysis] = useState<TranscriptAnalysis | null>(initialAnalysis ?? null);
+  const [loading, setLoading] = useState(!initialAnalysis);
   const [error, setError] = useState<string | null>(null);
   const [activeTab, setActiveTab] = useState('overview');
 
   useEffect(() => {
-    fetchTranscriptAnalysis();
-  }, [ticker]);
+    if (initialAnalysis) {
+      setAnalysis(initialAnalysis);
+      setLoading(false);
+      return;
+    }
+    if (typeof EventSource === 'undefined') {
+      fetchTranscriptAnalysis();
+      return;
+    }
+    return streamTranscriptAnalysis();
+  }, [ticker, initialAnalysis]);
+
+  // Sections are shown as soon as the server has them; returns a cleanup that closes the stream
+  const streamTranscriptAnalysis = () => {
+    const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+    const source = new EventSource(`${API_URL}/api/transcript/${ticker}/stream`);
+    let completed = false;
+
+    setLoading(true);
+    setAnalysis(null);
+    setError(null);
+
+    source.addEventListener('section', (event) => {
+      const { key, value } = JSON.parse((event as MessageEvent).data);
+      setAnalysis(prev => ({ ...(prev || {}), [key]: value }));
+      setLoading(false);
+    });
+    source.addEventListener('complete', (event) => {
+      completed = true;
+      setAnalysis(JSON.parse((event as MessageEvent).data).analysis);
+      setLoading(false);
+      source.close();
+    });
+    source.addEventListener('error', (event) => {
+      source.close();
+      if (completed) return;
+      const data = (event as MessageEvent).data;
+      console.error('Transcript analysis stream error:', data);
+      setError(data ? JSON.parse(data).detail : 'Failed to load transcript analysis');
+      setLoading(false);
+    });
+
+    return () => source.close();
+  };
 
   const fetchTranscriptAnalysis = async () => {
     try {
@@ -78,4 +78,21 @@ export interface HistoricalData {
   quarters: HistoricalQuarter[];
   metrics: HistoricalMetrics;
   analysis: HistoricalAnalysis;
-}
\ No newline at end of file
+}
+
+export interface DashboardSectionStatus {
+  status: 'ok' | 'missing' | 'error';
+  updated_at?: string;
+  stale?: boolean;
+  code?: number;
+  detail?: string;
+}
+
+export interface DashboardData {
+  ticker: string;
+  summary: SummaryData | null;
+  historical: HistoricalData | null;
+  analysis: { ticker: string; analysis: Record<string, any> } | null;
+  financial_data: SummaryData['financial_data'] | null;
+  sections: Record<'summary' | 'historical' | 'analysis' | 'financial_data', DashboardSectionStatus>;
+}